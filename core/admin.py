@@ -1,6 +1,191 @@
+from datetime import datetime
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core import checks
+from django.db.models import Max, Min, Q, QuerySet
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
 from .models import Cliente, Fornecedor, Solicitacao
+from .paginacao import PaginadorEstimado
+
+
+class BuscaIndexadaAdmin(admin.ModelAdmin):
+    """Busca só por igualdade em colunas indexadas. As buscas padrão do admin
+    (`icontains`, `iexact`) aplicam LIKE/UPPER e varrem a tabela inteira.
+
+    Cada subclasse declara as colunas buscadas: `campos_busca_exata`
+    (igualdade; "fk__coluna" resolve antes os ids na tabela relacionada, já que
+    um OR entre colunas de tabelas do JOIN não usa índice),
+    `campos_busca_prefixo` (início do texto, com índice em UPPER) e
+    `busca_por_id` (termos numéricos também buscam a chave primária)."""
+
+    campos_busca_exata: tuple[str, ...] = ()
+    campos_busca_prefixo: tuple[str, ...] = ()
+    busca_por_id = True
+
+    def check(self, **kwargs):
+        erros = super().check(**kwargs)
+        if not (self.campos_busca_exata or self.campos_busca_prefixo):
+            erros.append(
+                checks.Error(
+                    "Declare campos_busca_exata ou campos_busca_prefixo.",
+                    obj=self.__class__,
+                    id="core.E001",
+                )
+            )
+        return erros
+
+    def condicoes_busca(self, termo: str) -> Q:
+        condicoes = Q(pk__in=[])
+        for campo in self.campos_busca_prefixo:
+            condicoes |= Q(**{f"{campo}__istartswith": termo})
+        for campo in self.campos_busca_exata:
+            relacao, _, coluna = campo.partition("__")
+            if not coluna:
+                condicoes |= Q(**{campo: termo})
+                continue
+            modelo = self.model._meta.get_field(relacao).related_model
+            ids = list(
+                modelo._default_manager.filter(**{coluna: termo}).values_list("pk", flat=True)
+            )
+            if ids:
+                condicoes |= Q(**{f"{relacao}__in": ids})
+        if self.busca_por_id and termo.isdigit():
+            condicoes |= Q(pk=int(termo))
+        return condicoes
+
+    def get_search_results(self, request, queryset, search_term):
+        termo = search_term.strip()
+        if not termo:
+            return queryset, False
+        return queryset.filter(self.condicoes_busca(termo)), False
+
+
+class _HierarquiaPorIntervalo(QuerySet):
+    """`datetimes()` por ano e por mês gerado a partir do primeiro e do último
+    registro (duas leituras no índice de data), em vez de um DISTINCT
+    date_trunc sobre todas as linhas. Períodos vazios no meio do intervalo
+    aparecem na hierarquia de datas do admin."""
+
+    def datetimes(self, field_name, kind, order="ASC", tzinfo=None):
+        if kind not in ("year", "month"):
+            return super().datetimes(field_name, kind, order, tzinfo)
+        intervalo = self.aggregate(primeiro=Min(field_name), ultimo=Max(field_name))
+        if intervalo["primeiro"] is None:
+            return []
+        primeiro = timezone.localtime(intervalo["primeiro"], tzinfo)
+        ultimo = timezone.localtime(intervalo["ultimo"], tzinfo)
+        if kind == "year":
+            periodos = [
+                datetime(ano, 1, 1, tzinfo=primeiro.tzinfo)
+                for ano in range(primeiro.year, ultimo.year + 1)
+            ]
+        else:
+            periodos = [
+                datetime(indice // 12, indice % 12 + 1, 1, tzinfo=primeiro.tzinfo)
+                for indice in range(
+                    primeiro.year * 12 + primeiro.month - 1,
+                    ultimo.year * 12 + ultimo.month,
+                )
+            ]
+        return periodos if order == "ASC" else periodos[::-1]
+
+
+class FiltroFornecedor(admin.SimpleListFilter):
+    """Filtro pelo id do fornecedor, digitado num campo. O filtro padrão de uma
+    FK lista todos os fornecedores, carregados a cada página da listagem."""
+
+    title = "fornecedor"
+    parameter_name = "fornecedor_id"
+    template = "admin/filtro_por_id.html"
+
+    def lookups(self, request, model_admin):
+        # Só o fornecedor escolhido, para mostrar o nome
+        valor = self.value()
+        if not (valor and valor.isdigit()):
+            return []
+        fornecedores = Fornecedor.objects.filter(pk=valor).values_list("pk", "nome")
+        return [(str(pk), nome) for pk, nome in fornecedores]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Os demais filtros e a busca seguem no formulário do campo
+        self.outros_parametros = [
+            (nome, valor) for nome, valor in changelist.params.items() if nome != self.parameter_name
+        ]
+        yield {
+            "selected": not self.value(),
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": _("All"),
+        }
+        for pk, nome in self.lookup_choices:
+            yield {
+                "selected": True,
+                "query_string": changelist.get_query_string({self.parameter_name: pk}),
+                "display": nome,
+            }
+
+    def queryset(self, request, queryset):
+        valor = self.value()
+        if not valor:
+            return queryset
+        if not valor.isdigit():
+            raise IncorrectLookupParameters(f"Id de fornecedor inválido: {valor}")
+        return queryset.filter(fornecedor_id=int(valor))
+
+
+class EmpresaAdmin(BuscaIndexadaAdmin):
+    list_display = ("nome", "cnpj", "email")
+    search_fields = ("^nome", "cnpj")
+    search_help_text = "Início do nome, CNPJ exato (com pontuação) ou id."
+    ordering = ("nome",)
+    # Início do nome pelo índice em UPPER(nome) (text_pattern_ops)
+    campos_busca_prefixo = ("nome",)
+    campos_busca_exata = ("cnpj",)
+
+
+@admin.register(Fornecedor)
+class FornecedorAdmin(EmpresaAdmin):
+    list_display = EmpresaAdmin.list_display + ("url_sistema",)
+
+
+@admin.register(Cliente)
+class ClienteAdmin(EmpresaAdmin):
+    list_display = EmpresaAdmin.list_display + ("telefone",)
+
+
+@admin.register(Solicitacao)
+class SolicitacaoAdmin(BuscaIndexadaAdmin):
+    list_display = (
+        "id",
+        "data_solicitacao",
+        "cliente",
+        "fornecedor",
+        "contrato__numero",
+        "tipo_profissional",
+        "jornada",
+        "status",
+    )
+    list_select_related = ("cliente", "fornecedor", "contrato")
+    list_filter = (FiltroFornecedor, "status")
+    date_hierarchy = "data_solicitacao"
+    ordering = ("-data_solicitacao", "-id")
+    search_fields = ("id", "fornecedor__cnpj", "cliente__cnpj")
+    search_help_text = "Id da solicitação ou CNPJ exato do fornecedor ou do cliente."
+    campos_busca_exata = ("fornecedor__cnpj", "cliente__cnpj")
+    # Selects com todos os contratos/usuários seriam enormes no formulário
+    raw_id_fields = ("cliente", "fornecedor", "contrato", "usuario_solicitante")
+
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
 
-admin.site.register(Cliente)
-admin.site.register(Fornecedor)
-admin.site.register(Solicitacao)
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return _HierarquiaPorIntervalo(
+            model=queryset.model, query=queryset.query.chain(), using=queryset.db
+        )
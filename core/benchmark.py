@@ -0,0 +1,350 @@
+"""Benchmark de ponta a ponta das views principais.
+
+Popula um banco de teste, sobe o simulador do gerenciamento de escala
+(`core.simulador`) em uma thread e exercita as views pelo `django.test.Client`.
+Cada cenário mede latência (p50/p95/p99), vazão, consultas ao banco por
+requisição e pico de memória; o resultado é um dicionário serializável em JSON
+para comparação entre versões.
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Callable
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import (
+    Cliente,
+    Contrato,
+    Fornecedor,
+    Solicitacao,
+    TokenSolicitacao,
+    Usuario,
+)
+from core.services import resumo_service
+from core.simulador import cnpj_ficticio
+
+SENHA = "benchmark-senha"
+# Ids altos para não colidir com os contratos do simulador (1..N)
+CONTRATO_ID_INICIAL = 1_000_000
+
+
+@dataclass
+class Ambiente:
+    email: str
+    cliente_id: int
+    fornecedor_id: int
+    tokens_por_envio: int
+    logado: Client | None = None
+
+
+def popular(
+    fornecedores: int,
+    clientes: int,
+    contratos: int,
+    usuarios: int,
+    contratos_por_usuario: int,
+    solicitacoes: int,
+    seed: int = 0,
+    lote: int = 5000,
+) -> Ambiente:
+    """Cria o catálogo, usuários com tokens e solicitações. O primeiro usuário
+    é o usado pelos cenários."""
+    rng = random.Random(seed)
+    Fornecedor.objects.bulk_create(
+        Fornecedor(
+            nome=f"Fornecedor {i}",
+            cnpj=cnpj_ficticio(3, i),
+            email=f"fornecedor{i}@example.com",
+            url_sistema="http://localhost/",
+        )
+        for i in range(fornecedores)
+    )
+    Cliente.objects.bulk_create(
+        Cliente(
+            nome=f"Cliente {i}",
+            cnpj=cnpj_ficticio(4, i),
+            email=f"cliente{i}@example.com",
+            telefone="(11) 3000-0000",
+        )
+        for i in range(clientes)
+    )
+    fornecedor_ids = list(Fornecedor.objects.order_by("id").values_list("id", flat=True))
+    cliente_ids = list(Cliente.objects.order_by("id").values_list("id", flat=True))
+    Contrato.objects.bulk_create(
+        Contrato(
+            id=CONTRATO_ID_INICIAL + i,
+            numero=f"B-{i:06d}",
+            cliente_id=cliente_ids[i % clientes],
+            fornecedor_id=fornecedor_ids[i % fornecedores],
+        )
+        for i in range(contratos)
+    )
+
+    # Um único hash: gerar a senha de cada usuário dominaria o tempo de carga
+    senha = make_password(SENHA)
+    User.objects.bulk_create(
+        User(username=f"usuario{j}@example.com", email=f"usuario{j}@example.com", password=senha)
+        for j in range(usuarios)
+    )
+    users = User.objects.filter(username__startswith="usuario").order_by("id")
+    Usuario.objects.bulk_create(
+        Usuario(user=u, nome_completo=f"Usuário {j}") for j, u in enumerate(users)
+    )
+    perfis = list(Usuario.objects.order_by("id"))
+
+    dono: dict[int, int] = {}
+    tokens = []
+    for j, perfil in enumerate(perfis):
+        for k in range(contratos_por_usuario):
+            contrato_id = CONTRATO_ID_INICIAL + (j * contratos_por_usuario + k) % contratos
+            dono.setdefault(contrato_id, perfil.pk)
+            tokens.append(
+                TokenSolicitacao(
+                    usuario=perfil, token=f"seed-{j}-{k}", contrato_id=contrato_id, utilizado=True
+                )
+            )
+    TokenSolicitacao.objects.bulk_create(tokens, batch_size=lote)
+
+    contratos_db = list(Contrato.objects.values_list("id", "cliente_id", "fornecedor_id"))
+    Solicitacao.objects.bulk_create(
+        (
+            Solicitacao(
+                contrato_id=contrato_id,
+                cliente_id=cliente_id,
+                fornecedor_id=fornecedor_id,
+                usuario_solicitante_id=dono.get(contrato_id, perfis[0].pk),
+                tipo_profissional=rng.choice(["Enfermeiro", "Técnico", "Médico"]),
+                jornada=rng.choice(["12x36", "6h", "8h"]),
+            )
+            for contrato_id, cliente_id, fornecedor_id in (
+                rng.choice(contratos_db) for _ in range(solicitacoes)
+            )
+        ),
+        batch_size=lote,
+    )
+    resumo_service.reconstruir()
+
+    principal = perfis[0]
+    contrato = Contrato.objects.get(id=CONTRATO_ID_INICIAL)
+    return Ambiente(
+        email=principal.user.username,
+        cliente_id=contrato.cliente_id,
+        fornecedor_id=contrato.fornecedor_id,
+        tokens_por_envio=1,
+    )
+
+
+def _logado(amb: Ambiente) -> Client:
+    if amb.logado is None:
+        amb.logado = Client()
+        amb.logado.post(reverse("login"), {"username": amb.email, "senha": SENHA})
+    return amb.logado
+
+
+def login(amb: Ambiente, i: int):
+    return Client().post(reverse("login"), {"username": amb.email, "senha": SENHA})
+
+
+def listar(amb: Ambiente, i: int):
+    return _logado(amb).get(reverse("listar_solicitacoes"))
+
+
+def nova(amb: Ambiente, i: int):
+    return _logado(amb).post(
+        reverse("nova_solicitacao"),
+        {
+            "cliente": amb.cliente_id,
+            "fornecedor": amb.fornecedor_id,
+            "tipo_profissional": "Enfermeiro",
+            "jornada": "12x36",
+            "observacoes": f"benchmark {i}",
+        },
+    )
+
+
+def painel(amb: Ambiente, i: int):
+    return _logado(amb).get(reverse("painel"))
+
+
+def cadastro(amb: Ambiente, i: int):
+    return Client().post(
+        reverse("cadastro_usuario"),
+        {
+            "email": f"cadastro{i}@example.com",
+            "nome_completo": f"Cadastro {i}",
+            "password1": SENHA,
+            "password2": SENHA,
+            "token": f"bench-cadastro-{i}",
+        },
+    )
+
+
+def adicionar_token(amb: Ambiente, i: int):
+    tokens = [f"bench-token-{i}-{k}" for k in range(amb.tokens_por_envio)]
+    return Client().post(
+        reverse("adicionar_token"),
+        {"email": amb.email, "senha": SENHA, "token": " ".join(tokens)},
+    )
+
+
+# nome -> (cenário, status esperado). Ordem importa: adicionar_token amplia o
+# escopo do usuário principal
+CENARIOS: dict[str, tuple[Callable, int]] = {
+    "login_usuario": (login, 302),
+    "listar_solicitacoes": (listar, 200),
+    "nova_solicitacao": (nova, 302),
+    "painel": (painel, 200),
+    "cadastro_usuario": (cadastro, 302),
+    "adicionar_token": (adicionar_token, 302),
+}
+
+
+# Ajustes da conexão default em cada modo de BANCO_CONEXOES (ver settings)
+MODOS_CONEXAO = {
+    "nenhum": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistente": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pool": {
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": False,
+        "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}},
+    },
+}
+
+
+@contextmanager
+def modo_conexao(modo: str):
+    """Aplica à conexão default o modo de conexões `modo` durante o bloco."""
+    original = deepcopy(connection.settings_dict)
+    ajustes = MODOS_CONEXAO[modo]
+    connection.close()
+    connection.close_pool()
+    opcoes = {k: v for k, v in original.get("OPTIONS", {}).items() if k != "pool"}
+    connection.settings_dict.update(
+        CONN_MAX_AGE=ajustes["CONN_MAX_AGE"],
+        CONN_HEALTH_CHECKS=ajustes["CONN_HEALTH_CHECKS"],
+        OPTIONS={**opcoes, **ajustes.get("OPTIONS", {})},
+    )
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.close_pool()
+        connection.settings_dict.clear()
+        connection.settings_dict.update(original)
+
+
+def com_ciclo_de_conexoes(cenario: Callable) -> Callable:
+    """O cenário com o fechamento de conexões que o handler do Django faz no
+    início e no fim de cada requisição (o `django.test.Client` não faz): sem
+    ele todos os modos reaproveitariam a mesma conexão."""
+
+    def executar(amb: Ambiente, i: int):
+        close_old_connections()
+        try:
+            return cenario(amb, i)
+        finally:
+            close_old_connections()
+
+    return executar
+
+
+def percentis(amostras: list[float]) -> tuple[float, float, float]:
+    if len(amostras) < 2:
+        valor = amostras[0] if amostras else 0.0
+        return valor, valor, valor
+    cortes = statistics.quantiles(amostras, n=100, method="inclusive")
+    return cortes[49], cortes[94], cortes[98]
+
+
+def medir(
+    cenario: Callable,
+    esperado: int,
+    amb: Ambiente,
+    iteracoes: int,
+    aquecimento: int,
+    amostras_memoria: int,
+) -> dict:
+    """Executa o cenário sequencialmente; respostas com status diferente de
+    `esperado` contam como erro (um POST inválido devolve 200). O pico de
+    memória é medido em execuções extras, com `tracemalloc`, para não
+    distorcer as latências."""
+    i = 0
+    for _ in range(aquecimento):
+        cenario(amb, i)
+        i += 1
+
+    latencias, consultas, erros = [], [], 0
+    inicio_total = time.perf_counter()
+    for _ in range(iteracoes):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            response = cenario(amb, i)
+            latencias.append(time.perf_counter() - inicio)
+        consultas.append(len(capturadas))
+        if response.status_code != esperado:
+            erros += 1
+        i += 1
+    total = time.perf_counter() - inicio_total
+
+    tracemalloc.start()
+    try:
+        for _ in range(amostras_memoria):
+            cenario(amb, i)
+            i += 1
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = percentis(latencias)
+    return {
+        "requisicoes": iteracoes,
+        "erros": erros,
+        "media_ms": statistics.fmean(latencias) * 1000 if latencias else 0.0,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+        "vazao_rps": iteracoes / total if total else 0.0,
+        "consultas_media": statistics.fmean(consultas) if consultas else 0.0,
+        "consultas_max": max(consultas, default=0),
+        "memoria_pico_kb": pico / 1024,
+    }
+
+
+# (métrica, maior é pior)
+METRICAS_COMPARADAS = (
+    ("p50_ms", True),
+    ("p95_ms", True),
+    ("p99_ms", True),
+    ("vazao_rps", False),
+    ("consultas_media", True),
+    ("memoria_pico_kb", True),
+)
+
+
+def comparar(atual: dict, anterior: dict, tolerancia: float) -> list[tuple]:
+    """[(cenário, métrica, anterior, atual, variação, regressão)] para os
+    cenários presentes nas duas execuções. `tolerancia` em fração (0.1 = 10%)."""
+    linhas = []
+    for nome, resultado in atual["cenarios"].items():
+        base = anterior.get("cenarios", {}).get(nome)
+        if not base:
+            continue
+        for metrica, maior_pior in METRICAS_COMPARADAS:
+            antes, depois = base.get(metrica), resultado[metrica]
+            if not antes:
+                continue
+            variacao = (depois - antes) / antes
+            regressao = variacao > tolerancia if maior_pior else variacao < -tolerancia
+            linhas.append((nome, metrica, antes, depois, variacao, regressao))
+    return linhas
@@ -0,0 +1,113 @@
+"""Conexões com o banco: métricas do modo configurado em `BANCO_CONEXOES`.
+
+- "nenhum": cada requisição abre e fecha a própria conexão;
+- "persistente": cada thread reaproveita sua conexão por `CONN_MAX_AGE`
+  segundos, verificada antes do reuso (`CONN_HEALTH_CHECKS`);
+- "pool": pool do psycopg 3 por processo (`OPTIONS["pool"]`).
+
+`escala_db_conexoes_obtidas_total` conta as conexões entregues ao Django (no
+modo pool, cada retirada do pool); no modo pool, as métricas
+`escala_db_pool_*` mostram ocupação, espera e conexões abertas pelo pool.
+"""
+
+import threading
+from collections import Counter
+
+from django.db import connections
+
+from core import metricas
+
+MODOS = ("nenhum", "persistente", "pool")
+
+_obtidas: Counter = Counter()
+_obtidas_lock = threading.Lock()
+
+
+def registrar_conexao(alias: str) -> None:
+    with _obtidas_lock:
+        _obtidas[alias] += 1
+
+
+def conexoes_obtidas() -> dict[str, int]:
+    with _obtidas_lock:
+        return dict(_obtidas)
+
+
+def estatisticas_pools() -> dict[str, dict]:
+    """Estatísticas (`psycopg_pool`) do pool de cada banco que usa pool."""
+    estatisticas = {}
+    for alias in connections:
+        if not connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            continue
+        pool = connections[alias].pool
+        if pool is not None:
+            estatisticas[alias] = pool.get_stats()
+    return estatisticas
+
+
+def _serie(chave: str, fator: float = 1):
+    def coletar():
+        return [
+            ({"banco": alias}, estatisticas.get(chave, 0) * fator)
+            for alias, estatisticas in estatisticas_pools().items()
+        ]
+
+    return coletar
+
+
+def _ocupacao():
+    series = []
+    for alias, estatisticas in estatisticas_pools().items():
+        for estado, chave in (
+            ("abertas", "pool_size"),
+            ("disponiveis", "pool_available"),
+            ("minimo", "pool_min"),
+            ("maximo", "pool_max"),
+        ):
+            series.append(({"banco": alias, "estado": estado}, estatisticas.get(chave, 0)))
+    return series
+
+
+for _metrica in (
+    metricas.Contador(
+        "escala_db_conexoes_obtidas_total",
+        "Conexões com o banco obtidas pelo Django (novas ou retiradas do pool).",
+        lambda: [({"banco": alias}, total) for alias, total in conexoes_obtidas().items()],
+    ),
+    metricas.Medidor(
+        "escala_db_pool_conexoes",
+        "Conexões do pool: abertas, disponíveis e limites mínimo e máximo.",
+        _ocupacao,
+    ),
+    metricas.Medidor(
+        "escala_db_pool_aguardando",
+        "Pedidos aguardando uma conexão livre do pool.",
+        _serie("requests_waiting"),
+    ),
+    metricas.Contador(
+        "escala_db_pool_retiradas_total",
+        "Conexões retiradas do pool.",
+        _serie("requests_num"),
+    ),
+    metricas.Contador(
+        "escala_db_pool_retiradas_enfileiradas_total",
+        "Retiradas que precisaram esperar por uma conexão livre.",
+        _serie("requests_queued"),
+    ),
+    metricas.Contador(
+        "escala_db_pool_espera_segundos_total",
+        "Tempo total de espera por conexões do pool.",
+        _serie("requests_wait_ms", 0.001),
+    ),
+    metricas.Contador(
+        "escala_db_pool_timeouts_total",
+        "Retiradas que falharam (tempo de espera esgotado).",
+        _serie("requests_errors"),
+    ),
+    metricas.Contador(
+        "escala_db_pool_conexoes_criadas_total",
+        "Conexões abertas pelo pool com o PostgreSQL.",
+        _serie("connections_num"),
+    ),
+):
+    metricas.registrar(_metrica)
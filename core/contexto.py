@@ -0,0 +1,93 @@
+"""Contexto do usuário autenticado, carregado uma vez por requisição.
+
+O `UsuarioContextMiddleware` expõe `request.usuario_contexto`; views, services e
+templates leem perfil, tokens, contratos, fornecedores e clientes daqui em vez
+de percorrer as FKs a cada uso.
+"""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from django.db.models import Prefetch
+
+from core.models import Cliente, Contrato, Fornecedor, TokenSolicitacao, Usuario
+from core.services.escopo_service import Opcoes
+
+
+@dataclass
+class UsuarioContext:
+    perfil: Usuario | None = None
+    tokens: list[TokenSolicitacao] = field(default_factory=list)
+
+    @cached_property
+    def contratos(self) -> list[Contrato]:
+        return list({t.contrato_id: t.contrato for t in self.tokens}.values())
+
+    @cached_property
+    def fornecedores(self) -> list[Fornecedor]:
+        return list({c.fornecedor_id: c.fornecedor for c in self.contratos}.values())
+
+    @cached_property
+    def clientes(self) -> list[Cliente]:
+        return list({c.cliente_id: c.cliente for c in self.contratos}.values())
+
+    @property
+    def fornecedores_ids(self) -> list[int]:
+        return [f.id for f in self.fornecedores]
+
+    @cached_property
+    def opcoes(self) -> Opcoes:
+        return Opcoes(
+            clientes=sorted(((c.id, c.nome) for c in self.clientes), key=lambda item: item[1]),
+            fornecedores=sorted(
+                ((f.id, f.nome) for f in self.fornecedores), key=lambda item: item[1]
+            ),
+            pares={(c.cliente_id, c.fornecedor_id) for c in self.contratos},
+        )
+
+    @property
+    def instancias(self) -> dict[str, dict[int, Cliente | Fornecedor]]:
+        """Objetos já carregados, para o `SolicitacaoForm` validar sem consultas."""
+        return {
+            "cliente": {c.id: c for c in self.clientes},
+            "fornecedor": {f.id: f for f in self.fornecedores},
+        }
+
+    def contrato_para(self, cliente_id: int, fornecedor_id: int) -> Contrato | None:
+        for contrato in self.contratos:
+            if contrato.cliente_id == cliente_id and contrato.fornecedor_id == fornecedor_id:
+                return contrato
+        return None
+
+
+def _consulta_perfil(user):
+    return Usuario.objects.filter(user=user).prefetch_related(
+        Prefetch(
+            "tokens",
+            queryset=TokenSolicitacao.objects.select_related(
+                "contrato__cliente", "contrato__fornecedor"
+            ).order_by("criado_em"),
+        )
+    )
+
+
+def carregar_contexto(user) -> UsuarioContext:
+    """Carrega o contexto com duas consultas: perfil e tokens (com contrato,
+    cliente e fornecedor via JOIN), independente da quantidade de tokens."""
+    if not user.is_authenticated:
+        return UsuarioContext()
+
+    perfil = _consulta_perfil(user).first()
+    if perfil is None:
+        return UsuarioContext()
+    return UsuarioContext(perfil=perfil, tokens=list(perfil.tokens.all()))
+
+
+async def acarregar_contexto(user) -> UsuarioContext:
+    if not user.is_authenticated:
+        return UsuarioContext()
+
+    perfil = await _consulta_perfil(user).afirst()
+    if perfil is None:
+        return UsuarioContext()
+    return UsuarioContext(perfil=perfil, tokens=list(perfil.tokens.all()))
@@ -1,24 +1,135 @@
+import re
+import uuid
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from core.models import Solicitacao
+from django.db import models
+from django.urls import reverse
+from core.models import Cliente, Fornecedor, Solicitacao
+from core.services import importacao_service
+from core.services.escopo_service import Opcoes
+
+
+class TokensField(forms.CharField):
+    """Um ou mais tokens separados por espaço, vírgula, ponto e vírgula ou
+    quebra de linha. `cleaned_data` recebe a lista sem repetições."""
+
+    widget = forms.Textarea(attrs={"rows": 3})
+
+    def to_python(self, value):
+        texto = super().to_python(value)
+        return list(dict.fromkeys(t for t in re.split(r"[\s,;]+", texto) if t))
+
+    def validate(self, value):
+        super().validate(value)
+        if len(value) > settings.ESCALA_TOKENS_POR_ENVIO_MAX:
+            raise forms.ValidationError(
+                f"Informe no máximo {settings.ESCALA_TOKENS_POR_ENVIO_MAX} tokens por envio."
+            )
+        if any(len(token) > 64 for token in value):
+            raise forms.ValidationError("Token inválido: máximo de 64 caracteres.")
+
+
+class EscopoChoiceField(forms.ModelChoiceField):
+    """Select limitado às opções do escopo do usuário. A escolha é validada
+    contra a lista em memória e, se `instancias` tiver o objeto escolhido, sem
+    consultar o banco. Só as primeiras `FORM_OPCOES_MAX` opções são
+    renderizadas; as demais são alcançadas pelo autocompletar."""
+
+    def limitar(
+        self,
+        opcoes: list[tuple[int, str]],
+        instancias: dict[int, models.Model] | None = None,
+        selecionado=None,
+    ) -> None:
+        self.permitidos = dict(opcoes)
+        self.instancias = instancias or {}
+        visiveis = opcoes[: settings.FORM_OPCOES_MAX]
+        try:
+            selecionado = int(selecionado)
+        except (TypeError, ValueError):
+            selecionado = None
+        if selecionado in self.permitidos and selecionado not in dict(visiveis):
+            visiveis = [(selecionado, self.permitidos[selecionado]), *visiveis]
+        self.choices = [("", self.empty_label), *visiveis]
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            pk = None
+        if pk not in self.permitidos:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        if pk in self.instancias:
+            return self.instancias[pk]
+        return super().to_python(pk)
 
 
 class SolicitacaoForm(forms.ModelForm):
+    """`opcoes` limita cliente e fornecedor ao escopo do usuário; `instancias`
+    (objetos já carregados, ex.: do `UsuarioContext`) evita consultas na
+    validação."""
+
+    # Fora de Meta.fields: já validados contra o escopo, não passam pela
+    # validação do model (que consultaria o banco para cada um); `clean` os
+    # atribui à instância
+    cliente = EscopoChoiceField(queryset=Cliente.objects.all())
+    fornecedor = EscopoChoiceField(queryset=Fornecedor.objects.all())
+    # Nova a cada formulário exibido; reenvios do mesmo formulário repetem a chave
+    chave_idempotencia = forms.UUIDField(
+        required=False, widget=forms.HiddenInput, initial=uuid.uuid4
+    )
+
+    field_order = ["cliente", "fornecedor"]
+
+    def __init__(
+        self,
+        *args,
+        opcoes: Opcoes,
+        instancias: dict[str, dict[int, models.Model]] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.pares = opcoes.pares
+        instancias = instancias or {}
+        for campo, lista in (("cliente", opcoes.clientes), ("fornecedor", opcoes.fornecedores)):
+            self.fields[campo].limitar(
+                lista, instancias.get(campo), self.data.get(campo) if self.is_bound else None
+            )
+            self.fields[campo].widget.attrs["data-autocompletar"] = reverse(
+                "autocompletar", args=[campo]
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        cliente, fornecedor = cleaned_data.get("cliente"), cleaned_data.get("fornecedor")
+        if cliente and fornecedor and (cliente.pk, fornecedor.pk) not in self.pares:
+            raise forms.ValidationError(
+                "Você não tem contrato para este par de cliente e fornecedor."
+            )
+        if cliente and fornecedor:
+            self.instance.cliente = cliente
+            self.instance.fornecedor = fornecedor
+        return cleaned_data
+
     class Meta:
         model = Solicitacao
-        fields = [
-            "cliente",
-            "fornecedor",
-            "tipo_profissional",
-            "jornada",
-            "observacoes",
-        ]
+        fields = ["tipo_profissional", "jornada", "observacoes"]
 
 
 class UsuarioCadastroForm(UserCreationForm):
-    token = forms.CharField(
-        required=False, help_text="Informe o token recebido (opcional)"
+    token = TokensField(
+        required=False,
+        label="Tokens",
+        help_text="Informe os tokens recebidos (opcional), separados por espaço, vírgula ou linha",
     )
     nome_completo = forms.CharField(required=True, label="Nome Completo")
 
@@ -36,4 +147,32 @@ class UsuarioCadastroForm(UserCreationForm):
 class AdicionarTokenForm(forms.Form):
     email = forms.EmailField(label="Email")
     senha = forms.CharField(label="Senha", widget=forms.PasswordInput)
-    token = forms.CharField(label="Token")
+    token = TokensField(
+        label="Tokens",
+        help_text="Um ou mais tokens, separados por espaço, vírgula ou linha",
+    )
+
+
+class ImportacaoForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Planilha (CSV ou XLSX)",
+        help_text=(
+            "Colunas: cliente_cnpj, fornecedor_cnpj, tipo_profissional, jornada "
+            "e, opcionalmente, observacoes e contrato_numero"
+        ),
+    )
+    tudo_ou_nada = forms.BooleanField(
+        required=False, label="Importar somente se todas as linhas forem válidas"
+    )
+
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data["arquivo"]
+        if arquivo.size > settings.IMPORTACAO_TAMANHO_MAX:
+            raise forms.ValidationError(
+                f"Arquivo maior que {settings.IMPORTACAO_TAMANHO_MAX // (1024 * 1024)} MB."
+            )
+        try:
+            importacao_service.formato_de(arquivo.name)
+        except importacao_service.ErroPlanilha as e:
+            raise forms.ValidationError(str(e))
+        return arquivo
@@ -0,0 +1,210 @@
+import json
+import os
+import platform
+from contextlib import nullcontext
+from copy import deepcopy
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from core import benchmark
+from core.simulador import DISTRIBUICOES, ConfigSimulador, iniciar_em_thread, url_base
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark das views principais em um banco de teste, com o simulador do "
+        "gerenciamento de escala. Mostra p50/p95/p99, vazão, consultas e pico de "
+        "memória e grava o resultado em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cenarios", nargs="+", choices=list(benchmark.CENARIOS),
+            default=list(benchmark.CENARIOS),
+        )
+        parser.add_argument(
+            "--conexoes", nargs="+", choices=list(benchmark.MODOS_CONEXAO),
+            help=(
+                "Mede cada cenário em cada modo de conexão com o banco, abrindo e "
+                "fechando conexões como em requisições reais."
+            ),
+        )
+        parser.add_argument("--iteracoes", type=int, default=200)
+        parser.add_argument("--aquecimento", type=int, default=10)
+        parser.add_argument(
+            "--amostras-memoria", type=int, default=5,
+            help="Execuções extras, com tracemalloc, para medir o pico de memória.",
+        )
+        parser.add_argument("--fornecedores", type=int, default=50)
+        parser.add_argument("--clientes", type=int, default=200)
+        parser.add_argument("--contratos", type=int, default=1000)
+        parser.add_argument("--usuarios", type=int, default=500)
+        parser.add_argument("--contratos-por-usuario", type=int, default=5)
+        parser.add_argument("--solicitacoes", type=int, default=100_000)
+        parser.add_argument(
+            "--tokens-por-envio", type=int, default=5,
+            help="Tokens por envio no cenário adicionar_token.",
+        )
+        parser.add_argument(
+            "--latencia", choices=DISTRIBUICOES, default="lognormal",
+            help="Distribuição da latência do simulador.",
+        )
+        parser.add_argument("--latencia-media", type=float, default=30.0, help="ms")
+        parser.add_argument("--latencia-desvio", type=float, default=15.0, help="ms")
+        parser.add_argument("--taxa-erro", type=float, default=0.0)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--saida", default="benchmark.json", help="Arquivo JSON com os resultados.",
+        )
+        parser.add_argument(
+            "--comparar", help="JSON de uma execução anterior para comparar.",
+        )
+        parser.add_argument(
+            "--tolerancia", type=float, default=0.10,
+            help="Variação tolerada na comparação (0.10 = 10%%).",
+        )
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options["comparar"]:
+            try:
+                with open(options["comparar"], encoding="utf-8") as arquivo:
+                    anterior = json.load(arquivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Erro ao ler {options['comparar']}: {e}")
+
+        simulador = iniciar_em_thread(
+            ConfigSimulador(
+                latencia=options["latencia"],
+                latencia_media_ms=options["latencia_media"],
+                latencia_desvio_ms=options["latencia_desvio"],
+                taxa_erro=options["taxa_erro"],
+                seed=options["seed"],
+            )
+        )
+        # Mesmos backends de cache, com prefixo próprio para não ler nem
+        # sobrescrever entradas da aplicação
+        caches = deepcopy(settings.CACHES)
+        for alias in caches.values():
+            alias["KEY_PREFIX"] = f"benchmark-{os.getpid()}"
+
+        nome_banco = connection.settings_dict["NAME"]
+        setup_test_environment()
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=not options["interactive"], serialize=False
+        )
+        try:
+            with override_settings(
+                GERENCIAMENTO_ESCALA_API_URL=url_base(simulador), CACHES=caches
+            ):
+                resultado = self.executar(options)
+        finally:
+            connection.creation.destroy_test_db(nome_banco, verbosity=0)
+            teardown_test_environment()
+            simulador.shutdown()
+
+        with open(options["saida"], "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        self.imprimir(resultado)
+        self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
+
+        if anterior:
+            self.imprimir_comparacao(
+                benchmark.comparar(resultado, anterior, options["tolerancia"])
+            )
+
+    def executar(self, options) -> dict:
+        parametros = {
+            chave: options[chave]
+            for chave in (
+                "iteracoes", "aquecimento", "fornecedores", "clientes", "contratos",
+                "usuarios", "contratos_por_usuario", "solicitacoes", "tokens_por_envio",
+                "latencia", "latencia_media", "latencia_desvio", "taxa_erro", "seed",
+                "conexoes",
+            )
+        }
+        self.stdout.write("Populando o banco de teste...")
+        amb = benchmark.popular(
+            options["fornecedores"],
+            options["clientes"],
+            options["contratos"],
+            options["usuarios"],
+            options["contratos_por_usuario"],
+            options["solicitacoes"],
+            seed=options["seed"],
+        )
+        amb.tokens_por_envio = options["tokens_por_envio"]
+
+        cenarios = {}
+        for modo in options["conexoes"] or [None]:
+            if modo is not None:
+                self.stdout.write(f"Modo de conexão {modo}:")
+            for nome in benchmark.CENARIOS:
+                if nome not in options["cenarios"]:
+                    continue
+                self.stdout.write(f"Cenário {nome}...")
+                cenario, esperado = benchmark.CENARIOS[nome]
+                if modo is None:
+                    chave = nome
+                else:
+                    chave = f"{nome}@{modo}"
+                    cenario = benchmark.com_ciclo_de_conexoes(cenario)
+                with benchmark.modo_conexao(modo) if modo else nullcontext():
+                    cenarios[chave] = benchmark.medir(
+                        cenario,
+                        esperado,
+                        amb,
+                        options["iteracoes"],
+                        options["aquecimento"],
+                        options["amostras_memoria"],
+                    )
+        return {
+            "gerado_em": timezone.now().isoformat(),
+            "ambiente": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "banco": connection.vendor,
+            },
+            "parametros": parametros,
+            "cenarios": cenarios,
+        }
+
+    def imprimir(self, resultado: dict) -> None:
+        largura = max([22, *map(len, resultado["cenarios"])])
+        self.stdout.write(
+            f"{'cenário':<{largura}} {'n':>6} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'req/s':>8} {'consultas':>10} {'memória KB':>11}"
+        )
+        for nome, r in resultado["cenarios"].items():
+            self.stdout.write(
+                f"{nome:<{largura}} {r['requisicoes']:>6} {r['erros']:>6} {r['p50_ms']:>9.2f} "
+                f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['vazao_rps']:>8.1f} "
+                f"{r['consultas_media']:>10.1f} {r['memoria_pico_kb']:>11.0f}"
+            )
+
+    def imprimir_comparacao(self, linhas: list[tuple]) -> None:
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'cenário':<22} {'métrica':<16} {'anterior':>11} {'atual':>11} {'variação':>9}"
+        )
+        regressoes = 0
+        for nome, metrica, antes, depois, variacao, regressao in linhas:
+            texto = (
+                f"{nome:<22} {metrica:<16} {antes:>11.2f} {depois:>11.2f} {variacao:>+9.1%}"
+            )
+            if regressao:
+                regressoes += 1
+                texto = self.style.ERROR(texto)
+            self.stdout.write(texto)
+        if regressoes:
+            self.stdout.write(self.style.WARNING(f"{regressoes} métrica(s) pioraram além da tolerância."))
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services.envio_service import despachar_lote
+
+
+class Command(BaseCommand):
+    help = "Envia ao gerenciamento de escala as solicitações pendentes do outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote", type=int, default=settings.ESCALA_ENVIO_LOTE,
+            help="Quantidade de envios reservados por lote.",
+        )
+        parser.add_argument(
+            "--concorrencia", type=int, default=settings.ESCALA_ENVIO_CONCORRENCIA,
+            help="Máximo de chamadas simultâneas ao sistema de escala.",
+        )
+        parser.add_argument(
+            "--continuo", action="store_true",
+            help="Continua executando e consultando o outbox periodicamente.",
+        )
+        parser.add_argument(
+            "--intervalo", type=float, default=2.0,
+            help="Segundos de espera quando não há envios pendentes (modo contínuo).",
+        )
+
+    def handle(self, *args, **options):
+        total_enviados = total_falhas = 0
+        while True:
+            enviados, falhas = despachar_lote(options["lote"], options["concorrencia"])
+            total_enviados += enviados
+            total_falhas += falhas
+            if enviados or falhas:
+                self.stdout.write(f"Lote: {enviados} enviado(s), {falhas} falha(s).")
+
+            if enviados + falhas < options["lote"]:
+                if not options["continuo"]:
+                    break
+                time.sleep(options["intervalo"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Concluído: {total_enviados} enviado(s), {total_falhas} falha(s)."
+            )
+        )
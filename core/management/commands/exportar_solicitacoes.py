@@ -0,0 +1,66 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core import roteador
+from core.services import exportacao_service
+from core.services.escopo_service import obter_escopo
+
+
+class Command(BaseCommand):
+    help = "Exporta solicitações em CSV ou NDJSON, em fluxo contínuo."
+
+    def add_arguments(self, parser):
+        escopo = parser.add_mutually_exclusive_group(required=True)
+        escopo.add_argument(
+            "--usuario", help="Email do usuário cujo escopo de fornecedores será exportado."
+        )
+        escopo.add_argument(
+            "--fornecedor", type=int, action="append", dest="fornecedores",
+            help="ID de fornecedor (pode ser repetido).",
+        )
+        parser.add_argument("--inicio", type=exportacao_service.parse_data, help="Data inicial (AAAA-MM-DD).")
+        parser.add_argument("--fim", type=exportacao_service.parse_data, help="Data final, inclusiva (AAAA-MM-DD).")
+        parser.add_argument(
+            "--busca", help="Termo de busca (tipo profissional, jornada, observações).",
+        )
+        parser.add_argument(
+            "--formato", choices=sorted(exportacao_service.FORMATOS), default="csv"
+        )
+        parser.add_argument("--saida", help="Arquivo de saída (padrão: stdout).")
+        parser.add_argument(
+            "--lote", type=int, help="Linhas lidas por ida ao cursor do banco."
+        )
+
+    def handle(self, *args, **options):
+        if options["usuario"]:
+            try:
+                user = User.objects.get(username=options["usuario"])
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário {options['usuario']} não encontrado.")
+            fornecedores_ids = obter_escopo(user).fornecedores_ids
+        else:
+            fornecedores_ids = options["fornecedores"]
+
+        gerador = exportacao_service.FORMATOS[options["formato"]][0]
+        with roteador.leituras_na_replica():
+            registros = exportacao_service.linhas(
+                fornecedores_ids,
+                options["inicio"],
+                options["fim"],
+                options["lote"],
+                busca=options["busca"],
+            )
+
+        saida = (
+            open(options["saida"], "w", encoding="utf-8", newline="")
+            if options["saida"]
+            else sys.stdout
+        )
+        try:
+            for trecho in gerador(registros):
+                saida.write(trecho)
+        finally:
+            if saida is not sys.stdout:
+                saida.close()
@@ -0,0 +1,72 @@
+import time
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sintetico import SENHA_PADRAO, Topologia, gerar
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera dados sintéticos (fornecedores, hospitais, contratos, usuários, tokens "
+        "e solicitações) para testes de capacidade. Determinístico a partir de --seed."
+    )
+
+    def add_arguments(self, parser):
+        padrao = Topologia()
+        parser.add_argument("--hospitais", type=int, default=padrao.hospitais)
+        parser.add_argument("--fornecedores", type=int, default=padrao.fornecedores)
+        parser.add_argument(
+            "--fornecedores-por-hospital", type=int, default=padrao.fornecedores_por_hospital,
+        )
+        parser.add_argument(
+            "--contratos-por-par", type=int, default=padrao.contratos_por_par,
+            help="Contratos por par hospital x fornecedor.",
+        )
+        parser.add_argument("--usuarios", type=int, default=padrao.usuarios)
+        parser.add_argument("--tokens-por-usuario", type=int, default=padrao.tokens_por_usuario)
+        parser.add_argument("--meses", type=int, default=padrao.meses)
+        parser.add_argument(
+            "--solicitacoes-por-mes", type=int, default=padrao.solicitacoes_por_mes,
+            help="Solicitações no mês mais recente.",
+        )
+        parser.add_argument(
+            "--crescimento-mensal", type=float, default=padrao.crescimento_mensal,
+            help="Crescimento do volume mês a mês (0.02 = 2%%).",
+        )
+        parser.add_argument(
+            "--assimetria", type=float, default=padrao.assimetria,
+            help="Expoente da Zipf usada para fornecedores e contratos (0 = uniforme).",
+        )
+        parser.add_argument("--seed", type=int, default=padrao.seed)
+        parser.add_argument("--lote", type=int, default=10_000, help="Lote do bulk_create.")
+        parser.add_argument(
+            "--metodo", choices=["auto", "copy", "bulk_create"], default="auto",
+            help="auto usa COPY no PostgreSQL com psycopg 3.",
+        )
+
+    def handle(self, *args, **options):
+        topologia = Topologia(**{f.name: options[f.name] for f in fields(Topologia)})
+        if min(topologia.hospitais, topologia.fornecedores, topologia.usuarios) < 1:
+            raise CommandError("--hospitais, --fornecedores e --usuarios devem ser positivos.")
+        copy = {"auto": None, "copy": True, "bulk_create": False}[options["metodo"]]
+
+        inicio = time.perf_counter()
+        anterior = inicio
+
+        def progresso(tabela: str, linhas: int) -> None:
+            nonlocal anterior
+            agora = time.perf_counter()
+            self.stdout.write(
+                f"{tabela:<12} {linhas:>12,} linhas em {agora - anterior:8.1f}s "
+                f"({linhas / max(agora - anterior, 1e-9):,.0f}/s)"
+            )
+            anterior = agora
+
+        totais = gerar(topologia, lote=options["lote"], copy=copy, progresso=progresso)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(totais.values()):,} linhas em {time.perf_counter() - inicio:.1f}s. "
+                f"Senha dos usuários: {SENHA_PADRAO}"
+            )
+        )
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.contexto import carregar_contexto
+from core.services import importacao_service
+from core.services.envio_service import despachar_lote
+
+
+class Command(BaseCommand):
+    help = "Importa solicitações de uma planilha CSV ou XLSX em nome de um usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Planilha .csv ou .xlsx.")
+        parser.add_argument(
+            "--usuario", required=True, help="Email do usuário solicitante."
+        )
+        parser.add_argument(
+            "--tudo-ou-nada", action="store_true",
+            help="Não grava nada se alguma linha for inválida.",
+        )
+        parser.add_argument(
+            "--enviar", action="store_true",
+            help="Envia em seguida os pendentes do outbox ao sistema de escala.",
+        )
+        parser.add_argument(
+            "--concorrencia", type=int, default=settings.ESCALA_ENVIO_CONCORRENCIA,
+            help="Máximo de chamadas simultâneas ao sistema de escala (com --enviar).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["usuario"])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário {options['usuario']} não encontrado.")
+        contexto = carregar_contexto(user)
+        if not contexto.contratos:
+            raise CommandError("O usuário não tem contratos vinculados.")
+
+        try:
+            formato = importacao_service.formato_de(options["arquivo"])
+            with open(options["arquivo"], "rb") as arquivo:
+                resultado = importacao_service.importar(
+                    arquivo, formato, contexto, options["tudo_ou_nada"]
+                )
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler {options['arquivo']}: {e}")
+        except importacao_service.ErroPlanilha as e:
+            raise CommandError(str(e))
+
+        for erro in resultado.erros:
+            self.stderr.write(f"Linha {erro.linha}: {erro.mensagem}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(resultado.criadas)} solicitação(ões) importada(s), "
+                f"{len(resultado.erros)} linha(s) com erro."
+            )
+        )
+
+        if options["enviar"] and resultado.criadas:
+            total_enviados = total_falhas = 0
+            while True:
+                enviados, falhas = despachar_lote(
+                    settings.ESCALA_ENVIO_LOTE, options["concorrencia"]
+                )
+                total_enviados += enviados
+                total_falhas += falhas
+                if enviados + falhas < settings.ESCALA_ENVIO_LOTE:
+                    break
+            self.stdout.write(f"Envio: {total_enviados} enviado(s), {total_falhas} falha(s).")
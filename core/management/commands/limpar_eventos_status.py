@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import status_service
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os ids de eventos de status do webhook recebidos há mais de "
+        "--dias dias. Para rodar periodicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias", type=int, default=settings.ESCALA_WEBHOOK_RETENCAO_DIAS,
+            help="Dias de retenção (padrão: ESCALA_WEBHOOK_RETENCAO_DIAS).",
+        )
+
+    def handle(self, *args, **options):
+        if options["dias"] < 1:
+            raise CommandError("--dias deve ser pelo menos 1.")
+        apagados = status_service.limpar(options["dias"])
+        self.stdout.write(self.style.SUCCESS(f"{apagados:,} eventos apagados."))
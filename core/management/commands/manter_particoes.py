@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services import particao_service
+from core.services.resumo_service import mes_de, somar_meses
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as partições mensais dos próximos meses da tabela de solicitações "
+        "e, opcionalmente, arquiva as antigas. Para rodar periodicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--meses-futuros", type=int, default=settings.SOLICITACAO_PARTICOES_FUTURAS,
+            help="Meses à frente que devem ter partição.",
+        )
+        parser.add_argument(
+            "--meses-ativos", type=int, default=settings.SOLICITACAO_MESES_ATIVOS,
+            help="Meses (incluindo o atual) mantidos na tabela; os anteriores são arquivados.",
+        )
+        parser.add_argument(
+            "--modo", choices=particao_service.MODOS_ARQUIVO,
+            default=settings.SOLICITACAO_ARQUIVO_MODO,
+            help="desanexar: a partição vai inteira para o schema de arquivo; "
+            "mover: as linhas vão para uma tabela única de arquivo.",
+        )
+
+    def handle(self, *args, **options):
+        if not particao_service.particionada():
+            raise CommandError(
+                "A tabela de solicitações não é particionada (requer PostgreSQL e a migração 0008)."
+            )
+        atual = mes_de(timezone.now())
+
+        criadas = particao_service.garantir_particoes(
+            atual, somar_meses(atual, options["meses_futuros"])
+        )
+        for nome in criadas:
+            self.stdout.write(f"Partição criada: {nome}")
+
+        if options["meses_ativos"]:
+            if options["meses_ativos"] < 1:
+                raise CommandError("--meses-ativos deve ser pelo menos 1.")
+            arquivadas = particao_service.arquivar(
+                somar_meses(atual, 1 - options["meses_ativos"]), options["modo"]
+            )
+            for nome in arquivadas:
+                self.stdout.write(f"Partição arquivada ({options['modo']}): {nome}")
+
+        self.stdout.write(self.style.SUCCESS("Partições em dia."))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import exportacao_service, resumo_service
+
+
+class Command(BaseCommand):
+    help = "Recalcula o resumo mensal de solicitações usado pelo painel."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fornecedor", type=int, action="append", dest="fornecedores",
+            help="ID de fornecedor (pode ser repetido). Padrão: todos.",
+        )
+        parser.add_argument(
+            "--desde", type=exportacao_service.parse_data,
+            help=(
+                "Recalcula a partir do mês desta data (AAAA-MM-DD). Meses já "
+                "arquivados nunca são recalculados."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        linhas = resumo_service.reconstruir(options["fornecedores"], options["desde"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{linhas:,} linhas de resumo em {time.perf_counter() - inicio:.1f}s."
+            )
+        )
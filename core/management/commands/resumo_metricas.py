@@ -0,0 +1,71 @@
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import metricas
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume as métricas de /metricas/: p50/p95/p99 por view e por endpoint do "
+        "sistema de escala. Com --intervalo, mostra a janela entre leituras."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/metricas/")
+        parser.add_argument(
+            "--token", default=settings.METRICAS_TOKEN,
+            help="Token de /metricas/ (padrão: METRICAS_TOKEN).",
+        )
+        parser.add_argument(
+            "--intervalo", type=float, default=0,
+            help="Segundos entre leituras (0 = uma leitura, valores acumulados).",
+        )
+        parser.add_argument(
+            "--repeticoes", type=int, default=0,
+            help="Quantidade de janelas a mostrar (0 = sem limite).",
+        )
+
+    def ler(self, url: str, token: str = "") -> dict:
+        requisicao = urllib.request.Request(url)
+        if token:
+            requisicao.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(requisicao, timeout=10) as resposta:
+                return metricas.ler_histogramas(resposta.read().decode())
+        except OSError as e:
+            raise CommandError(f"Erro ao ler {url}: {e}")
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options["intervalo"] > 0:
+            anterior = self.ler(options["url"], options["token"])
+        janelas = 0
+        while True:
+            if options["intervalo"] > 0:
+                time.sleep(options["intervalo"])
+            atual = self.ler(options["url"], options["token"])
+            self.imprimir(atual, anterior)
+            janelas += 1
+            if options["intervalo"] <= 0 or janelas == options["repeticoes"]:
+                break
+            anterior = atual
+
+    def imprimir(self, atual: dict, anterior: dict | None) -> None:
+        self.stdout.write(
+            f"{'métrica':<40} {'série':<50} {'n':>7} {'média':>9} "
+            f"{'p50':>9} {'p95':>9} {'p99':>9}"
+        )
+        for (nome, rotulos), serie in sorted(atual.items()):
+            serie = metricas.diferenca(serie, (anterior or {}).get((nome, rotulos)))
+            n = serie["contagem"]
+            if n <= 0:
+                continue
+            p50, p95, p99 = (metricas.quantil(serie["buckets"], q) for q in (0.5, 0.95, 0.99))
+            self.stdout.write(
+                f"{nome:<40} {rotulos:<50} {int(n):>7} {serie['soma'] / n:>9.4f} "
+                f"{p50:>9.4f} {p95:>9.4f} {p99:>9.4f}"
+            )
+        self.stdout.write("")
@@ -0,0 +1,92 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.simulador import DISTRIBUICOES, ConfigSimulador, criar_servidor
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe um servidor local que simula a API do gerenciamento de escala, "
+        "com latência, erros e timeouts configuráveis."
+    )
+
+    def add_arguments(self, parser):
+        url = urlparse(settings.GERENCIAMENTO_ESCALA_API_URL)
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument(
+            "--porta", type=int, default=url.port or 8080,
+            help="Porta (padrão: a de GERENCIAMENTO_ESCALA_API_URL).",
+        )
+        parser.add_argument(
+            "--prefixo", default=url.path or "/",
+            help="Prefixo das rotas (padrão: o caminho de GERENCIAMENTO_ESCALA_API_URL).",
+        )
+        parser.add_argument(
+            "--latencia", choices=DISTRIBUICOES, default="fixa",
+            help="Distribuição da latência de cada resposta.",
+        )
+        parser.add_argument(
+            "--latencia-media", type=float, default=0.0,
+            help="Latência média em milissegundos.",
+        )
+        parser.add_argument(
+            "--latencia-desvio", type=float, default=0.0,
+            help="Desvio padrão da latência em milissegundos (normal e lognormal).",
+        )
+        parser.add_argument(
+            "--taxa-erro", type=float, default=0.0,
+            help="Fração das requisições respondidas com 503 (0 a 1).",
+        )
+        parser.add_argument(
+            "--taxa-timeout", type=float, default=0.0,
+            help="Fração das requisições que ficam sem resposta por --timeout segundos.",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30.0,
+            help="Segundos de espera das requisições sorteadas para timeout.",
+        )
+        parser.add_argument("--contratos", type=int, default=100)
+        parser.add_argument("--fornecedores", type=int, default=10)
+        parser.add_argument("--clientes", type=int, default=30)
+        parser.add_argument(
+            "--seed", type=int, default=None,
+            help="Semente do sorteio de latências e falhas (reprodutível).",
+        )
+
+    def handle(self, *args, **options):
+        for opcao in ("taxa_erro", "taxa_timeout"):
+            if not 0 <= options[opcao] <= 1:
+                raise CommandError(f"--{opcao.replace('_', '-')} deve estar entre 0 e 1.")
+        if min(options["contratos"], options["fornecedores"], options["clientes"]) < 1:
+            raise CommandError("--contratos, --fornecedores e --clientes devem ser positivos.")
+
+        prefixo = "/" + options["prefixo"].strip("/") + "/"
+        config = ConfigSimulador(
+            prefixo=prefixo.replace("//", "/"),
+            latencia=options["latencia"],
+            latencia_media_ms=options["latencia_media"],
+            latencia_desvio_ms=options["latencia_desvio"],
+            taxa_erro=options["taxa_erro"],
+            taxa_timeout=options["taxa_timeout"],
+            timeout_s=options["timeout"],
+            contratos=options["contratos"],
+            fornecedores=options["fornecedores"],
+            clientes=options["clientes"],
+            seed=options["seed"],
+        )
+        servidor = criar_servidor(config, options["host"], options["porta"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Simulador do gerenciamento de escala em "
+                f"http://{options['host']}:{options['porta']}{config.prefixo} "
+                f"(CTRL-C para encerrar)"
+            )
+        )
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+import requests
+
+from core.services import catalogo_service, escala_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Sincroniza fornecedores, clientes e contratos com o gerenciamento de escala. "
+        "Lê páginas (formato Spring Data: `content`/`last`) de contratos com "
+        "`empresaContratante` e `cliFornec` e grava cada página com um upsert por modelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--caminho", default="contratos-cliente",
+            help="Endpoint do catálogo, relativo a GERENCIAMENTO_ESCALA_API_URL.",
+        )
+        parser.add_argument(
+            "--tamanho-pagina", type=int, default=500,
+            help="Registros solicitados por página.",
+        )
+
+    def handle(self, *args, **options):
+        totais = {"fornecedores": 0, "clientes": 0, "contratos": 0}
+        pagina = 0
+        while True:
+            try:
+                response = escala_client.get(
+                    options["caminho"],
+                    params={"page": pagina, "size": options["tamanho_pagina"]},
+                )
+                response.raise_for_status()
+            except requests.RequestException as e:
+                raise CommandError(f"Erro ao consultar o catálogo: {e}")
+
+            dados = response.json()
+            # Aceita tanto uma página do Spring quanto uma lista simples
+            itens = dados.get("content", []) if isinstance(dados, dict) else dados
+            registros = [
+                catalogo_service.registro_de_contrato(item, item["empresaContratante"])
+                for item in itens
+            ]
+            contagem = catalogo_service.sincronizar(
+                registros, settings.GERENCIAMENTO_ESCALA_API_URL
+            )
+            for chave, valor in contagem.items():
+                totais[chave] += valor
+
+            if not isinstance(dados, dict) or dados.get("last", True) or not itens:
+                break
+            pagina += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Catálogo sincronizado (registros gravados): {fornecedores} fornecedor(es), "
+                "{clientes} cliente(s), {contratos} contrato(s).".format(**totais)
+            )
+        )
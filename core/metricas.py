@@ -0,0 +1,237 @@
+"""Métricas de latência em memória, expostas no formato texto do Prometheus.
+
+Os histogramas são por processo (cada worker expõe os seus). A coleta por
+requisição (consultas ao banco, tempo de banco e tempo no sistema de escala)
+fica em uma `ContextVar`, que acompanha a requisição também nas threads de
+`sync_to_async`.
+"""
+
+import math
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...], buckets):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos) -> None:
+        chave = tuple(str(rotulos[r]) for r in self.rotulos)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                # [contagens por bucket..., +Inf], soma
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[0][-1] += 1
+            serie[1] += valor
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+        for chave, (contagens, soma) in sorted(series.items()):
+            base = ",".join(f'{r}="{v}"' for r, v in zip(self.rotulos, chave))
+            sep = "," if base else ""
+            for limite, contagem in zip(self.buckets + ("+Inf",), contagens):
+                linhas.append(f'{self.nome}_bucket{{{base}{sep}le="{limite}"}} {contagem}')
+            linhas.append(f"{self.nome}_sum{{{base}}} {soma}")
+            linhas.append(f"{self.nome}_count{{{base}}} {contagens[-1]}")
+        return linhas
+
+
+class Contador:
+    TIPO = "counter"
+
+    def __init__(self, nome: str, ajuda: str, coletar):
+        self.nome = nome
+        self.ajuda = ajuda
+        # coletar() -> iterável de (rótulos: dict, valor)
+        self.coletar = coletar
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.TIPO}"]
+        for rotulos, valor in self.coletar():
+            base = ",".join(f'{r}="{v}"' for r, v in rotulos.items())
+            linhas.append(f"{self.nome}{{{base}}} {valor}")
+        return linhas
+
+
+class Medidor(Contador):
+    """Valor instantâneo (gauge), lido a cada exportação."""
+
+    TIPO = "gauge"
+
+
+VIEW_DURACAO = Histograma(
+    "escala_view_duracao_segundos",
+    "Tempo total de resposta por view.",
+    ("view", "metodo"),
+    BUCKETS_SEGUNDOS,
+)
+VIEW_DB_CONSULTAS = Histograma(
+    "escala_view_db_consultas",
+    "Consultas ao banco por requisição.",
+    ("view", "metodo"),
+    BUCKETS_CONSULTAS,
+)
+VIEW_DB_DURACAO = Histograma(
+    "escala_view_db_duracao_segundos",
+    "Tempo gasto no banco por requisição.",
+    ("view", "metodo"),
+    BUCKETS_SEGUNDOS,
+)
+VIEW_UPSTREAM_DURACAO = Histograma(
+    "escala_view_upstream_duracao_segundos",
+    "Tempo gasto no sistema de escala por requisição.",
+    ("view", "metodo"),
+    BUCKETS_SEGUNDOS,
+)
+UPSTREAM_DURACAO = Histograma(
+    "escala_upstream_duracao_segundos",
+    "Duração das chamadas ao sistema de escala.",
+    ("endpoint", "metodo", "status"),
+    BUCKETS_SEGUNDOS,
+)
+
+REGISTRO: list = [
+    VIEW_DURACAO,
+    VIEW_DB_CONSULTAS,
+    VIEW_DB_DURACAO,
+    VIEW_UPSTREAM_DURACAO,
+    UPSTREAM_DURACAO,
+]
+
+
+def registrar(metrica) -> None:
+    REGISTRO.append(metrica)
+
+
+def exportar_prometheus() -> str:
+    linhas = []
+    for metrica in REGISTRO:
+        linhas.extend(metrica.exportar())
+    return "\n".join(linhas) + "\n"
+
+
+@dataclass
+class Coleta:
+    consultas: int = 0
+    db_segundos: float = 0.0
+    upstream_segundos: float = 0.0
+
+
+coleta_atual: ContextVar[Coleta | None] = ContextVar("coleta_atual", default=None)
+
+
+def medir_consulta(execute, sql, params, many, context):
+    """`execute_wrapper` instalado em toda conexão (ver `core.signals`)."""
+    coleta = coleta_atual.get()
+    if coleta is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        coleta.consultas += 1
+        coleta.db_segundos += time.perf_counter() - inicio
+
+
+# Rótulos estáveis para os endpoints do sistema de escala (sem o token na URL)
+ENDPOINTS = {
+    "solicitacao-token/validar/": "validar",
+    "solicitacao-token/utilizar/": "utilizar",
+    "solicitacoes/criar": "solicitacoes/criar",
+}
+
+
+def nome_endpoint(caminho: str) -> str:
+    for prefixo, nome in ENDPOINTS.items():
+        if caminho.startswith(prefixo):
+            return nome
+    return caminho.split("?")[0].split("/")[0]
+
+
+def registrar_upstream(caminho: str, metodo: str, status, duracao: float) -> None:
+    UPSTREAM_DURACAO.observar(
+        duracao, endpoint=nome_endpoint(caminho), metodo=metodo, status=status
+    )
+    coleta = coleta_atual.get()
+    if coleta is not None:
+        coleta.upstream_segundos += duracao
+
+
+def quantil(buckets: list[tuple[float, float]], q: float) -> float:
+    """Estima o quantil `q` por interpolação linear dentro do bucket, como o
+    `histogram_quantile` do Prometheus. `buckets`: [(limite, acumulado), ...]."""
+    if not buckets or buckets[-1][1] <= 0:
+        return math.nan
+    alvo = q * buckets[-1][1]
+    limite_anterior, acumulado_anterior = 0.0, 0.0
+    for limite, acumulado in buckets:
+        if acumulado >= alvo:
+            if math.isinf(limite):
+                return limite_anterior
+            if acumulado == acumulado_anterior:
+                return limite
+            fracao = (alvo - acumulado_anterior) / (acumulado - acumulado_anterior)
+            return limite_anterior + (limite - limite_anterior) * fracao
+        limite_anterior, acumulado_anterior = limite, acumulado
+    return limite_anterior
+
+
+_LINHA = re.compile(r"^(?P<nome>[a-zA-Z_:][\w:]*)(?:\{(?P<rotulos>.*)\})? (?P<valor>\S+)$")
+_ROTULO = re.compile(r'(\w+)="([^"]*)"')
+
+
+def ler_histogramas(texto: str) -> dict[tuple[str, str], dict]:
+    """Lê histogramas do formato texto do Prometheus.
+
+    Retorna {(nome, rótulos): {"buckets": [(limite, acumulado)], "soma", "contagem"}}.
+    """
+    series: dict[tuple[str, str], dict] = {}
+    for linha in texto.splitlines():
+        m = _LINHA.match(linha)
+        if not m or linha.startswith("#"):
+            continue
+        nome, valor = m["nome"], float(m["valor"])
+        rotulos = dict(_ROTULO.findall(m["rotulos"] or ""))
+        le = rotulos.pop("le", None)
+        base = ",".join(f"{k}={v}" for k, v in rotulos.items())
+        for sufixo, campo in (("_bucket", "buckets"), ("_sum", "soma"), ("_count", "contagem")):
+            if nome.endswith(sufixo):
+                serie = series.setdefault(
+                    (nome[: -len(sufixo)], base),
+                    {"buckets": [], "soma": 0.0, "contagem": 0.0},
+                )
+                if campo == "buckets":
+                    serie["buckets"].append((float(le), valor))
+                else:
+                    serie[campo] = valor
+                break
+    return series
+
+
+def diferenca(atual: dict, anterior: dict | None) -> dict:
+    """Série `atual` menos `anterior` (janela entre duas leituras)."""
+    if not anterior:
+        return atual
+    buckets_anteriores = dict(anterior["buckets"])
+    return {
+        "buckets": [(le, v - buckets_anteriores.get(le, 0.0)) for le, v in atual["buckets"]],
+        "soma": atual["soma"] - anterior["soma"],
+        "contagem": atual["contagem"] - anterior["contagem"],
+    }
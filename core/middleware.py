@@ -0,0 +1,129 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from core import metricas, roteador
+from core.contexto import carregar_contexto
+from core.services.escopo_service import obter_escopo
+
+
+class UsuarioContextMiddleware:
+    """Disponibiliza `request.usuario_contexto` e `request.escopo`, carregados
+    sob demanda uma única vez por requisição. Deve vir depois do
+    `AuthenticationMiddleware`.
+
+    Funciona nos modos síncrono e assíncrono; views assíncronas não devem
+    avaliar esses objetos (usam `acarregar_contexto`)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._preparar(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._preparar(request)
+        return await self.get_response(request)
+
+    def _preparar(self, request):
+        request.usuario_contexto = SimpleLazyObject(
+            lambda: carregar_contexto(request.user)
+        )
+        request.escopo = SimpleLazyObject(lambda: obter_escopo(request.user))
+
+
+class MetricasMiddleware:
+    """Registra, por view, tempo total, consultas e tempo de banco e tempo no
+    sistema de escala. Deve ser o primeiro middleware da lista."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        coleta, marca, inicio = self._iniciar()
+        try:
+            return self.get_response(request)
+        finally:
+            self._finalizar(request, coleta, marca, inicio)
+
+    async def __acall__(self, request):
+        coleta, marca, inicio = self._iniciar()
+        try:
+            return await self.get_response(request)
+        finally:
+            self._finalizar(request, coleta, marca, inicio)
+
+    def _iniciar(self):
+        coleta = metricas.Coleta()
+        return coleta, metricas.coleta_atual.set(coleta), time.perf_counter()
+
+    def _finalizar(self, request, coleta, marca, inicio):
+        duracao = time.perf_counter() - inicio
+        metricas.coleta_atual.reset(marca)
+        match = getattr(request, "resolver_match", None)
+        rotulos = {
+            "view": match.view_name if match else "nao_encontrada",
+            "metodo": request.method,
+        }
+        metricas.VIEW_DURACAO.observar(duracao, **rotulos)
+        metricas.VIEW_DB_CONSULTAS.observar(coleta.consultas, **rotulos)
+        metricas.VIEW_DB_DURACAO.observar(coleta.db_segundos, **rotulos)
+        metricas.VIEW_UPSTREAM_DURACAO.observar(coleta.upstream_segundos, **rotulos)
+
+
+class ReplicaMiddleware:
+    """Libera leituras na réplica durante a requisição (core.roteador) e, se a
+    requisição escreveu no banco, marca o navegador com um cookie para que as
+    próximas requisições leiam do primário por `BANCO_PRIMARIO_APOS_ESCRITA`
+    segundos. Deve vir logo depois do `MetricasMiddleware`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with roteador.leituras_na_replica(self._fixado(request)) as estado:
+            response = self.get_response(request)
+        return self._marcar(response, estado)
+
+    async def __acall__(self, request):
+        with roteador.leituras_na_replica(self._fixado(request)) as estado:
+            response = await self.get_response(request)
+        return self._marcar(response, estado)
+
+    def _fixado(self, request) -> bool:
+        return roteador.COOKIE_PRIMARIO in request.COOKIES
+
+    def _marcar(self, response, estado):
+        if estado.escreveu:
+            response.set_cookie(
+                roteador.COOKIE_PRIMARIO,
+                "1",
+                max_age=settings.BANCO_PRIMARIO_APOS_ESCRITA,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-17 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_enviosolicitacao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitacao',
+            index=models.Index(fields=['fornecedor', '-data_solicitacao', '-id'], name='solicitacao_forn_data_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-17 13:47
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def unificar_cnpjs_duplicados(apps, schema_editor):
+    """Mantém o registro mais antigo de cada CNPJ e aponta para ele os
+    contratos e solicitações dos duplicados, antes de criar o índice único."""
+    Contrato = apps.get_model("core", "Contrato")
+    Solicitacao = apps.get_model("core", "Solicitacao")
+
+    for nome_modelo, campo_fk in (("Cliente", "cliente"), ("Fornecedor", "fornecedor")):
+        Modelo = apps.get_model("core", nome_modelo)
+        duplicados = (
+            Modelo.objects.values("cnpj")
+            .annotate(total=Count("id"), manter=Min("id"))
+            .filter(total__gt=1)
+        )
+        for dup in duplicados:
+            remover = list(
+                Modelo.objects.filter(cnpj=dup["cnpj"])
+                .exclude(id=dup["manter"])
+                .values_list("id", flat=True)
+            )
+            for Relacionado in (Contrato, Solicitacao):
+                Relacionado.objects.filter(**{f"{campo_fk}_id__in": remover}).update(
+                    **{f"{campo_fk}_id": dup["manter"]}
+                )
+            Modelo.objects.filter(id__in=remover).delete()
+
+    if schema_editor.connection.vendor == "postgresql":
+        # Dispara agora as FKs adiadas; o ALTER TABLE seguinte não aceita eventos pendentes
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_solicitacao_forn_data_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar_cnpjs_duplicados, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cliente',
+            name='cnpj',
+            field=models.CharField(max_length=18, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='fornecedor',
+            name='cnpj',
+            field=models.CharField(max_length=18, unique=True),
+        ),
+    ]
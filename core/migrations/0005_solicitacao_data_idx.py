@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_cnpj_unico'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitacao',
+            index=models.Index(fields=['-data_solicitacao', '-id'], name='solicitacao_data_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:06
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# pg_trgm faz parte do contrib do PostgreSQL, mas nem toda instalação o
+# disponibiliza; sem ele a busca usa apenas o tsvector
+CRIAR_INDICE_TRIGRAMA = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS solicitacao_tipo_trgm_idx
+            ON core_solicitacao USING gin (tipo_profissional gin_trgm_ops);
+    END IF;
+END
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_solicitacao_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitacao',
+            name='busca',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('tipo_profissional', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector('jornada', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('observacoes', config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='solicitacao',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='solicitacao_busca_idx'),
+        ),
+        migrations.RunSQL(
+            CRIAR_INDICE_TRIGRAMA,
+            "DROP INDEX IF EXISTS solicitacao_tipo_trgm_idx;",
+        ),
+        # Sem estatísticas da coluna nova o planejador subestima termos comuns
+        # e lê todas as ocorrências pelo índice GIN em vez de seguir a data
+        migrations.RunSQL("ANALYZE core_solicitacao;", migrations.RunSQL.noop),
+    ]
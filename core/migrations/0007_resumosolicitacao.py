@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_solicitacao_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoSolicitacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('tipo_profissional', models.CharField(max_length=100)),
+                ('total', models.IntegerField(default=0)),
+                ('fornecedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.fornecedor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fornecedor', 'mes', 'tipo_profissional'), name='resumo_solicitacao_unico')],
+            },
+        ),
+    ]
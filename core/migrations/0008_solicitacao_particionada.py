@@ -0,0 +1,188 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:14
+
+from datetime import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Converte core_solicitacao em tabela particionada por mês de data_solicitacao
+# (PostgreSQL). Chaves primárias e únicas de tabelas particionadas precisam
+# incluir a coluna de partição: a PK passa a ser (id, data_solicitacao), com o
+# id ainda vindo de uma sequência, e FKs que apontam para solicitações ficam
+# sem constraint no banco. Reescreve a tabela inteira: em bases grandes, rodar
+# em janela de manutenção.
+#
+# Depois desta migração o banco não garante mais que o id seja único sozinho:
+# só o par (id, data_solicitacao) é. A sequência continua sendo a única fonte
+# de ids; inserções com id explícito (cargas, restaurações) precisam evitar
+# repetições. A reversão (`desparticionar`) volta a uma tabela comum com PK
+# (id) e falha, sem alterar nada, se houver ids repetidos.
+TABELA = "core_solicitacao"
+LEGADO = "core_solicitacao_legado"
+MESES_FUTUROS = 3
+
+
+def _mes_seguinte(mes):
+    return datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1, tzinfo=mes.tzinfo)
+
+
+def particionar(apps, schema_editor):
+    conexao = schema_editor.connection
+    if conexao.vendor != "postgresql":
+        return
+    q = conexao.ops.quote_name
+    with conexao.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+            """,
+            [TABELA],
+        )
+        indices = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABELA],
+        )
+        fks = cursor.fetchall()
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s "
+            "AND is_generated = 'NEVER' ORDER BY ordinal_position",
+            [TABELA],
+        )
+        colunas = ", ".join(q(nome) for (nome,) in cursor.fetchall())
+
+        # Índices (com seus nomes) e a PK saem da tabela antiga, que só é lida
+        for nome, _ in indices:
+            cursor.execute(f"DROP INDEX {q(nome)}")
+        cursor.execute(f"ALTER TABLE {q(TABELA)} RENAME TO {q(LEGADO)}")
+        cursor.execute(
+            f"CREATE TABLE {q(TABELA)} (LIKE {q(LEGADO)} INCLUDING DEFAULTS INCLUDING GENERATED) "
+            "PARTITION BY RANGE (data_solicitacao)"
+        )
+
+        fuso = timezone.get_current_timezone()
+        cursor.execute(f"SELECT min(data_solicitacao) FROM {q(LEGADO)}")
+        agora = timezone.localtime(timezone.now(), fuso)
+        primeiro = timezone.localtime(cursor.fetchone()[0] or agora, fuso)
+        mes = datetime(primeiro.year, primeiro.month, 1, tzinfo=fuso)
+        fim = datetime(agora.year, agora.month, 1, tzinfo=fuso)
+        for _ in range(MESES_FUTUROS):
+            fim = _mes_seguinte(fim)
+        while mes <= fim:
+            proximo = _mes_seguinte(mes)
+            cursor.execute(
+                f"CREATE TABLE {q(f'{TABELA}_p{mes:%Y%m}')} PARTITION OF {q(TABELA)} "
+                f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{proximo.isoformat()}')"
+            )
+            mes = proximo
+        cursor.execute(f"CREATE TABLE {q(f'{TABELA}_padrao')} PARTITION OF {q(TABELA)} DEFAULT")
+
+        cursor.execute(
+            f"INSERT INTO {q(TABELA)} ({colunas}) SELECT {colunas} FROM {q(LEGADO)}"
+        )
+        cursor.execute(f"DROP TABLE {q(LEGADO)}")
+
+        sequencia = f"{TABELA}_id_seq"
+        cursor.execute(f"CREATE SEQUENCE {q(sequencia)} AS bigint OWNED BY {q(TABELA)}.id")
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE(max(id), 0) + 1, false) FROM {q(TABELA)}", [sequencia]
+        )
+        cursor.execute(
+            f"ALTER TABLE {q(TABELA)} ALTER COLUMN id SET DEFAULT nextval('{sequencia}'::regclass)"
+        )
+
+        cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        cursor.execute(
+            f"ALTER TABLE {q(TABELA)} ADD CONSTRAINT {q(f'{TABELA}_pkey')} "
+            "PRIMARY KEY (id, data_solicitacao)"
+        )
+        for _, definicao in indices:
+            cursor.execute(definicao)
+        for nome, definicao in fks:
+            cursor.execute(f"ALTER TABLE {q(TABELA)} ADD CONSTRAINT {q(nome)} {definicao}")
+        cursor.execute(f"ANALYZE {q(TABELA)}")
+
+
+def desparticionar(apps, schema_editor):
+    conexao = schema_editor.connection
+    if conexao.vendor != "postgresql":
+        return
+    q = conexao.ops.quote_name
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+            """,
+            [TABELA],
+        )
+        indices = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABELA],
+        )
+        fks = cursor.fetchall()
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s "
+            "AND is_generated = 'NEVER' ORDER BY ordinal_position",
+            [TABELA],
+        )
+        colunas = ", ".join(q(nome) for (nome,) in cursor.fetchall())
+
+        for nome, _ in indices:
+            cursor.execute(f"DROP INDEX {q(nome)}")
+        cursor.execute(f"ALTER TABLE {q(TABELA)} RENAME TO {q(LEGADO)}")
+        cursor.execute(
+            f"CREATE TABLE {q(TABELA)} (LIKE {q(LEGADO)} INCLUDING DEFAULTS INCLUDING GENERATED)"
+        )
+        cursor.execute(
+            f"INSERT INTO {q(TABELA)} ({colunas}) SELECT {colunas} FROM {q(LEGADO)}"
+        )
+        # O id volta a ser identity, como o Django cria; a sequência da
+        # particionada sai junto com ela
+        cursor.execute(f"ALTER TABLE {q(TABELA)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"DROP TABLE {q(LEGADO)}")
+        cursor.execute(
+            f"ALTER TABLE {q(TABELA)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(max(id), 0) + 1, false) "
+            f"FROM {q(TABELA)}",
+            [TABELA],
+        )
+
+        cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        # Falha (e a transação desfaz tudo) se houver ids repetidos
+        cursor.execute(
+            f"ALTER TABLE {q(TABELA)} ADD CONSTRAINT {q(f'{TABELA}_pkey')} PRIMARY KEY (id)"
+        )
+        for _, definicao in indices:
+            cursor.execute(definicao)
+        for nome, definicao in fks:
+            cursor.execute(f"ALTER TABLE {q(TABELA)} ADD CONSTRAINT {q(nome)} {definicao}")
+        cursor.execute(f"ANALYZE {q(TABELA)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_resumosolicitacao'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='enviosolicitacao',
+            name='solicitacao',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='envio', to='core.solicitacao'),
+        ),
+        migrations.RunPython(particionar, desparticionar),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:22
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_solicitacao_particionada'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nome'), name='text_pattern_ops'), name='cliente_nome_prefixo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fornecedor',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nome'), name='text_pattern_ops'), name='fornecedor_nome_prefixo_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-17 15:02
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_nome_prefixo_idx'),
+    ]
+
+    # A coluna entra sem default: um default calculado uma vez daria a mesma
+    # chave a todos os envios existentes e violaria a unicidade
+    operations = [
+        migrations.AddField(
+            model_name='enviosolicitacao',
+            name='chave_idempotencia',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='enviosolicitacao',
+            name='chave_idempotencia',
+            field=models.UUIDField(blank=True, default=uuid.uuid4, editable=False, null=True, unique=True),
+        ),
+    ]
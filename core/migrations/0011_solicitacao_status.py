@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-17 15:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_enviosolicitacao_chave_idempotencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoStatus',
+            fields=[
+                ('id', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('recebido_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='solicitacao',
+            name='status',
+            field=models.CharField(choices=[('aguardando', 'Aguardando retorno'), ('aceita', 'Aceita'), ('alocada', 'Profissional alocado'), ('rejeitada', 'Rejeitada'), ('cancelada', 'Cancelada')], db_default='aguardando', default='aguardando', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='solicitacao',
+            name='versao_status',
+            field=models.PositiveIntegerField(db_default=0, default=0),
+        ),
+    ]
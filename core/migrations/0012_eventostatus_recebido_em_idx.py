@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-17 14:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_solicitacao_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventostatus',
+            name='recebido_em',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+# Contratos sincronizados antes da correção de catalogo_service.sincronizar
+# deixaram a sequência do id para trás dos ids vindos do sistema de escala
+AVANCAR = """
+SELECT setval(
+    pg_get_serial_sequence('core_contrato', 'id'),
+    COALESCE((SELECT MAX(id) FROM core_contrato), 1),
+    (SELECT MAX(id) FROM core_contrato) IS NOT NULL
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_eventostatus_recebido_em_idx"),
+    ]
+
+    operations = [
+        migrations.RunSQL(AVANCAR, migrations.RunSQL.noop),
+    ]
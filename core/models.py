@@ -1,4 +1,10 @@
+import uuid
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -8,10 +14,19 @@ class Fornecedor(
 ):  # armazena informações sobre os fornecedores, que são empresas que oferecem serviços para o cliente
     id = models.AutoField(primary_key=True)
     nome = models.CharField(max_length=100)
-    cnpj = models.CharField(max_length=18)
+    cnpj = models.CharField(max_length=18, unique=True)
     email = models.EmailField()
     url_sistema = models.URLField()
 
+    class Meta:
+        indexes = [
+            # Busca por início do nome (`nome__istartswith`, "^nome" no admin)
+            models.Index(
+                OpClass(Upper("nome"), name="text_pattern_ops"),
+                name="fornecedor_nome_prefixo_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.nome
 
@@ -22,10 +37,18 @@ class Cliente(
 ):  # armazena informações sobre o cliente, terá apenas um registro
     id = models.AutoField(primary_key=True)
     nome = models.CharField(max_length=100)
-    cnpj = models.CharField(max_length=18)
+    cnpj = models.CharField(max_length=18, unique=True)
     email = models.EmailField()
     telefone = models.CharField(max_length=20)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                OpClass(Upper("nome"), name="text_pattern_ops"),
+                name="cliente_nome_prefixo_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.nome
 
@@ -65,6 +88,19 @@ class TokenSolicitacao(models.Model):
 
 # (Solicitacao no gerenciamento de escala)
 class Solicitacao(models.Model):
+    AGUARDANDO = "aguardando"
+    ACEITA = "aceita"
+    ALOCADA = "alocada"
+    REJEITADA = "rejeitada"
+    CANCELADA = "cancelada"
+    STATUS_CHOICES = [
+        (AGUARDANDO, "Aguardando retorno"),
+        (ACEITA, "Aceita"),
+        (ALOCADA, "Profissional alocado"),
+        (REJEITADA, "Rejeitada"),
+        (CANCELADA, "Cancelada"),
+    ]
+
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE)
     fornecedor = models.ForeignKey(Fornecedor, on_delete=models.CASCADE)
     contrato = models.ForeignKey(Contrato, on_delete=models.CASCADE)
@@ -74,6 +110,114 @@ class Solicitacao(models.Model):
     tipo_profissional = models.CharField(max_length=100)
     jornada = models.CharField(max_length=100)
     observacoes = models.TextField(blank=True)
+    # Informado pelo sistema de escala (webhook, core.services.status_service);
+    # versao_status descarta eventos que chegam fora de ordem. Defaults também
+    # no banco: a carga por COPY (core.sintetico) não envia estas colunas
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=AGUARDANDO, db_default=AGUARDANDO
+    )
+    versao_status = models.PositiveIntegerField(default=0, db_default=0)
+
+    # Busca textual (core.services.busca_service), calculada pelo próprio banco
+    busca = models.GeneratedField(
+        expression=SearchVector("tipo_profissional", weight="A", config="portuguese")
+        + SearchVector("jornada", weight="B", config="portuguese")
+        + SearchVector("observacoes", weight="C", config="portuguese"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        # No PostgreSQL a tabela é particionada por mês de data_solicitacao
+        # (migração 0008, core.services.particao_service).
+        # O índice de trigramas em tipo_profissional (pg_trgm) é criado na
+        # migração 0006 apenas quando a extensão está disponível
+        indexes = [
+            # Listagem paginada por cursor: fornecedor + (data_solicitacao, id) decrescentes
+            models.Index(
+                fields=["fornecedor", "-data_solicitacao", "-id"],
+                name="solicitacao_forn_data_idx",
+            ),
+            # Admin: ordenação padrão e min/max da hierarquia de datas
+            models.Index(
+                fields=["-data_solicitacao", "-id"],
+                name="solicitacao_data_idx",
+            ),
+            GinIndex(fields=["busca"], name="solicitacao_busca_idx"),
+        ]
 
     def __str__(self):
         return f"Solicitação de {self.cliente.nome} para {self.fornecedor.nome}"
+
+
+# Outbox de envio para o gerenciamento de escala (gravado na mesma transação da Solicitacao)
+class EnvioSolicitacao(models.Model):
+    PENDENTE = "pendente"
+    ENVIADO = "enviado"
+    FALHOU = "falhou"
+    STATUS_CHOICES = [
+        (PENDENTE, "Pendente"),
+        (ENVIADO, "Enviado"),
+        (FALHOU, "Falhou"),
+    ]
+
+    # Sem FK no banco: a tabela de solicitações é particionada por data e a
+    # chave primária é (id, data_solicitacao) (migração 0008)
+    solicitacao = models.OneToOneField(
+        Solicitacao, on_delete=models.CASCADE, related_name="envio", db_constraint=False
+    )
+    payload = models.JSONField()
+    # Gerada no formulário: repetições do mesmo envio (duplo clique, reenvio
+    # do navegador) esbarram na unicidade. Vai ao sistema de escala no
+    # cabeçalho Idempotency-Key; nula nos envios anteriores à migração 0010
+    chave_idempotencia = models.UUIDField(
+        null=True, blank=True, unique=True, default=uuid.uuid4, editable=False
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDENTE)
+    tentativas = models.PositiveIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    ultimo_erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["proxima_tentativa"],
+                condition=models.Q(status="pendente"),
+                name="envio_pendente_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Envio da solicitação {self.solicitacao_id} ({self.status})"
+
+
+# Eventos de status já recebidos pelo webhook, para descartar reentregas
+class EventoStatus(models.Model):
+    id = models.CharField(primary_key=True, max_length=100)
+    # Limpeza dos antigos: `limpar_eventos_status`
+    recebido_em = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.id
+
+
+# Totais de solicitações por fornecedor x tipo profissional x mês, mantidos
+# incrementalmente (core.services.resumo_service) para o painel
+class ResumoSolicitacao(models.Model):
+    fornecedor = models.ForeignKey(Fornecedor, on_delete=models.CASCADE)
+    mes = models.DateField()  # primeiro dia do mês
+    tipo_profissional = models.CharField(max_length=100)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fornecedor", "mes", "tipo_profissional"],
+                name="resumo_solicitacao_unico",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.fornecedor_id} {self.mes:%m/%Y} {self.tipo_profissional}: {self.total}"
@@ -0,0 +1,120 @@
+"""Paginação por cursor (keyset) ordenada por `(data_solicitacao, id)` decrescente.
+
+O cursor codifica a chave do último/primeiro item da página, então cada página
+é uma varredura de intervalo no índice, com o mesmo custo em qualquer
+profundidade.
+
+`PaginadorEstimado` (admin) troca o `COUNT(*)` exato pela estimativa do
+planejador do PostgreSQL quando o resultado é grande.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+@dataclass
+class PaginaCursor:
+    itens: list = field(default_factory=list)
+    proximo: str | None = None
+    anterior: str | None = None
+
+
+def codificar_cursor(data: datetime, pk: int) -> str:
+    bruto = f"{data.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        data, pk = bruto.split("|")
+        return datetime.fromisoformat(data), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _cursor_de(item) -> str:
+    return codificar_cursor(item.data_solicitacao, item.pk)
+
+
+def paginar(
+    queryset: QuerySet,
+    tamanho: int,
+    depois: str | None = None,
+    antes: str | None = None,
+) -> PaginaCursor:
+    """Página de `tamanho` itens após o cursor `depois` (mais antigos) ou
+    antes do cursor `antes` (mais recentes). Sem cursor, retorna a primeira."""
+    chave_antes = decodificar_cursor(antes) if antes else None
+    chave_depois = decodificar_cursor(depois) if depois else None
+
+    if chave_antes:
+        data, pk = chave_antes
+        itens = list(
+            queryset.filter(data_solicitacao__gte=data)
+            .exclude(data_solicitacao=data, id__lte=pk)
+            .order_by("data_solicitacao", "id")[: tamanho + 1]
+        )
+        ha_mais = len(itens) > tamanho
+        itens = itens[:tamanho][::-1]
+        return PaginaCursor(
+            itens=itens,
+            anterior=_cursor_de(itens[0]) if ha_mais else None,
+            proximo=_cursor_de(itens[-1]) if itens else None,
+        )
+
+    if chave_depois:
+        data, pk = chave_depois
+        queryset = queryset.filter(data_solicitacao__lte=data).exclude(
+            data_solicitacao=data, id__gte=pk
+        )
+    itens = list(queryset.order_by("-data_solicitacao", "-id")[: tamanho + 1])
+    ha_mais = len(itens) > tamanho
+    itens = itens[:tamanho]
+    return PaginaCursor(
+        itens=itens,
+        proximo=_cursor_de(itens[-1]) if ha_mais else None,
+        anterior=_cursor_de(itens[0]) if chave_depois and itens else None,
+    )
+
+
+def estimar_linhas(queryset: QuerySet) -> int | None:
+    """Linhas estimadas pelo planejador (`EXPLAIN`) para o queryset; None fora
+    do PostgreSQL."""
+    conexao = connections[queryset.db]
+    if conexao.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return 0
+    with conexao.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]["Plan"]["Plan Rows"])
+
+
+class PaginadorEstimado(Paginator):
+    """Usa a estimativa do planejador como total quando ela passa de
+    `ADMIN_CONTAGEM_EXATA_LIMITE`; abaixo disso, conta exatamente. Com a
+    estimativa, as últimas páginas podem vir vazias ou faltar."""
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimativa = estimar_linhas(self.object_list)
+            if estimativa is not None and estimativa > settings.ADMIN_CONTAGEM_EXATA_LIMITE:
+                return estimativa
+        return super().count
@@ -0,0 +1,122 @@
+"""Roteamento de leituras para a réplica do banco (DATABASE_ROUTERS).
+
+Dentro de uma requisição (ver `ReplicaMiddleware`) as leituras vão para o
+alias `BANCO_REPLICA`, exceto:
+
+- depois da primeira escrita da requisição, e nas requisições seguintes do
+  mesmo navegador por `BANCO_PRIMARIO_APOS_ESCRITA` segundos (cookie), para
+  que o usuário veja o que acabou de gravar (ex.: a listagem após o redirect);
+- dentro de transações do banco primário;
+- quando o atraso da réplica passa de `BANCO_REPLICA_ATRASO_MAX` segundos
+  ou ela não responde.
+
+Fora de requisições (comandos, shell) tudo vai para o primário, a não ser
+dentro de `leituras_na_replica()`. Sem o alias configurado, o roteador não
+interfere.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+COOKIE_PRIMARIO = "usar_primario"
+
+# Sessões sempre no primário: uma sessão encerrada (logout) não pode continuar
+# valendo na réplica enquanto ela não se atualiza
+APPS_SO_PRIMARIO = {"sessions"}
+
+# Atraso de replicação em segundos; 0 quando a réplica já aplicou todo o WAL
+# recebido (pg_last_xact_replay_timestamp fica parado sem escritas no primário)
+_SQL_ATRASO = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+@dataclass
+class Estado:
+    primario: bool = False  # leituras no primário até o fim do escopo
+    escreveu: bool = False
+
+
+_estado: ContextVar[Estado | None] = ContextVar("estado_replica", default=None)
+
+
+@contextmanager
+def leituras_na_replica(primario: bool = False):
+    """Permite leituras na réplica no bloco; `primario=True` já começa fixado
+    no primário. Gera o `Estado` do bloco (ex.: para saber se houve escrita)."""
+    estado = Estado(primario=primario)
+    marca = _estado.set(estado)
+    try:
+        yield estado
+    finally:
+        _estado.reset(marca)
+
+
+def replica_configurada() -> str | None:
+    alias = getattr(settings, "BANCO_REPLICA", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def atraso(alias: str) -> float:
+    """Atraso da réplica em segundos (infinito se ela não responder), com
+    cache de `BANCO_REPLICA_ATRASO_VERIFICACAO` segundos."""
+    cache = caches[settings.BANCO_REPLICA_CACHE]
+    chave = f"banco:atraso:{alias}"
+    valor = cache.get(chave)
+    if valor is None:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(_SQL_ATRASO)
+                valor = float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning("Réplica %s indisponível; lendo do primário", alias, exc_info=True)
+            valor = float("inf")
+        cache.set(chave, valor, settings.BANCO_REPLICA_ATRASO_VERIFICACAO)
+    return valor
+
+
+class RoteadorReplica:
+    def db_for_read(self, model, **hints):
+        alias = replica_configurada()
+        if alias is None:
+            return None
+        # Retorna o primário explicitamente: com None o Django usaria o banco
+        # de onde veio a instância da dica (ex.: objetos lidos da réplica)
+        estado = _estado.get()
+        if estado is None or estado.primario or model._meta.app_label in APPS_SO_PRIMARIO:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if atraso(alias) > settings.BANCO_REPLICA_ATRASO_MAX:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.primario = estado.escreveu = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {DEFAULT_DB_ALIAS, replica_configurada()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe o esquema pela replicação
+        if db == replica_configurada():
+            return False
+        return None
@@ -0,0 +1,67 @@
+"""Busca textual em solicitações (PostgreSQL).
+
+`Solicitacao.busca` é um tsvector gerado pelo banco (configuração `portuguese`)
+com pesos para tipo_profissional (A), jornada (B) e observacoes (C), indexado
+com GIN. Com a extensão pg_trgm instalada, `tipo_profissional` também casa por
+similaridade de trigramas (erros de digitação), com índice GIN próprio.
+"""
+
+from functools import cache
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Q, QuerySet
+
+CONFIG = "portuguese"
+
+
+@cache
+def trigrama_disponivel(alias: str = DEFAULT_DB_ALIAS) -> bool:
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def normalizar(termo: str | None) -> str:
+    return (termo or "").strip()[: settings.BUSCA_TERMO_MAX]
+
+
+def consulta(termo: str) -> SearchQuery:
+    # Sintaxe de buscador: "frase exata", OR, -excluir
+    return SearchQuery(termo, config=CONFIG, search_type="websearch")
+
+
+def filtro(termo: str, alias: str = DEFAULT_DB_ALIAS) -> Q:
+    condicao = Q(busca=consulta(termo))
+    if trigrama_disponivel(alias):
+        condicao |= Q(tipo_profissional__trigram_similar=termo)
+    return condicao
+
+
+def buscar(queryset: QuerySet, termo: str, limite: int) -> list:
+    """As `limite` solicitações mais relevantes para `termo`.
+
+    A relevância é calculada só para as `BUSCA_CANDIDATOS` ocorrências mais
+    recentes: termos comuns casam com milhões de linhas, e ordenar todas por
+    relevância custaria uma leitura completa delas."""
+    candidatos = list(
+        queryset.filter(filtro(termo, queryset.db))
+        .order_by("-data_solicitacao", "-id")
+        .values_list("pk", "data_solicitacao")[: settings.BUSCA_CANDIDATOS]
+    )
+    if not candidatos:
+        return []
+    relevancia = SearchRank(F("busca"), consulta(termo))
+    if trigrama_disponivel(queryset.db):
+        relevancia = relevancia + TrigramSimilarity("tipo_profissional", termo)
+    # O limite de data restringe a busca por id às partições (meses) dos
+    # candidatos; sem ele cada id é procurado em todas as partições
+    return list(
+        queryset.filter(
+            pk__in=[pk for pk, _ in candidatos],
+            data_solicitacao__gte=min(data for _, data in candidatos),
+        )
+        .annotate(relevancia=relevancia)
+        .order_by("-relevancia", "-data_solicitacao", "-id")[:limite]
+    )
@@ -0,0 +1,113 @@
+"""Sincronização do catálogo local (Fornecedor, Cliente, Contrato) com o
+gerenciamento de escala.
+
+Cada modelo é gravado com um único `INSERT ... ON CONFLICT DO UPDATE` por lote,
+usando os índices únicos de CNPJ (e o id do contrato no sistema de escala).
+Como os contratos recebem o id do sistema de escala, a sequência local é
+avançada depois do lote para que contratos criados aqui (admin, testes) não
+colidam com eles.
+"""
+
+from typing import Any, Iterable
+
+from django.db import connection, transaction
+
+from core.models import Cliente, Contrato, Fornecedor
+
+
+def registro_de_contrato(contrato: dict, empresa: dict, email_empresa: str = "") -> dict:
+    """Normaliza um `contratoCliente` do sistema de escala para o catálogo local."""
+    cli = contrato["cliFornec"]
+    return {
+        "contrato_id": contrato["id"],
+        "numero": str(contrato.get("numero") or contrato["id"]),
+        "fornecedor": {
+            "cnpj": empresa["cnpj"],
+            "nome": empresa["razaoSocial"],
+            "email": email_empresa or empresa.get("email", ""),
+        },
+        "cliente": {
+            "cnpj": cli["cnpj"],
+            "nome": cli["razaoSocial"],
+            "email": cli.get("email", ""),
+            "telefone": cli.get("telefone", ""),
+        },
+    }
+
+
+def registro_de_token(dados_token: dict[str, Any]) -> dict:
+    return registro_de_contrato(
+        dados_token["contratoCliente"],
+        dados_token["empresaContratante"],
+        dados_token.get("emailCliente", ""),
+    )
+
+
+def _unicos_por_cnpj(dados: Iterable[dict]) -> list[dict]:
+    # ON CONFLICT não aceita a mesma chave duas vezes no mesmo comando
+    return list({d["cnpj"]: d for d in dados}.values())
+
+
+def upsert_fornecedores(dados: Iterable[dict], url_sistema: str) -> dict[str, int]:
+    objetos = Fornecedor.objects.bulk_create(
+        [Fornecedor(url_sistema=url_sistema, **d) for d in _unicos_por_cnpj(dados)],
+        update_conflicts=True,
+        unique_fields=["cnpj"],
+        update_fields=["nome", "email", "url_sistema"],
+    )
+    return {f.cnpj: f.pk for f in objetos}
+
+
+def upsert_clientes(dados: Iterable[dict]) -> dict[str, int]:
+    objetos = Cliente.objects.bulk_create(
+        [Cliente(**d) for d in _unicos_por_cnpj(dados)],
+        update_conflicts=True,
+        unique_fields=["cnpj"],
+        update_fields=["nome", "email", "telefone"],
+    )
+    return {c.cnpj: c.pk for c in objetos}
+
+
+def _avancar_sequencia(modelo, maior_id: int) -> None:
+    """Leva a sequência do id de `modelo` até `maior_id`, sem nunca recuá-la."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(seq, %s) "
+            "FROM (SELECT pg_get_serial_sequence(%s, 'id')::regclass AS seq) s "
+            "WHERE %s > COALESCE(pg_sequence_last_value(seq), 0)",
+            [maior_id, connection.ops.quote_name(modelo._meta.db_table), maior_id],
+        )
+
+
+def sincronizar(registros: list[dict], url_sistema: str) -> dict[str, int]:
+    """Grava um lote de registros normalizados (ver `registro_de_contrato`)."""
+    if not registros:
+        return {"fornecedores": 0, "clientes": 0, "contratos": 0}
+
+    with transaction.atomic():
+        fornecedores = upsert_fornecedores(
+            (r["fornecedor"] for r in registros), url_sistema
+        )
+        clientes = upsert_clientes(r["cliente"] for r in registros)
+        contratos = {
+            r["contrato_id"]: Contrato(
+                id=r["contrato_id"],
+                numero=r["numero"],
+                cliente_id=clientes[r["cliente"]["cnpj"]],
+                fornecedor_id=fornecedores[r["fornecedor"]["cnpj"]],
+            )
+            for r in registros
+        }
+        Contrato.objects.bulk_create(
+            list(contratos.values()),
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=["numero", "cliente", "fornecedor"],
+        )
+        _avancar_sequencia(Contrato, max(contratos))
+
+    return {
+        "fornecedores": len(fornecedores),
+        "clientes": len(clientes),
+        "contratos": len(contratos),
+    }
@@ -0,0 +1,135 @@
+import logging
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import EnvioSolicitacao
+from core.services import escala_client
+
+logger = logging.getLogger(__name__)
+
+# Respostas 4xx que indicam falha transitória e devem ser repetidas
+STATUS_REPETIVEIS = {408, 425, 429}
+
+
+class ErroEnvio(Exception):
+    def __init__(self, mensagem: str, definitivo: bool = False):
+        super().__init__(mensagem)
+        self.definitivo = definitivo
+
+
+def reservar_lote(tamanho: int) -> list[EnvioSolicitacao]:
+    """Reserva envios pendentes, adiando `proxima_tentativa` pelo tempo de
+    reserva para que outros despachantes não peguem os mesmos registros."""
+    agora = timezone.now()
+    with transaction.atomic():
+        envios = list(
+            EnvioSolicitacao.objects.select_for_update(skip_locked=True)
+            .filter(status=EnvioSolicitacao.PENDENTE, proxima_tentativa__lte=agora)
+            .order_by("proxima_tentativa")[:tamanho]
+        )
+        if envios:
+            EnvioSolicitacao.objects.filter(pk__in=[e.pk for e in envios]).update(
+                proxima_tentativa=agora
+                + timedelta(seconds=settings.ESCALA_ENVIO_RESERVA)
+            )
+    return envios
+
+
+def chave_idempotencia(envio: EnvioSolicitacao) -> uuid.UUID:
+    # Envios anteriores à chave recebem uma derivada do id da solicitação,
+    # estável entre as tentativas
+    return envio.chave_idempotencia or uuid.uuid5(
+        uuid.NAMESPACE_URL, f"solicitacao:{envio.solicitacao_id}"
+    )
+
+
+def enviar(envio: EnvioSolicitacao) -> None:
+    try:
+        response = escala_client.post(
+            "solicitacoes/criar",
+            json=envio.payload,
+            headers={escala_client.CABECALHO_IDEMPOTENCIA: str(chave_idempotencia(envio))},
+        )
+    except requests.RequestException as e:
+        raise ErroEnvio(f"Erro ao conectar com o sistema de escala: {e}")
+
+    if 200 <= response.status_code < 300:
+        return
+    definitivo = (
+        400 <= response.status_code < 500
+        and response.status_code not in STATUS_REPETIVEIS
+    )
+    raise ErroEnvio(f"HTTP {response.status_code}: {response.text[:500]}", definitivo)
+
+
+def calcular_espera(tentativas: int) -> timedelta:
+    # Backoff exponencial com "equal jitter": metade do teto é garantida e a
+    # outra metade é aleatória, para espalhar as repetições sem voltar cedo demais
+    teto = min(
+        settings.ESCALA_ENVIO_BACKOFF_MAX,
+        settings.ESCALA_ENVIO_BACKOFF_BASE * 2 ** (tentativas - 1),
+    )
+    return timedelta(seconds=random.uniform(teto / 2, teto))
+
+
+def _registrar_resultado(envio: EnvioSolicitacao, erro: ErroEnvio | None) -> None:
+    agora = timezone.now()
+    envio.tentativas += 1
+    if erro is None:
+        envio.status = EnvioSolicitacao.ENVIADO
+        envio.enviado_em = agora
+        envio.ultimo_erro = ""
+        return
+
+    envio.ultimo_erro = str(erro)
+    if erro.definitivo or envio.tentativas >= settings.ESCALA_ENVIO_MAX_TENTATIVAS:
+        envio.status = EnvioSolicitacao.FALHOU
+        logger.error(
+            "Envio da solicitação %s falhou definitivamente: %s",
+            envio.solicitacao_id,
+            erro,
+        )
+    else:
+        envio.proxima_tentativa = agora + calcular_espera(envio.tentativas)
+        logger.warning(
+            "Envio da solicitação %s falhou (tentativa %s): %s",
+            envio.solicitacao_id,
+            envio.tentativas,
+            erro,
+        )
+
+
+def _enviar_capturando(envio: EnvioSolicitacao) -> ErroEnvio | None:
+    try:
+        enviar(envio)
+    except ErroEnvio as e:
+        return e
+    return None
+
+
+def despachar_lote(tamanho: int, concorrencia: int) -> tuple[int, int]:
+    """Envia um lote de solicitações pendentes com no máximo `concorrencia`
+    chamadas simultâneas. Retorna (enviados, falhas)."""
+    envios = reservar_lote(tamanho)
+    if not envios:
+        return 0, 0
+
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        erros = list(executor.map(_enviar_capturando, envios))
+
+    for envio, erro in zip(envios, erros):
+        _registrar_resultado(envio, erro)
+
+    EnvioSolicitacao.objects.bulk_update(
+        envios,
+        ["status", "tentativas", "proxima_tentativa", "ultimo_erro", "enviado_em"],
+    )
+    falhas = sum(1 for erro in erros if erro is not None)
+    return len(envios) - falhas, falhas
@@ -0,0 +1,279 @@
+"""Cliente HTTP compartilhado para a API do Gerenciamento de Escala.
+
+Mantém uma `requests.Session` por processo (pool de conexões com keep-alive),
+aplica timeouts de conexão/leitura, repete chamadas idempotentes com jitter e
+usa um circuit breaker para falhar rápido quando o sistema de escala está fora.
+
+As funções com prefixo `a` (`aget`, `aput`, `apost`) fazem o mesmo com um
+`httpx.AsyncClient` por event loop, para as views assíncronas (ASGI). O
+cliente é fechado quando o loop encerra: sob WSGI/runserver cada view
+assíncrona roda em um loop próprio (`async_to_sync`), que termina com a
+requisição.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from core import metricas
+
+logger = logging.getLogger(__name__)
+
+# PUT não entra aqui: `utilizar` consome o token e uma repetição cega
+# devolveria erro mesmo quando a primeira chamada teve sucesso.
+METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "OPTIONS"})
+# Chamadas com este cabeçalho são deduplicadas pelo sistema de escala e
+# também podem ser repetidas
+CABECALHO_IDEMPOTENCIA = "Idempotency-Key"
+STATUS_REPETIVEIS = frozenset({502, 503, 504})
+
+
+class EscalaIndisponivel(requests.RequestException):
+    """Circuito aberto: o sistema de escala falhou repetidamente."""
+
+
+# Exceções de conexão dos clientes síncrono e assíncrono
+ERROS_CONEXAO = (requests.RequestException, httpx.HTTPError)
+
+
+class CircuitBreaker:
+    def __init__(self, limite_falhas: int, tempo_reabertura: float):
+        self.limite_falhas = limite_falhas
+        self.tempo_reabertura = tempo_reabertura
+        self._falhas = 0
+        self._aberto_em: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def aberto(self) -> bool:
+        return self._aberto_em is not None
+
+    def antes_da_chamada(self) -> None:
+        with self._lock:
+            if self._aberto_em is None:
+                return
+            if time.monotonic() - self._aberto_em < self.tempo_reabertura:
+                raise EscalaIndisponivel(
+                    "Sistema de escala indisponível (circuito aberto)."
+                )
+            # Meio-aberto: deixa passar uma chamada de teste e reinicia a janela
+            self._aberto_em = time.monotonic()
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self._falhas = 0
+            self._aberto_em = None
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self._falhas += 1
+            if self._falhas >= self.limite_falhas:
+                if self._aberto_em is None:
+                    logger.warning(
+                        "Circuito do sistema de escala aberto após %s falhas.",
+                        self._falhas,
+                    )
+                self._aberto_em = time.monotonic()
+
+
+circuito = CircuitBreaker(
+    settings.ESCALA_API_CIRCUITO_LIMITE_FALHAS,
+    settings.ESCALA_API_CIRCUITO_REABERTURA,
+)
+
+_sessao: requests.Session | None = None
+_sessao_pid: int | None = None
+_sessao_lock = threading.Lock()
+
+
+def get_sessao() -> requests.Session:
+    """Sessão do processo atual; recriada após fork (ex.: workers do gunicorn)."""
+    global _sessao, _sessao_pid
+    if _sessao is not None and _sessao_pid == os.getpid():
+        return _sessao
+    with _sessao_lock:
+        if _sessao is None or _sessao_pid != os.getpid():
+            sessao = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.ESCALA_API_POOL_TAMANHO,
+                max_retries=0,
+            )
+            sessao.mount("http://", adapter)
+            sessao.mount("https://", adapter)
+            _sessao, _sessao_pid = sessao, os.getpid()
+    return _sessao
+
+
+def espera_com_jitter(tentativa: int) -> float:
+    return random.uniform(0, settings.ESCALA_API_BACKOFF_BASE * 2 ** (tentativa - 1))
+
+
+def _verificar_circuito(caminho: str, metodo: str) -> None:
+    try:
+        circuito.antes_da_chamada()
+    except EscalaIndisponivel:
+        metricas.registrar_upstream(caminho, metodo, "circuito_aberto", 0.0)
+        raise
+
+
+def _repetivel(metodo: str, kwargs: dict) -> bool:
+    return metodo in METODOS_IDEMPOTENTES or CABECALHO_IDEMPOTENCIA in (
+        kwargs.get("headers") or {}
+    )
+
+
+def requisicao(metodo: str, caminho: str, **kwargs) -> requests.Response:
+    """Executa `metodo` em `GERENCIAMENTO_ESCALA_API_URL + caminho`.
+
+    Levanta `requests.RequestException` (ou `EscalaIndisponivel`) quando não
+    for possível obter resposta; respostas HTTP de erro são devolvidas.
+    """
+    metodo = metodo.upper()
+    url = settings.GERENCIAMENTO_ESCALA_API_URL + caminho
+    kwargs.setdefault(
+        "timeout",
+        (settings.ESCALA_API_TIMEOUT_CONEXAO, settings.ESCALA_API_TIMEOUT_LEITURA),
+    )
+    tentativas = 1
+    if _repetivel(metodo, kwargs):
+        tentativas += settings.ESCALA_API_TENTATIVAS
+
+    _verificar_circuito(caminho, metodo)
+    tentativa = 1
+    while True:
+        ultima = tentativa >= tentativas
+        inicio = time.perf_counter()
+        try:
+            response = get_sessao().request(metodo, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            metricas.registrar_upstream(
+                caminho, metodo, "erro", time.perf_counter() - inicio
+            )
+            if ultima:
+                circuito.registrar_falha()
+                raise
+        else:
+            metricas.registrar_upstream(
+                caminho, metodo, response.status_code, time.perf_counter() - inicio
+            )
+            if response.status_code not in STATUS_REPETIVEIS:
+                circuito.registrar_sucesso()
+                return response
+            if ultima:
+                circuito.registrar_falha()
+                return response
+        time.sleep(espera_com_jitter(tentativa))
+        tentativa += 1
+
+
+def get(caminho: str, **kwargs) -> requests.Response:
+    return requisicao("GET", caminho, **kwargs)
+
+
+def put(caminho: str, **kwargs) -> requests.Response:
+    return requisicao("PUT", caminho, **kwargs)
+
+
+def post(caminho: str, **kwargs) -> requests.Response:
+    return requisicao("POST", caminho, **kwargs)
+
+
+# loop -> (cliente, gerador que o fecha quando o loop encerrar)
+_clientes_async: dict[asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, AsyncIterator]] = {}
+
+
+async def _fechar_com_o_loop(
+    loop: asyncio.AbstractEventLoop, cliente: httpx.AsyncClient
+) -> AsyncIterator[None]:
+    # Fica suspenso até o loop encerrar: `loop.shutdown_asyncgens()` (chamado
+    # por asyncio.run, async_to_sync e pelos servidores ASGI) o fecha
+    try:
+        yield
+    finally:
+        _clientes_async.pop(loop, None)
+        await cliente.aclose()
+
+
+async def get_cliente_async() -> httpx.AsyncClient:
+    """Cliente do event loop atual. Sob ASGI há um loop por processo, então o
+    pool de conexões é compartilhado por todas as requisições."""
+    loop = asyncio.get_running_loop()
+    if loop in _clientes_async:
+        return _clientes_async[loop][0]
+    cliente = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.ESCALA_API_POOL_TAMANHO_ASYNC,
+            max_keepalive_connections=settings.ESCALA_API_POOL_TAMANHO,
+        ),
+    )
+    fechamento = _fechar_com_o_loop(loop, cliente)
+    await anext(fechamento)
+    _clientes_async[loop] = (cliente, fechamento)
+    return cliente
+
+
+async def arequisicao(metodo: str, caminho: str, **kwargs) -> httpx.Response:
+    """Versão assíncrona de `requisicao`; levanta `httpx.HTTPError` (ou
+    `EscalaIndisponivel`) quando não for possível obter resposta."""
+    metodo = metodo.upper()
+    url = settings.GERENCIAMENTO_ESCALA_API_URL + caminho
+    kwargs.setdefault(
+        "timeout",
+        httpx.Timeout(
+            settings.ESCALA_API_TIMEOUT_LEITURA,
+            connect=settings.ESCALA_API_TIMEOUT_CONEXAO,
+        ),
+    )
+    tentativas = 1
+    if _repetivel(metodo, kwargs):
+        tentativas += settings.ESCALA_API_TENTATIVAS
+
+    _verificar_circuito(caminho, metodo)
+    cliente = await get_cliente_async()
+    tentativa = 1
+    while True:
+        ultima = tentativa >= tentativas
+        inicio = time.perf_counter()
+        try:
+            response = await cliente.request(metodo, url, **kwargs)
+        except httpx.TransportError:
+            metricas.registrar_upstream(
+                caminho, metodo, "erro", time.perf_counter() - inicio
+            )
+            if ultima:
+                circuito.registrar_falha()
+                raise
+        else:
+            metricas.registrar_upstream(
+                caminho, metodo, response.status_code, time.perf_counter() - inicio
+            )
+            if response.status_code not in STATUS_REPETIVEIS:
+                circuito.registrar_sucesso()
+                return response
+            if ultima:
+                circuito.registrar_falha()
+                return response
+        await asyncio.sleep(espera_com_jitter(tentativa))
+        tentativa += 1
+
+
+async def aget(caminho: str, **kwargs) -> httpx.Response:
+    return await arequisicao("GET", caminho, **kwargs)
+
+
+async def aput(caminho: str, **kwargs) -> httpx.Response:
+    return await arequisicao("PUT", caminho, **kwargs)
+
+
+async def apost(caminho: str, **kwargs) -> httpx.Response:
+    return await arequisicao("POST", caminho, **kwargs)
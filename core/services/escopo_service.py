@@ -0,0 +1,140 @@
+"""Escopo de acesso do usuário: fornecedores cujas solicitações ele pode ver.
+
+O escopo só muda quando tokens são associados ou removidos, então fica no cache
+do Django sob uma chave versionada por usuário. `invalidar_escopo` incrementa a
+versão; entradas antigas simplesmente expiram.
+
+O escopo é um filtro de autorização: a invalidação precisa valer para todos os
+processos. Com um cache local ao processo (locmem, dummy) em `ESCOPO_CACHE`,
+um worker continuaria mostrando fornecedores de um token já removido até o
+TTL; nesse caso `compartilhado()` é falso e o escopo é lido do banco a cada
+requisição. O mesmo vale para as opções do formulário (`obter_opcoes`).
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from core.models import TokenSolicitacao
+
+
+@dataclass
+class Escopo:
+    fornecedores_ids: list[int] = field(default_factory=list)
+    # (nome do fornecedor, número do contrato) para exibição
+    vinculos: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class Opcoes:
+    """(id, nome) dos clientes e fornecedores dos contratos do usuário, em
+    ordem de nome: opções do formulário de solicitação e do autocompletar."""
+
+    clientes: list[tuple[int, str]] = field(default_factory=list)
+    fornecedores: list[tuple[int, str]] = field(default_factory=list)
+    # (cliente_id, fornecedor_id) com contrato do usuário
+    pares: set[tuple[int, int]] = field(default_factory=set)
+
+
+# Backends cujo conteúdo não é visto pelos demais processos
+LOCAIS = (LocMemCache, DummyCache)
+
+
+def _cache():
+    return caches[settings.ESCOPO_CACHE]
+
+
+def compartilhado() -> bool:
+    """Se `ESCOPO_CACHE` é compartilhado entre processos (ver docstring do módulo)."""
+    return not isinstance(_cache(), LOCAIS)
+
+
+def _chave_versao(user_id: int) -> str:
+    return f"escopo:versao:{user_id}"
+
+
+def _nova_versao() -> int:
+    # Baseada no relógio para não reaproveitar versões se a chave for despejada
+    return time.time_ns()
+
+
+def versao_escopo(user_id: int) -> int:
+    return _cache().get_or_set(_chave_versao(user_id), _nova_versao, None)
+
+
+def _carregar(user_id: int) -> Escopo:
+    escopo = Escopo()
+    linhas = (
+        TokenSolicitacao.objects.filter(usuario__user_id=user_id)
+        .order_by("criado_em")
+        .values_list(
+            "contrato__fornecedor_id", "contrato__fornecedor__nome", "contrato__numero"
+        )
+    )
+    for fornecedor_id, nome, numero in linhas:
+        if fornecedor_id not in escopo.fornecedores_ids:
+            escopo.fornecedores_ids.append(fornecedor_id)
+        escopo.vinculos.append((nome, numero))
+    return escopo
+
+
+def obter_escopo(user) -> Escopo:
+    """Escopo do usuário autenticado; filtro de autorização compartilhado por
+    listagem, exportação e demais consultas de solicitações."""
+    if not user.is_authenticated:
+        return Escopo()
+    if not compartilhado():
+        return _carregar(user.id)
+    chave = f"escopo:{user.id}:v{versao_escopo(user.id)}"
+    escopo = _cache().get(chave)
+    if escopo is None:
+        escopo = _carregar(user.id)
+        _cache().set(chave, escopo, settings.ESCOPO_CACHE_TTL)
+    return escopo
+
+
+def _carregar_opcoes(user_id: int) -> Opcoes:
+    clientes: dict[int, str] = {}
+    fornecedores: dict[int, str] = {}
+    linhas = TokenSolicitacao.objects.filter(usuario__user_id=user_id).values_list(
+        "contrato__cliente_id",
+        "contrato__cliente__nome",
+        "contrato__fornecedor_id",
+        "contrato__fornecedor__nome",
+    )
+    pares: set[tuple[int, int]] = set()
+    for cliente_id, cliente, fornecedor_id, fornecedor in linhas:
+        clientes[cliente_id] = cliente
+        fornecedores[fornecedor_id] = fornecedor
+        pares.add((cliente_id, fornecedor_id))
+    return Opcoes(
+        clientes=sorted(clientes.items(), key=lambda item: item[1]),
+        fornecedores=sorted(fornecedores.items(), key=lambda item: item[1]),
+        pares=pares,
+    )
+
+
+def obter_opcoes(user) -> Opcoes:
+    """Opções do usuário, no cache sob a mesma versão do escopo."""
+    if not user.is_authenticated:
+        return Opcoes()
+    if not compartilhado():
+        return _carregar_opcoes(user.id)
+    # "pares" no nome: entradas gravadas antes do campo `pares` ficam ignoradas
+    chave = f"escopo:opcoes-pares:{user.id}:v{versao_escopo(user.id)}"
+    opcoes = _cache().get(chave)
+    if opcoes is None:
+        opcoes = _carregar_opcoes(user.id)
+        _cache().set(chave, opcoes, settings.ESCOPO_CACHE_TTL)
+    return opcoes
+
+
+def invalidar_escopo(user_id: int) -> None:
+    try:
+        _cache().incr(_chave_versao(user_id))
+    except ValueError:
+        _cache().set(_chave_versao(user_id), _nova_versao(), None)
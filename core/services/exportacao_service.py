@@ -0,0 +1,115 @@
+"""Exportação de solicitações em CSV ou NDJSON, em fluxo contínuo.
+
+As linhas são lidas com `.values().iterator(chunk_size=...)` (cursor no
+servidor no PostgreSQL) e serializadas uma a uma, então o consumo de memória
+não depende da quantidade de solicitações exportadas. Sob ASGI o fluxo é
+entregue por `em_lotes_async`, que lê e serializa um lote por vez em uma
+thread.
+"""
+
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.models import Solicitacao
+from core.services import busca_service
+
+CAMPOS = [
+    "id",
+    "data_solicitacao",
+    "cliente__nome",
+    "cliente__cnpj",
+    "fornecedor__nome",
+    "fornecedor__cnpj",
+    "contrato__numero",
+    "tipo_profissional",
+    "jornada",
+    "observacoes",
+    "status",
+]
+
+
+def parse_data(valor: str) -> date:
+    """AAAA-MM-DD; levanta ValueError se inválida."""
+    data = parse_date(valor)
+    if data is None:
+        raise ValueError(f"Data inválida: {valor}")
+    return data
+
+
+def inicio_do_dia(dia: date) -> datetime:
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def linhas(
+    fornecedores_ids: Iterable[int],
+    inicio: date | None = None,
+    fim: date | None = None,
+    lote: int | None = None,
+    busca: str | None = None,
+) -> Iterator[dict]:
+    """Solicitações dos fornecedores informados com `inicio <= data <= fim`
+    e, com `busca`, que casam com o termo (ver `busca_service`)."""
+    queryset = Solicitacao.objects.filter(fornecedor_id__in=list(fornecedores_ids))
+    # Escolhe o banco (réplica ou primário, ver core.roteador) já aqui: o fluxo
+    # só é consumido depois que a view retorna
+    queryset = queryset.using(queryset.db)
+    if busca:
+        queryset = queryset.filter(busca_service.filtro(busca, queryset.db))
+    if inicio:
+        queryset = queryset.filter(data_solicitacao__gte=inicio_do_dia(inicio))
+    if fim:
+        queryset = queryset.filter(
+            data_solicitacao__lt=inicio_do_dia(fim + timedelta(days=1))
+        )
+    return (
+        queryset.order_by("data_solicitacao", "id")
+        .values(*CAMPOS)
+        .iterator(chunk_size=lote or settings.EXPORTACAO_LOTE)
+    )
+
+
+class _Eco:
+    """Arquivo falso: `csv.writer` devolve a linha formatada em vez de gravá-la."""
+
+    def write(self, valor: str) -> str:
+        return valor
+
+
+def gerar_csv(registros: Iterable[dict]) -> Iterator[str]:
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(CAMPOS)
+    for registro in registros:
+        yield escritor.writerow(registro[c] for c in CAMPOS)
+
+
+def gerar_ndjson(registros: Iterable[dict]) -> Iterator[str]:
+    for registro in registros:
+        yield json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+async def em_lotes_async(partes: Iterator[str], lote: int | None = None) -> AsyncIterator[str]:
+    """Versão assíncrona de um gerador de `gerar_csv`/`gerar_ndjson`.
+
+    Com um iterador síncrono o `StreamingHttpResponse` do ASGI carregaria a
+    exportação inteira na memória antes de enviá-la; aqui cada passo consome
+    `lote` linhas em `sync_to_async` (na mesma thread da conexão com o banco).
+    """
+    ler = sync_to_async(lambda: "".join(islice(partes, lote or settings.EXPORTACAO_LOTE)))
+    while texto := await ler():
+        yield texto
+
+
+# formato -> (gerador, content type, extensão)
+FORMATOS = {
+    "csv": (gerar_csv, "text/csv; charset=utf-8", "csv"),
+    "ndjson": (gerar_ndjson, "application/x-ndjson", "ndjson"),
+}
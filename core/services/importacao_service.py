@@ -0,0 +1,208 @@
+"""Importação de solicitações em lote a partir de planilhas (CSV ou XLSX).
+
+As linhas são validadas em memória contra os contratos do usuário (sem
+consultas por linha) e as válidas são gravadas com `bulk_create` em uma única
+transação, junto com os registros de envio (outbox) e o resumo mensal. O envio
+ao sistema de escala fica com o despachante (`despachar_solicitacoes`), que já
+trabalha em lotes com concorrência limitada. Linhas inválidas voltam no
+relatório com o número da linha na planilha.
+
+XLSX requer o pacote opcional `openpyxl`.
+"""
+
+import csv
+import io
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import IO, Iterator
+
+from django.conf import settings
+from django.db import transaction
+
+from core.contexto import UsuarioContext
+from core.models import Contrato, EnvioSolicitacao, Solicitacao
+from core.services import listagem_cache, resumo_service
+from core.services.solicitacao_service import montar_payload
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - dependência opcional
+    openpyxl = None
+
+OBRIGATORIAS = ("cliente_cnpj", "fornecedor_cnpj", "tipo_profissional", "jornada")
+OPCIONAIS = ("observacoes", "contrato_numero")
+FORMATOS = ("csv", "xlsx")
+
+
+class ErroPlanilha(ValueError):
+    """A planilha inteira é inválida (formato, cabeçalho ou tamanho)."""
+
+
+@dataclass
+class ErroLinha:
+    linha: int
+    mensagem: str
+
+
+@dataclass
+class ResultadoImportacao:
+    criadas: list[Solicitacao] = field(default_factory=list)
+    erros: list[ErroLinha] = field(default_factory=list)
+
+    @property
+    def linhas(self) -> int:
+        return len(self.criadas) + len(self.erros)
+
+
+def _coluna(nome) -> str:
+    # "Tipo Profissional" -> tipo_profissional; "cliente__cnpj" (exportação) -> cliente_cnpj
+    texto = unicodedata.normalize("NFKD", str(nome or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"_+", "_", re.sub(r"\W+", "_", texto.strip().lower())).strip("_")
+
+
+def _digitos(valor) -> str:
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    digitos = re.sub(r"\D", "", str(valor or ""))
+    # Planilhas que tratam o CNPJ como número perdem os zeros à esquerda
+    return digitos.zfill(14) if digitos else ""
+
+
+def formato_de(nome: str) -> str:
+    formato = nome.rsplit(".", 1)[-1].lower() if "." in nome else ""
+    if formato not in FORMATOS:
+        raise ErroPlanilha("Envie um arquivo .csv ou .xlsx.")
+    return formato
+
+
+def _linhas_csv(arquivo: IO[bytes]) -> Iterator[list]:
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    try:
+        amostra = texto.read(4096)
+        texto.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.reader(texto, dialeto)
+    except UnicodeDecodeError:
+        raise ErroPlanilha("O CSV deve estar em UTF-8.")
+    finally:
+        texto.detach()
+
+
+def _linhas_xlsx(arquivo: IO[bytes]) -> Iterator[list]:
+    if openpyxl is None:
+        raise ErroPlanilha("Importação de XLSX indisponível: instale o pacote openpyxl.")
+    try:
+        planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    except Exception:
+        raise ErroPlanilha("Arquivo XLSX inválido.")
+    try:
+        for linha in planilha.worksheets[0].iter_rows(values_only=True):
+            yield ["" if valor is None else valor for valor in linha]
+    finally:
+        planilha.close()
+
+
+def ler(arquivo: IO[bytes], formato: str) -> Iterator[tuple[int, dict]]:
+    """(número da linha na planilha, campos) de cada linha não vazia."""
+    linhas = _linhas_csv(arquivo) if formato == "csv" else _linhas_xlsx(arquivo)
+    cabecalho = [_coluna(nome) for nome in next(linhas, [])]
+    faltando = [nome for nome in OBRIGATORIAS if nome not in cabecalho]
+    if faltando:
+        raise ErroPlanilha(f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+
+    for numero, linha in enumerate(linhas, start=2):
+        if numero - 1 > settings.IMPORTACAO_MAX_LINHAS:
+            raise ErroPlanilha(
+                f"A planilha excede o limite de {settings.IMPORTACAO_MAX_LINHAS} linhas."
+            )
+        campos = {
+            nome: valor
+            for nome, valor in zip(cabecalho, linha)
+            if nome in OBRIGATORIAS or nome in OPCIONAIS
+        }
+        if any(str(valor).strip() for valor in campos.values()):
+            yield numero, campos
+
+
+def _texto(campos: dict, nome: str) -> str:
+    valor = campos.get(nome, "")
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def validar(campos: dict, contratos: dict[tuple[str, str], list[Contrato]]) -> Solicitacao:
+    """Solicitação (não gravada) da linha; ValueError se inválida."""
+    chave = (_digitos(campos.get("cliente_cnpj")), _digitos(campos.get("fornecedor_cnpj")))
+    candidatos = contratos.get(chave)
+    if not candidatos:
+        raise ValueError("Nenhum contrato seu para este par de cliente e fornecedor (CNPJ).")
+    numero = _texto(campos, "contrato_numero")
+    if numero:
+        candidatos = [c for c in candidatos if c.numero == numero]
+        if not candidatos:
+            raise ValueError(f"Contrato {numero} não vinculado a você para este par.")
+    contrato = candidatos[0]
+
+    valores = {}
+    for nome in ("tipo_profissional", "jornada", "observacoes"):
+        valor = _texto(campos, nome)
+        limite = Solicitacao._meta.get_field(nome).max_length
+        if nome != "observacoes" and not valor:
+            raise ValueError(f"{nome} é obrigatório.")
+        if limite and len(valor) > limite:
+            raise ValueError(f"{nome} excede {limite} caracteres.")
+        valores[nome] = valor
+    return Solicitacao(
+        contrato=contrato,
+        cliente_id=contrato.cliente_id,
+        fornecedor_id=contrato.fornecedor_id,
+        **valores,
+    )
+
+
+def importar(
+    arquivo: IO[bytes],
+    formato: str,
+    contexto: UsuarioContext,
+    tudo_ou_nada: bool = False,
+) -> ResultadoImportacao:
+    """Valida e grava as linhas da planilha. Com `tudo_ou_nada`, qualquer
+    linha inválida impede a gravação de todas."""
+    contratos: dict[tuple[str, str], list[Contrato]] = {}
+    for contrato in contexto.contratos:
+        chave = (_digitos(contrato.cliente.cnpj), _digitos(contrato.fornecedor.cnpj))
+        contratos.setdefault(chave, []).append(contrato)
+
+    resultado = ResultadoImportacao()
+    validas = []
+    for numero, campos in ler(arquivo, formato):
+        try:
+            validas.append(validar(campos, contratos))
+        except ValueError as e:
+            resultado.erros.append(ErroLinha(numero, str(e)))
+
+    if not validas or (tudo_ou_nada and resultado.erros):
+        return resultado
+
+    usuario = contexto.perfil
+    for solicitacao in validas:
+        solicitacao.usuario_solicitante = usuario
+    with transaction.atomic():
+        criadas = Solicitacao.objects.bulk_create(validas, batch_size=settings.IMPORTACAO_LOTE)
+        EnvioSolicitacao.objects.bulk_create(
+            [
+                EnvioSolicitacao(solicitacao=s, payload=montar_payload(s, usuario))
+                for s in criadas
+            ],
+            batch_size=settings.IMPORTACAO_LOTE,
+        )
+        resumo_service.incrementar(Counter(resumo_service.chave_de(s) for s in criadas))
+        listagem_cache.marcar_no_commit(s.fornecedor_id for s in criadas)
+    resultado.criadas = criadas
+    return resultado
@@ -0,0 +1,102 @@
+"""Cache da listagem de solicitações: marcas de alteração e tabela renderizada.
+
+Cada fornecedor tem no cache (`LISTAGEM_CACHE`) o instante da última alteração
+em suas solicitações (criação, importação, mudança de status, remoção);
+operações em massa (arquivamento de partições, carga sintética) avançam uma
+marca geral. A última alteração do escopo do usuário gera o ETag e o
+Last-Modified da listagem (respostas 304) e compõe a chave da tabela
+renderizada, guardada por `LISTAGEM_CACHE_TTL` segundos.
+
+As marcas só valem se todos os processos as enxergam: com um cache local ao
+processo (locmem, dummy) em `LISTAGEM_CACHE`, outro worker devolveria 304 ou a
+tabela antiga por até `LISTAGEM_MARCA_TTL`. Nesse caso `ativo()` é falso e a
+listagem é sempre renderizada, sem 304 nem tabela no cache.
+"""
+
+import hashlib
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.safestring import SafeString, mark_safe
+
+GERAL = "listagem:marca:geral"
+# Backends cujo conteúdo não é visto pelos demais processos
+LOCAIS = (LocMemCache, DummyCache)
+
+
+def _cache():
+    return caches[settings.LISTAGEM_CACHE]
+
+
+def ativo() -> bool:
+    """Se `LISTAGEM_CACHE` é compartilhado entre processos (ver docstring do módulo)."""
+    return not isinstance(_cache(), LOCAIS)
+
+
+def _chave_marca(fornecedor_id: int) -> str:
+    return f"listagem:marca:{fornecedor_id}"
+
+
+def _resumo(*partes) -> str:
+    return hashlib.sha256(repr(partes).encode()).hexdigest()[:32]
+
+
+def marcar(fornecedores_ids: Iterable[int] | None = None) -> None:
+    """Registra alteração agora nas listagens dos fornecedores (todos, com None)."""
+    if not ativo():
+        return
+    if fornecedores_ids is None:
+        chaves = [GERAL]
+    else:
+        chaves = [_chave_marca(fornecedor_id) for fornecedor_id in set(fornecedores_ids)]
+    _cache().set_many(dict.fromkeys(chaves, time.time()), settings.LISTAGEM_MARCA_TTL)
+
+
+def marcar_no_commit(
+    fornecedores_ids: Iterable[int] | None = None, using: str = DEFAULT_DB_ALIAS
+) -> None:
+    # Depois do commit: antes dele, outra requisição poderia renderizar e
+    # guardar a tabela ainda sem a alteração sob a marca nova
+    if not ativo():
+        return
+    ids = None if fornecedores_ids is None else set(fornecedores_ids)
+    transaction.on_commit(lambda: marcar(ids), using=using)
+
+
+def ultima_alteracao(fornecedores_ids: Iterable[int]) -> float:
+    """Instante (epoch) da última alteração nas solicitações dos fornecedores."""
+    chaves = [GERAL] + [_chave_marca(fornecedor_id) for fornecedor_id in fornecedores_ids]
+    marcas = _cache().get_many(chaves)
+    faltando = [chave for chave in chaves if chave not in marcas]
+    if faltando:
+        # Sem marca (cache novo ou expirado) não há como saber: conta como agora
+        agora = time.time()
+        _cache().set_many(dict.fromkeys(faltando, agora), settings.LISTAGEM_MARCA_TTL)
+        marcas.update(dict.fromkeys(faltando, agora))
+    return max(marcas.values())
+
+
+def chave_tabela(fornecedores_ids: Iterable[int], marca: float, parametros: dict) -> str:
+    """Chave da tabela renderizada para o escopo, a marca e a página pedida."""
+    return "listagem:tabela:" + _resumo(
+        sorted(fornecedores_ids), marca, sorted(parametros.items())
+    )
+
+
+def etag(chave: str, *extras) -> str:
+    """ETag da página: a tabela (`chave`) e o que mais a página mostra."""
+    return _resumo(chave, *extras)
+
+
+def obter_tabela(chave: str) -> SafeString | None:
+    html = _cache().get(chave)
+    return None if html is None else mark_safe(html)
+
+
+def guardar_tabela(chave: str, html: str) -> None:
+    _cache().set(chave, str(html), settings.LISTAGEM_CACHE_TTL)
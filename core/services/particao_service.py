@@ -0,0 +1,186 @@
+"""Particionamento mensal de solicitações por data_solicitacao (PostgreSQL).
+
+A migração 0008 converte `core_solicitacao` em tabela particionada por
+intervalo, com uma partição por mês (no fuso de TIME_ZONE) e uma partição
+padrão para datas sem partição própria. O comando `manter_particoes` cria as
+partições dos próximos meses e arquiva as antigas, mantendo pequenos os
+índices e o vacuum do conjunto consultado no dia a dia.
+"""
+
+import re
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from core.models import Solicitacao
+from core.services import listagem_cache
+from core.services.resumo_service import somar_meses
+
+TABELA = Solicitacao._meta.db_table
+PADRAO = f"{TABELA}_padrao"
+MODOS_ARQUIVO = ("desanexar", "mover")
+
+_NOME_PARTICAO = re.compile(rf"^{TABELA}_p(\d{{4}})(\d{{2}})$")
+
+
+def particionada(using: str = DEFAULT_DB_ALIAS) -> bool:
+    conexao = connections[using]
+    if conexao.vendor != "postgresql":
+        return False
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABELA])
+        linha = cursor.fetchone()
+    return linha is not None and linha[0] == "p"
+
+
+def nome_particao(mes: date) -> str:
+    return f"{TABELA}_p{mes:%Y%m}"
+
+
+def limites(mes: date) -> tuple[datetime, datetime]:
+    """Início (inclusivo) e fim (exclusivo) do mês no fuso configurado."""
+    fuso = timezone.get_current_timezone()
+    proximo = somar_meses(mes, 1)
+    return (
+        datetime(mes.year, mes.month, 1, tzinfo=fuso),
+        datetime(proximo.year, proximo.month, 1, tzinfo=fuso),
+    )
+
+
+def _intervalo(mes: date) -> str:
+    # Limites de partição não aceitam parâmetros; são datas geradas aqui
+    inicio, fim = limites(mes)
+    return f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+
+
+def particoes(using: str = DEFAULT_DB_ALIAS) -> dict[date, str]:
+    """Partições mensais anexadas, por mês."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABELA],
+        )
+        nomes = [nome for (nome,) in cursor.fetchall()]
+    meses = {}
+    for nome in nomes:
+        if casamento := _NOME_PARTICAO.match(nome):
+            meses[date(int(casamento[1]), int(casamento[2]), 1)] = nome
+    return meses
+
+
+def colunas(cursor, tabela: str) -> list[str]:
+    """Colunas gravadas diretamente (sem as geradas pelo banco), no schema atual."""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s "
+        "AND is_generated = 'NEVER' ORDER BY ordinal_position",
+        [tabela],
+    )
+    return [nome for (nome,) in cursor.fetchall()]
+
+
+def criar_particao(mes: date, using: str = DEFAULT_DB_ALIAS) -> str:
+    conexao = connections[using]
+    q = conexao.ops.quote_name
+    nome = nome_particao(mes)
+    inicio, fim = limites(mes)
+    with transaction.atomic(using), conexao.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {q(PADRAO)} "
+            "WHERE data_solicitacao >= %s AND data_solicitacao < %s)",
+            [inicio, fim],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE TABLE {q(nome)} PARTITION OF {q(TABELA)} {_intervalo(mes)}")
+            return nome
+
+        # A partição padrão já tem linhas do mês (o PostgreSQL recusaria a
+        # partição nova): elas vão para uma tabela avulsa, que é anexada depois
+        cursor.execute(
+            f"CREATE TABLE {q(nome)} (LIKE {q(TABELA)} "
+            "INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+        )
+        lista = ", ".join(q(coluna) for coluna in colunas(cursor, TABELA))
+        cursor.execute(
+            f"WITH movidas AS (DELETE FROM {q(PADRAO)} "
+            f"WHERE data_solicitacao >= %s AND data_solicitacao < %s RETURNING {lista}) "
+            f"INSERT INTO {q(nome)} ({lista}) SELECT {lista} FROM movidas",
+            [inicio, fim],
+        )
+        cursor.execute(f"ALTER TABLE {q(TABELA)} ATTACH PARTITION {q(nome)} {_intervalo(mes)}")
+    return nome
+
+
+def garantir_particoes(inicio: date, fim: date, using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """Cria as partições que faltam de `inicio` a `fim` (meses inclusivos) e as
+    dos meses que tenham linhas na partição padrão. Retorna as criadas."""
+    conexao = connections[using]
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT date_trunc('month', data_solicitacao AT TIME ZONE %s)::date "
+            f"FROM {conexao.ops.quote_name(PADRAO)}",
+            [timezone.get_current_timezone_name()],
+        )
+        meses = {mes for (mes,) in cursor.fetchall()}
+    mes = inicio.replace(day=1)
+    while mes <= fim:
+        meses.add(mes)
+        mes = somar_meses(mes, 1)
+
+    existentes = particoes(using)
+    return [criar_particao(mes, using) for mes in sorted(meses) if mes not in existentes]
+
+
+def arquivar(antes_de: date, modo: str, using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """Tira da tabela as partições dos meses anteriores a `antes_de`.
+
+    "desanexar" move cada partição, intacta, para o schema de arquivo;
+    "mover" copia as linhas para uma única tabela no schema de arquivo e
+    apaga a partição. Retorna as partições arquivadas."""
+    if modo not in MODOS_ARQUIVO:
+        raise ValueError(f"Modo de arquivo inválido: {modo}")
+    conexao = connections[using]
+    q = conexao.ops.quote_name
+    schema = settings.SOLICITACAO_ARQUIVO_SCHEMA
+    arquivadas = []
+    for mes, nome in sorted(particoes(using).items()):
+        if mes >= antes_de:
+            break
+        with transaction.atomic(using), conexao.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {q(schema)}")
+            cursor.execute(f"ALTER TABLE {q(TABELA)} DETACH PARTITION {q(nome)}")
+            if modo == "desanexar":
+                cursor.execute(f"ALTER TABLE {q(nome)} SET SCHEMA {q(schema)}")
+            else:
+                # Sem INCLUDING GENERATED: o tsvector de busca é copiado como dado
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {q(schema)}.{q(TABELA)} (LIKE {q(TABELA)})"
+                )
+                # Colunas criadas depois do primeiro arquivamento
+                cursor.execute(
+                    "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute "
+                    "WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped "
+                    "ORDER BY attnum",
+                    [TABELA],
+                )
+                definicoes = cursor.fetchall()
+                for coluna, tipo in definicoes:
+                    cursor.execute(
+                        f"ALTER TABLE {q(schema)}.{q(TABELA)} "
+                        f"ADD COLUMN IF NOT EXISTS {q(coluna)} {tipo}"
+                    )
+                lista = ", ".join(q(coluna) for coluna, _ in definicoes)
+                cursor.execute(
+                    f"INSERT INTO {q(schema)}.{q(TABELA)} ({lista}) SELECT {lista} FROM {q(nome)}"
+                )
+                # Checagens de FK adiadas de linhas gravadas nesta mesma
+                # transação impediriam o DROP
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                cursor.execute(f"DROP TABLE {q(nome)}")
+        arquivadas.append(nome)
+    if arquivadas:
+        listagem_cache.marcar()
+    return arquivadas
@@ -0,0 +1,137 @@
+"""Resumo de solicitações por fornecedor x tipo profissional x mês.
+
+Atualizado na mesma transação que grava (ou remove) a solicitação, com um
+upsert que soma ao total existente, sem ler antes de escrever: gravações
+concorrentes não perdem incrementos. `reconstruir` recalcula o resumo a partir
+de `Solicitacao` (carga inicial ou correção). O painel lê só desta tabela.
+
+Os meses arquivados (`particao_service.arquivar`) saem de `Solicitacao`, mas
+seus totais continuam no resumo: `reconstruir` só recalcula a partir do mês da
+solicitação mais antiga ainda na tabela.
+"""
+
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Min
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.models import ResumoSolicitacao, Solicitacao
+from core.services.exportacao_service import inicio_do_dia
+
+# (fornecedor_id, primeiro dia do mês, tipo_profissional)
+Chave = tuple[int, date, str]
+
+LOTE_UPSERT = 1000
+
+
+def mes_de(data: datetime) -> date:
+    return timezone.localtime(data).date().replace(day=1)
+
+
+def somar_meses(mes: date, quantidade: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def chave_de(solicitacao: Solicitacao) -> Chave:
+    return (
+        solicitacao.fornecedor_id,
+        mes_de(solicitacao.data_solicitacao),
+        solicitacao.tipo_profissional,
+    )
+
+
+def incrementar(contagens: dict[Chave, int]) -> None:
+    """Soma `contagens` ao resumo (valores negativos decrementam)."""
+    # Ordem fixa das chaves: transações concorrentes travam as linhas na mesma
+    # ordem e não entram em deadlock
+    itens = sorted((chave, n) for chave, n in contagens.items() if n)
+    tabela = connection.ops.quote_name(ResumoSolicitacao._meta.db_table)
+    with connection.cursor() as cursor:
+        for i in range(0, len(itens), LOTE_UPSERT):
+            lote = itens[i : i + LOTE_UPSERT]
+            cursor.execute(
+                f"""
+                INSERT INTO {tabela} (fornecedor_id, mes, tipo_profissional, total)
+                VALUES {", ".join(["(%s, %s, %s, %s)"] * len(lote))}
+                ON CONFLICT (fornecedor_id, mes, tipo_profissional)
+                DO UPDATE SET total = {tabela}.total + EXCLUDED.total
+                """,
+                [valor for (fid, mes, tipo), n in lote for valor in (fid, mes, tipo, n)],
+            )
+
+
+def registrar(solicitacao: Solicitacao, quantidade: int = 1) -> None:
+    incrementar({chave_de(solicitacao): quantidade})
+
+
+def reconstruir(fornecedores_ids: list[int] | None = None, desde: date | None = None) -> int:
+    """Recalcula o resumo (opcionalmente só de alguns fornecedores e a partir
+    do mês de `desde`). Meses anteriores ao da solicitação mais antiga da tabela
+    (arquivados) são mantidos, mesmo com `desde` anterior a ele. Retorna a
+    quantidade de linhas do resumo gravadas."""
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # Bloqueia incrementos (não leituras) até o fim: as solicitações
+            # gravadas depois da agregação só incrementam após o commit
+            tabela = connection.ops.quote_name(ResumoSolicitacao._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {tabela} IN EXCLUSIVE MODE")
+
+        mais_antiga = Solicitacao.objects.aggregate(Min("data_solicitacao"))[
+            "data_solicitacao__min"
+        ]
+        if mais_antiga is None:
+            # Tudo arquivado (ou nada gravado): não há o que recalcular
+            return 0
+        primeiro = mes_de(mais_antiga)
+        desde = primeiro if desde is None else max(desde.replace(day=1), primeiro)
+
+        resumo = ResumoSolicitacao.objects.filter(mes__gte=desde)
+        solicitacoes = Solicitacao.objects.filter(data_solicitacao__gte=inicio_do_dia(desde))
+        if fornecedores_ids is not None:
+            resumo = resumo.filter(fornecedor_id__in=fornecedores_ids)
+            solicitacoes = solicitacoes.filter(fornecedor_id__in=fornecedores_ids)
+        resumo.delete()
+
+        agregados = (
+            solicitacoes.annotate(mes=TruncMonth("data_solicitacao", output_field=DateField()))
+            .values("fornecedor_id", "mes", "tipo_profissional")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        criados = ResumoSolicitacao.objects.bulk_create(
+            [ResumoSolicitacao(**agregado) for agregado in agregados], batch_size=5000
+        )
+    return len(criados)
+
+
+def tabela_painel(fornecedores_ids: list[int], meses: int) -> dict:
+    """Totais dos últimos `meses` meses: colunas (meses), linhas por fornecedor
+    x tipo profissional e totais por mês."""
+    fim = mes_de(timezone.now())
+    colunas = [somar_meses(fim, -i) for i in range(meses - 1, -1, -1)]
+    registros = (
+        ResumoSolicitacao.objects.filter(
+            fornecedor_id__in=fornecedores_ids, mes__gte=colunas[0], total__gt=0
+        )
+        .values_list("fornecedor_id", "fornecedor__nome", "tipo_profissional", "mes", "total")
+        .order_by("fornecedor__nome", "fornecedor_id", "tipo_profissional")
+    )
+    por_linha: dict[tuple, dict[date, int]] = {}
+    for fid, nome, tipo, mes, total in registros:
+        por_linha.setdefault((fid, nome, tipo), {})[mes] = total
+
+    linhas = []
+    for (_, nome, tipo), totais in por_linha.items():
+        valores = [totais.get(mes, 0) for mes in colunas]
+        linhas.append({"fornecedor": nome, "tipo": tipo, "valores": valores, "total": sum(valores)})
+    totais_mes = [sum(linha["valores"][i] for linha in linhas) for i in range(len(colunas))]
+    return {
+        "colunas": colunas,
+        "linhas": linhas,
+        "totais": totais_mes,
+        "total": sum(totais_mes),
+    }
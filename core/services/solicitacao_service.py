@@ -1,47 +1,82 @@
-import requests
-from core.models import Solicitacao
-from django.conf import settings
+import uuid
+
+from core.contexto import UsuarioContext
+from core.models import EnvioSolicitacao, Solicitacao
 from django import forms
+from django.db import IntegrityError, transaction
 from ..models import Usuario
 
-BASE_URL = settings.GERENCIAMENTO_ESCALA_API_URL + "solicitacoes"
-
 
-def salvar_solicitacao(form: forms.ModelForm, usuario: Usuario) -> Solicitacao:
-    # 1. Salvar localmente
-    solicitacao = form.save(commit=False)
-    solicitacao.cliente = (
-        usuario.tokens.first().contrato.clifornec
-    )  # Ajuste conforme seu relacionamento
-    solicitacao.fornecedor = (
-        usuario.tokens.first().empresa
-    )  # Ajuste conforme seu relacionamento
-    solicitacao.save()
-
-    # 2. Montar payload para o sistema de escala
-    payload = {
+def montar_payload(solicitacao: Solicitacao, usuario: Usuario) -> dict:
+    return {
+        # Devolvido pelo sistema de escala nos eventos de status (webhook)
+        "solicitacaoOrigemId": solicitacao.id,
         "tipoProfissional": solicitacao.tipo_profissional,
         "jornada": solicitacao.jornada,
         "observacoes": solicitacao.observacoes,
         "usuarioSolicitanteId": usuario.id,
-        "cliFornecId": solicitacao.cliente.id,
-        "empresaContratanteId": solicitacao.fornecedor.id,
-        "contratoId": usuario.tokens.first().contrato.id,
+        "cliFornecId": solicitacao.cliente_id,
+        "empresaContratanteId": solicitacao.fornecedor_id,
+        "contratoId": solicitacao.contrato_id,
     }
 
+
+def solicitacao_da_chave(chave, usuario: Usuario) -> int | None:
+    """Id da solicitação já gravada pelo usuário com a chave de idempotência,
+    se houver. Chaves de outros usuários não contam."""
     try:
-        response = requests.post(
-            f"{BASE_URL}/solicitacoes/criar",
-            json=payload,
-            timeout=10,
+        chave = uuid.UUID(str(chave))
+    except ValueError:
+        return None
+    return (
+        # O solicitante pelo payload: evita o JOIN com a tabela particionada
+        EnvioSolicitacao.objects.filter(
+            chave_idempotencia=chave, payload__usuarioSolicitanteId=usuario.id
+        )
+        .values_list("solicitacao_id", flat=True)
+        .first()
+    )
+
+
+def salvar_solicitacao(
+    form: forms.ModelForm, contexto: UsuarioContext
+) -> Solicitacao:
+    usuario = contexto.perfil
+    solicitacao = form.save(commit=False)
+
+    # Contrato do par cliente/fornecedor escolhido (o formulário já recusa
+    # pares sem contrato; aqui vale para tokens removidos no meio do caminho)
+    contrato = contexto.contrato_para(solicitacao.cliente_id, solicitacao.fornecedor_id)
+    if contrato is None:
+        raise forms.ValidationError(
+            "Você não tem contrato para este par de cliente e fornecedor."
         )
-        if response.status_code == 200:
-            print("Solicitação enviada com sucesso para o sistema de escala.")
-        else:
-            print(
-                f"Erro ao enviar solicitação para o sistema de escala: {response.text}"
+
+    # 1. Salvar localmente junto com o registro de envio (outbox)
+    solicitacao.contrato = contrato
+    solicitacao.usuario_solicitante = usuario
+
+    chave = form.cleaned_data.get("chave_idempotencia") or uuid.uuid4()
+    try:
+        with transaction.atomic():
+            solicitacao.save()
+            # 2. O envio para o sistema de escala é feito pelo comando
+            #    `despachar_solicitacoes`, fora do ciclo da requisição
+            EnvioSolicitacao.objects.create(
+                solicitacao=solicitacao,
+                payload=montar_payload(solicitacao, usuario),
+                chave_idempotencia=chave,
             )
-    except Exception as e:
-        print("Erro ao conectar com o sistema de escala:", str(e))
+            # O resumo mensal é atualizado pelo post_save (core.signals)
+    except IntegrityError:
+        # Repetição concorrente com a mesma chave: a transação foi desfeita e
+        # vale a solicitação gravada pela primeira
+        existente = solicitacao_da_chave(chave, usuario)
+        if existente is None:
+            if EnvioSolicitacao.objects.filter(chave_idempotencia=chave).exists():
+                # Chave de outro usuário (formulário adulterado)
+                raise forms.ValidationError("Formulário inválido. Recarregue a página.")
+            raise
+        return Solicitacao.objects.get(pk=existente)
 
     return solicitacao
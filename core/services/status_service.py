@@ -0,0 +1,162 @@
+"""Status das solicitações informado pelo sistema de escala (webhook).
+
+O sistema de escala envia lotes de eventos para `POST /webhook/status/`, com o
+corpo assinado por HMAC-SHA256 (`ESCALA_WEBHOOK_SEGREDO`). Cada evento traz o
+id da solicitação (`solicitacaoOrigemId`, enviado no payload de criação), o
+novo status e a versão do status no sistema de escala:
+
+    {"eventos": [{"id": "...", "solicitacaoOrigemId": 1, "status": "aceita", "versao": 2}]}
+
+Um lote vira um único UPDATE. Reentregas são descartadas pelo id do evento e
+eventos fora de ordem pela versão (só versões maiores que a gravada valem).
+Os ids ficam guardados por `ESCALA_WEBHOOK_RETENCAO_DIAS` (ver `limpar`).
+"""
+
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import EventoStatus, Solicitacao
+from core.services import listagem_cache
+
+CABECALHO_ASSINATURA = "X-Escala-Assinatura"
+STATUS = {valor for valor, _ in Solicitacao.STATUS_CHOICES}
+
+
+class LoteInvalido(ValueError):
+    """O corpo do webhook não é um lote de eventos."""
+
+
+@dataclass
+class Evento:
+    id: str
+    solicitacao_id: int
+    status: str
+    versao: int
+
+
+@dataclass
+class ResultadoLote:
+    recebidos: int = 0
+    invalidos: int = 0
+    duplicados: int = 0
+    aplicados: int = 0
+
+    @property
+    def ignorados(self) -> int:
+        # Versão antiga ou solicitação desconhecida
+        return self.recebidos - self.invalidos - self.duplicados - self.aplicados
+
+
+def assinatura(corpo: bytes, segredo: str) -> str:
+    return "sha256=" + hmac.new(segredo.encode(), corpo, hashlib.sha256).hexdigest()
+
+
+def assinatura_valida(corpo: bytes, recebida: str | None) -> bool:
+    segredo = settings.ESCALA_WEBHOOK_SEGREDO
+    if not segredo or not recebida:
+        return False
+    return hmac.compare_digest(assinatura(corpo, segredo), recebida)
+
+
+def _evento(item) -> Evento | None:
+    try:
+        evento = Evento(
+            id=str(item["id"]).strip(),
+            solicitacao_id=int(item["solicitacaoOrigemId"]),
+            status=str(item["status"]).strip().lower(),
+            versao=int(item["versao"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    max_id = EventoStatus._meta.get_field("id").max_length
+    if not 0 < len(evento.id) <= max_id or evento.status not in STATUS or evento.versao < 1:
+        return None
+    return evento
+
+
+def ler_lote(dados) -> tuple[list[Evento], int]:
+    """Eventos válidos do lote e a quantidade de inválidos."""
+    itens = dados.get("eventos") if isinstance(dados, dict) else None
+    if not isinstance(itens, list):
+        raise LoteInvalido('O corpo deve ter a lista "eventos".')
+    if len(itens) > settings.ESCALA_WEBHOOK_LOTE_MAX:
+        raise LoteInvalido(f"Lote maior que {settings.ESCALA_WEBHOOK_LOTE_MAX} eventos.")
+    eventos = [evento for evento in map(_evento, itens) if evento is not None]
+    return eventos, len(itens) - len(eventos)
+
+
+def _registrar_novos(cursor, eventos: list[Evento]) -> set[str]:
+    """Grava os ids dos eventos e devolve os que ainda não tinham chegado."""
+    tabela = connection.ops.quote_name(EventoStatus._meta.db_table)
+    agora = timezone.now()
+    valores = ", ".join(["(%s, %s)"] * len(eventos))
+    cursor.execute(
+        f"INSERT INTO {tabela} (id, recebido_em) VALUES {valores} "
+        "ON CONFLICT (id) DO NOTHING RETURNING id",
+        [param for evento in eventos for param in (evento.id, agora)],
+    )
+    return {id_ for (id_,) in cursor.fetchall()}
+
+
+def _atualizar(cursor, eventos: list[Evento]) -> int:
+    """Aplica os eventos; retorna quantas solicitações mudaram."""
+    q = connection.ops.quote_name
+    valores = ", ".join(["(%s::bigint, %s, %s::integer)"] * len(eventos))
+    cursor.execute(
+        f"UPDATE {q(Solicitacao._meta.db_table)} AS s "
+        "SET status = v.status, versao_status = v.versao "
+        f"FROM (VALUES {valores}) AS v (id, status, versao) "
+        "WHERE s.id = v.id AND s.versao_status < v.versao "
+        "RETURNING s.fornecedor_id",
+        [
+            param
+            for evento in eventos
+            for param in (evento.solicitacao_id, evento.status, evento.versao)
+        ],
+    )
+    fornecedores = [fornecedor_id for (fornecedor_id,) in cursor.fetchall()]
+    listagem_cache.marcar_no_commit(fornecedores)
+    return len(fornecedores)
+
+
+def aplicar(eventos: list[Evento], invalidos: int = 0) -> ResultadoLote:
+    """Aplica um lote de eventos (ver `ler_lote`) em uma transação."""
+    resultado = ResultadoLote(recebidos=len(eventos) + invalidos, invalidos=invalidos)
+    # Ids repetidos dentro do próprio lote contam como duplicados
+    unicos = list({evento.id: evento for evento in reversed(eventos)}.values())
+    if not unicos:
+        resultado.duplicados = len(eventos)
+        return resultado
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        novos_ids = _registrar_novos(cursor, unicos)
+        resultado.duplicados = len(eventos) - len(novos_ids)
+
+        # O UPDATE ... FROM precisa de uma linha por solicitação: vale a maior versão
+        ultimos: dict[int, Evento] = {}
+        for evento in unicos:
+            if evento.id in novos_ids:
+                atual = ultimos.get(evento.solicitacao_id)
+                if atual is None or evento.versao > atual.versao:
+                    ultimos[evento.solicitacao_id] = evento
+        if ultimos:
+            resultado.aplicados = _atualizar(
+                cursor, sorted(ultimos.values(), key=lambda evento: evento.solicitacao_id)
+            )
+    return resultado
+
+
+def limpar(dias: int | None = None) -> int:
+    """Apaga os ids de eventos recebidos há mais de `dias` (padrão:
+    `ESCALA_WEBHOOK_RETENCAO_DIAS`); retorna quantos foram apagados."""
+    if dias is None:
+        dias = settings.ESCALA_WEBHOOK_RETENCAO_DIAS
+    limite = timezone.now() - timedelta(days=dias)
+    apagados, _ = EventoStatus.objects.filter(recebido_em__lt=limite).delete()
+    return apagados
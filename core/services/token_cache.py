@@ -0,0 +1,96 @@
+"""Cache das validações de token feitas no gerenciamento de escala.
+
+Usa o cache do Django configurado em `ESCALA_TOKEN_CACHE` (local-memory por
+padrão). Tokens válidos ficam `ESCALA_TOKEN_CACHE_TTL` segundos; tokens
+recusados em definitivo (ver `token_service.STATUS_TOKEN_RECUSADO`) ficam
+`ESCALA_TOKEN_CACHE_TTL_NEGATIVO` segundos. Erros transitórios não são guardados.
+"""
+
+import hashlib
+import threading
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import metricas
+
+PREFIXO = "token-validacao:"
+INVALIDO = "__invalido__"
+_AUSENTE = object()
+
+_contadores = {"hits": 0, "misses": 0}
+_contadores_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.ESCALA_TOKEN_CACHE]
+
+
+def _chave(token: str) -> str:
+    # O token vem do usuário: usa hash para ter uma chave segura em qualquer backend
+    return PREFIXO + hashlib.sha256(token.encode()).hexdigest()
+
+
+def _contar(nome: str) -> None:
+    with _contadores_lock:
+        _contadores[nome] += 1
+
+
+def obter(token: str) -> tuple[bool, Any | None]:
+    """Retorna (encontrado, dados). `dados` é None para token inválido em cache."""
+    valor = _cache().get(_chave(token), _AUSENTE)
+    if valor is _AUSENTE:
+        _contar("misses")
+        return False, None
+    _contar("hits")
+    return True, None if valor == INVALIDO else valor
+
+
+def guardar(token: str, dados: Any) -> None:
+    _cache().set(_chave(token), dados, settings.ESCALA_TOKEN_CACHE_TTL)
+
+
+def guardar_invalido(token: str) -> None:
+    _cache().set(_chave(token), INVALIDO, settings.ESCALA_TOKEN_CACHE_TTL_NEGATIVO)
+
+
+def invalidar(token: str) -> None:
+    _cache().delete(_chave(token))
+
+
+async def aobter(token: str) -> tuple[bool, Any | None]:
+    valor = await _cache().aget(_chave(token), _AUSENTE)
+    if valor is _AUSENTE:
+        _contar("misses")
+        return False, None
+    _contar("hits")
+    return True, None if valor == INVALIDO else valor
+
+
+async def aguardar(token: str, dados: Any) -> None:
+    await _cache().aset(_chave(token), dados, settings.ESCALA_TOKEN_CACHE_TTL)
+
+
+async def aguardar_invalido(token: str) -> None:
+    await _cache().aset(
+        _chave(token), INVALIDO, settings.ESCALA_TOKEN_CACHE_TTL_NEGATIVO
+    )
+
+
+async def ainvalidar(token: str) -> None:
+    await _cache().adelete(_chave(token))
+
+
+def estatisticas() -> dict[str, int]:
+    with _contadores_lock:
+        return dict(_contadores)
+
+
+metricas.registrar(
+    metricas.Contador(
+        "escala_token_cache_total",
+        "Consultas ao cache de validação de tokens.",
+        lambda: [({"resultado": k}, v) for k, v in estatisticas().items()],
+    )
+)
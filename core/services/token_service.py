@@ -1,70 +1,181 @@
+import asyncio
+import logging
+from dataclasses import dataclass
 from typing import Any
 import requests
 
-from core.models import Cliente, Fornecedor, TokenSolicitacao, Usuario
-from solicitacao_escala import settings
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
-BASE_URL = settings.GERENCIAMENTO_ESCALA_API_URL + "solicitacao-token"
+from core.models import TokenSolicitacao, Usuario
+from core.services import catalogo_service, escala_client, escopo_service, token_cache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_INVALIDO = "Token inválido ou já utilizado."
+TOKEN_JA_ASSOCIADO = "Token já associado."
+# Recusas definitivas do sistema de escala, guardadas no cache negativo. As
+# demais (429, 408, 5xx...) são transitórias: a próxima tentativa consulta de novo
+STATUS_TOKEN_RECUSADO = frozenset({400, 404, 409})
+
+
+@dataclass
+class ResultadoToken:
+    token: str
+    sucesso: bool
+    mensagem: str = ""
 
 
 def validar_token(token: str) -> Any | None:
+    encontrado, dados = token_cache.obter(token)
+    if encontrado:
+        return dados
+
     try:
-        response = requests.get(f"{BASE_URL}/validar/{token}")
+        response = escala_client.get(f"solicitacao-token/validar/{token}")
         if response.status_code == 200:
-            return response.json()
+            dados = response.json()
+            token_cache.guardar(token, dados)
+            return dados
+        if response.status_code in STATUS_TOKEN_RECUSADO:
+            token_cache.guardar_invalido(token)
         return None
     except Exception as e:
-        print("Erro ao validar token:", e)
+        logger.warning("Erro ao validar token: %s", e)
         return None
 
 
 def associar_token(usuario: Usuario, token_str: str) -> bool:
-    base_url = settings.GERENCIAMENTO_ESCALA_API_URL
-
     # 1. VALIDAR TOKEN
-    validar_url = f"{base_url}solicitacao-token/validar/{token_str}"
-    response = requests.get(validar_url)
-    if response.status_code != 200:
+    dados_token = validar_token(token_str)
+    if dados_token is None:
         return False
 
-    dados_token = response.json()
-
     # 2. MARCAR COMO UTILIZADO
-    utilizar_url = f"{base_url}solicitacao-token/utilizar/{token_str}"
-    response_utilizar = requests.put(utilizar_url)
+    try:
+        response_utilizar = escala_client.put(f"solicitacao-token/utilizar/{token_str}")
+    except requests.RequestException as e:
+        logger.warning("Erro ao conectar com o sistema de escala: %s", e)
+        return False
+    # Utilizado (ou recusado): a validação em cache deixou de valer
+    token_cache.invalidar(token_str)
     if response_utilizar.status_code != 200:
         return False
 
-    # 3. SALVAR/ATUALIZAR FORNECEDOR (empresaContratante)
-    empresa = dados_token["empresaContratante"]
-    fornecedor, _ = Fornecedor.objects.update_or_create(
-        cnpj=empresa["cnpj"],
-        defaults={
-            "nome": empresa["razaoSocial"],
-            "email": dados_token.get("emailCliente", ""),
-            "url_sistema": base_url,  # Pode ajustar se vier outro campo apropriado
-        },
-    )
+    # 3. e 4. SALVAR CATÁLOGO E CRIAR TokenSolicitacao
+    return not gravar_associacoes(usuario, [(token_str, dados_token)])
+
+
+def gravar_associacoes(usuario: Usuario, validados: list[tuple[str, dict]]) -> set[str]:
+    """Grava, em uma transação, os tokens já utilizados no sistema de escala:
+    um upsert por modelo do catálogo e um único INSERT de TokenSolicitacao.
+    Retorna os tokens que não foram gravados por já estarem associados."""
+    # 3. SALVAR/ATUALIZAR FORNECEDOR, CLIENTE E CONTRATO
+    #    (empresaContratante, contratoCliente.cliFornec e contratoCliente)
+    registros = [catalogo_service.registro_de_token(dados) for _, dados in validados]
+    novos = [
+        TokenSolicitacao(
+            usuario=usuario,
+            token=token_str,
+            contrato_id=registro["contrato_id"],
+            utilizado=True,
+        )
+        for (token_str, _), registro in zip(validados, registros)
+    ]
+    recusados = set()
+    with transaction.atomic():
+        catalogo_service.sincronizar(registros, settings.GERENCIAMENTO_ESCALA_API_URL)
+
+        # 4. CRIAR TokenSolicitacao
+        try:
+            with transaction.atomic():
+                TokenSolicitacao.objects.bulk_create(novos)
+        except IntegrityError:
+            # Outra requisição gravou algum destes tokens depois da consulta
+            # inicial (ex.: o mesmo envio repetido em duas abas). Grava um a um
+            # para saber quais ficaram de fora sem perder os demais
+            for novo in novos:
+                try:
+                    with transaction.atomic():
+                        novo.save(force_insert=True)
+                except IntegrityError:
+                    recusados.add(novo.token)
+        if len(recusados) < len(novos):
+            transaction.on_commit(lambda: escopo_service.invalidar_escopo(usuario.user_id))
+    return recusados
 
-    # 4. SALVAR/ATUALIZAR CLIENTE (cliFornec dentro de contratoCliente)
-    cli = dados_token["contratoCliente"]["cliFornec"]
-    Cliente.objects.update_or_create(
-        cnpj=cli["cnpj"],
-        defaults={
-            "nome": cli["razaoSocial"],
-            "email": cli.get("email", ""),
-            "telefone": cli.get("telefone", ""),
-        },
-    )
 
-    # 5. CRIAR TokenSolicitacao
-    TokenSolicitacao.objects.create(
-        usuario=usuario,
-        token=token_str,
-        email_cliente=dados_token.get("emailCliente", ""),
-        empresa_id=fornecedor.id,
-        contrato_id=dados_token["contratoCliente"]["id"],
-        utilizado=True,
+async def avalidar_token(token: str) -> Any | None:
+    encontrado, dados = await token_cache.aobter(token)
+    if encontrado:
+        return dados
+
+    try:
+        response = await escala_client.aget(f"solicitacao-token/validar/{token}")
+        if response.status_code == 200:
+            dados = response.json()
+            await token_cache.aguardar(token, dados)
+            return dados
+        if response.status_code in STATUS_TOKEN_RECUSADO:
+            await token_cache.aguardar_invalido(token)
+        return None
+    except Exception as e:
+        logger.warning("Erro ao validar token: %s", e)
+        return None
+
+
+async def _resgatar_token(
+    token_str: str, semaforo: asyncio.Semaphore
+) -> tuple[dict | None, str]:
+    """Valida e utiliza um token no sistema de escala. Retorna (dados, erro)."""
+    async with semaforo:
+        dados_token = await avalidar_token(token_str)
+        if dados_token is None:
+            return None, TOKEN_INVALIDO
+
+        try:
+            response_utilizar = await escala_client.aput(
+                f"solicitacao-token/utilizar/{token_str}"
+            )
+        except escala_client.ERROS_CONEXAO as e:
+            logger.warning("Erro ao conectar com o sistema de escala: %s", e)
+            return None, "Sistema de escala indisponível. Tente novamente."
+        await token_cache.ainvalidar(token_str)
+        if response_utilizar.status_code != 200:
+            return None, TOKEN_INVALIDO
+        return dados_token, ""
+
+
+async def aassociar_tokens(usuario: Usuario, tokens: list[str]) -> list[ResultadoToken]:
+    """Associa vários tokens de uma vez: as chamadas ao sistema de escala correm
+    em paralelo (até `ESCALA_TOKENS_CONCORRENCIA`) e a gravação local é feita em
+    uma única transação. Retorna um resultado por token, na ordem recebida."""
+    ja_associados = {
+        t
+        async for t in TokenSolicitacao.objects.filter(token__in=tokens).values_list(
+            "token", flat=True
+        )
+    }
+    pendentes = [t for t in dict.fromkeys(tokens) if t not in ja_associados]
+
+    semaforo = asyncio.Semaphore(settings.ESCALA_TOKENS_CONCORRENCIA)
+    respostas = await asyncio.gather(
+        *(_resgatar_token(t, semaforo) for t in pendentes)
     )
 
-    return True
+    resultados = {t: ResultadoToken(t, False, TOKEN_JA_ASSOCIADO) for t in ja_associados}
+    validados = []
+    for token_str, (dados_token, erro) in zip(pendentes, respostas):
+        if dados_token is None:
+            resultados[token_str] = ResultadoToken(token_str, False, erro)
+        else:
+            validados.append((token_str, dados_token))
+            resultados[token_str] = ResultadoToken(token_str, True)
+
+    if validados:
+        recusados = await sync_to_async(gravar_associacoes)(usuario, validados)
+        for token_str in recusados:
+            resultados[token_str] = ResultadoToken(token_str, False, TOKEN_JA_ASSOCIADO)
+
+    return [resultados[t] for t in tokens]
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core import conexoes, metricas
+from core.models import Solicitacao, TokenSolicitacao, Usuario
+from core.services import listagem_cache, resumo_service
+from core.services.escopo_service import invalidar_escopo
+
+
+@receiver(pre_delete, sender=TokenSolicitacao)
+def invalidar_escopo_ao_remover_token(sender, instance, **kwargs):
+    user_id = (
+        Usuario.objects.filter(pk=instance.usuario_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id is not None:
+        transaction.on_commit(lambda: invalidar_escopo(user_id))
+
+
+# Campos que compõem a chave do resumo (resumo_service.chave_de)
+CAMPOS_RESUMO = {"fornecedor", "fornecedor_id", "data_solicitacao", "tipo_profissional"}
+
+
+@receiver(pre_save, sender=Solicitacao)
+def guardar_chave_do_resumo(sender, instance, using, update_fields, raw, **kwargs):
+    # Alterações (ex.: pelo admin) podem mudar a chave: guarda a gravada para
+    # mover a contagem no post_save
+    instance._chave_resumo = None
+    if raw or instance._state.adding or (
+        update_fields is not None and not CAMPOS_RESUMO & set(update_fields)
+    ):
+        return
+    gravada = (
+        Solicitacao.objects.using(using)
+        .filter(pk=instance.pk)
+        .values("fornecedor_id", "data_solicitacao", "tipo_profissional")
+        .first()
+    )
+    if gravada is not None:
+        instance._chave_resumo = resumo_service.chave_de(Solicitacao(**gravada))
+
+
+@receiver(post_save, sender=Solicitacao)
+def contar_no_resumo(sender, instance, created, raw, **kwargs):
+    # Na transação da gravação; cargas em massa (bulk_create) contam por conta própria
+    if raw:
+        return
+    if created:
+        resumo_service.registrar(instance)
+        return
+    anterior = getattr(instance, "_chave_resumo", None)
+    atual = resumo_service.chave_de(instance)
+    if anterior is not None and anterior != atual:
+        resumo_service.incrementar({anterior: -1, atual: 1})
+
+
+@receiver(post_delete, sender=Solicitacao)
+def descontar_do_resumo(sender, instance, **kwargs):
+    # Na transação da remoção (também nas remoções em massa pelo admin)
+    resumo_service.registrar(instance, -1)
+
+
+@receiver(post_save, sender=Solicitacao)
+@receiver(post_delete, sender=Solicitacao)
+def marcar_listagem(sender, instance, using, **kwargs):
+    # Cargas em massa (bulk_create, UPDATE) marcam por conta própria
+    listagem_cache.marcar_no_commit([instance.fornecedor_id], using)
+
+
+@receiver(connection_created)
+def instalar_medicao_de_consultas(sender, connection, **kwargs):
+    if metricas.medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metricas.medir_consulta)
+
+
+@receiver(connection_created)
+def contar_conexao(sender, connection, **kwargs):
+    conexoes.registrar_conexao(connection.alias)
@@ -0,0 +1,226 @@
+"""Servidor local que simula a API do Gerenciamento de Escala.
+
+Implementa as rotas consumidas pela aplicação com payloads no mesmo formato do
+sistema real e permite injetar latência, erros e timeouts para medir o
+comportamento dos serviços sem depender do Spring Boot:
+
+- `GET  solicitacao-token/validar/{token}`
+- `PUT  solicitacao-token/utilizar/{token}`
+- `POST solicitacoes/criar`
+- `GET  contratos-cliente?page=&size=`
+
+Tokens que começam com `invalido` não existem (404); um token só pode ser
+utilizado uma vez (409 na segunda).
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DISTRIBUICOES = ("fixa", "normal", "lognormal", "exponencial")
+
+
+@dataclass
+class ConfigSimulador:
+    prefixo: str = "/api/v1/"
+    latencia: str = "fixa"
+    latencia_media_ms: float = 0.0
+    latencia_desvio_ms: float = 0.0
+    taxa_erro: float = 0.0
+    taxa_timeout: float = 0.0
+    timeout_s: float = 30.0
+    contratos: int = 100
+    fornecedores: int = 10
+    clientes: int = 30
+    seed: int | None = None
+
+
+def cnpj_ficticio(prefixo: int, numero: int) -> str:
+    digitos = f"{prefixo}{numero:07d}"[-8:]
+    return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/0001-{numero % 100:02d}"
+
+
+@dataclass
+class EstadoSimulador:
+    config: ConfigSimulador
+    utilizados: set = field(default_factory=set)
+    solicitacoes_criadas: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.config.seed)
+
+    # Catálogo determinístico: contrato i -> fornecedor i % F, cliente i % C
+    def empresa(self, i: int) -> dict:
+        return {
+            "id": i + 1,
+            "cnpj": cnpj_ficticio(1, i + 1),
+            "razaoSocial": f"Cooperativa Simulada {i + 1}",
+            "email": f"contato@coop{i + 1}.example.com",
+        }
+
+    def cli_fornec(self, i: int) -> dict:
+        return {
+            "id": i + 1,
+            "cnpj": cnpj_ficticio(2, i + 1),
+            "razaoSocial": f"Hospital Simulado {i + 1}",
+            "email": f"escala@hospital{i + 1}.example.com",
+            "telefone": f"(11) 4000-{i + 1:04d}",
+        }
+
+    def contrato(self, i: int) -> dict:
+        return {
+            "id": i + 1,
+            "numero": f"CT-{i + 1:05d}",
+            "cliFornec": self.cli_fornec(i % self.config.clientes),
+            "empresaContratante": self.empresa(i % self.config.fornecedores),
+        }
+
+    def dados_token(self, token: str) -> dict:
+        i = int(hashlib.sha256(token.encode()).hexdigest(), 16) % self.config.contratos
+        contrato = self.contrato(i)
+        return {
+            "token": token,
+            "utilizado": token in self.utilizados,
+            "emailCliente": contrato["cliFornec"]["email"],
+            "empresaContratante": contrato.pop("empresaContratante"),
+            "contratoCliente": contrato,
+        }
+
+    def latencia(self) -> float:
+        c = self.config
+        media, desvio = c.latencia_media_ms / 1000, c.latencia_desvio_ms / 1000
+        with self.lock:
+            if c.latencia == "normal":
+                valor = self.rng.gauss(media, desvio)
+            elif c.latencia == "lognormal" and media > 0:
+                sigma2 = math.log(1 + (desvio / media) ** 2)
+                valor = self.rng.lognormvariate(math.log(media) - sigma2 / 2, math.sqrt(sigma2))
+            elif c.latencia == "exponencial" and media > 0:
+                valor = self.rng.expovariate(1 / media)
+            else:
+                valor = media
+        return max(0.0, valor)
+
+    def sortear(self, taxa: float) -> bool:
+        with self.lock:
+            return taxa > 0 and self.rng.random() < taxa
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    estado: EstadoSimulador
+
+    def log_message(self, format, *args):
+        pass
+
+    def _responder(self, status: int, corpo=None) -> None:
+        dados = b"" if corpo is None else json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _tratar(self, metodo: str) -> None:
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else b""
+
+        estado = self.estado
+        url = urlparse(self.path)
+        if not url.path.startswith(estado.config.prefixo):
+            return self._responder(404, {"erro": "rota inexistente"})
+        caminho = url.path[len(estado.config.prefixo):]
+
+        if estado.sortear(estado.config.taxa_timeout):
+            time.sleep(estado.config.timeout_s)
+            return self._responder(504, {"erro": "timeout simulado"})
+        time.sleep(estado.latencia())
+        if estado.sortear(estado.config.taxa_erro):
+            return self._responder(503, {"erro": "falha simulada"})
+
+        partes = caminho.strip("/").split("/")
+        if metodo == "GET" and partes[:2] == ["solicitacao-token", "validar"] and len(partes) == 3:
+            token = partes[2]
+            with estado.lock:
+                utilizado = token in estado.utilizados
+            if token.startswith("invalido") or utilizado:
+                return self._responder(404, {"erro": "token inválido"})
+            return self._responder(200, estado.dados_token(token))
+
+        if metodo == "PUT" and partes[:2] == ["solicitacao-token", "utilizar"] and len(partes) == 3:
+            token = partes[2]
+            if token.startswith("invalido"):
+                return self._responder(404, {"erro": "token inválido"})
+            with estado.lock:
+                if token in estado.utilizados:
+                    return self._responder(409, {"erro": "token já utilizado"})
+                estado.utilizados.add(token)
+            return self._responder(200, {"token": token, "utilizado": True})
+
+        if metodo == "POST" and partes == ["solicitacoes", "criar"]:
+            try:
+                json.loads(corpo or b"{}")
+            except ValueError:
+                return self._responder(400, {"erro": "json inválido"})
+            with estado.lock:
+                estado.solicitacoes_criadas += 1
+                novo_id = estado.solicitacoes_criadas
+            return self._responder(201, {"id": novo_id})
+
+        if metodo == "GET" and partes == ["contratos-cliente"]:
+            params = parse_qs(url.query)
+            pagina = int(params.get("page", ["0"])[0])
+            tamanho_pagina = int(params.get("size", ["20"])[0])
+            inicio = pagina * tamanho_pagina
+            fim = min(inicio + tamanho_pagina, estado.config.contratos)
+            return self._responder(
+                200,
+                {
+                    "content": [estado.contrato(i) for i in range(inicio, fim)],
+                    "number": pagina,
+                    "size": tamanho_pagina,
+                    "totalElements": estado.config.contratos,
+                    "last": fim >= estado.config.contratos,
+                },
+            )
+
+        return self._responder(404, {"erro": "rota inexistente"})
+
+    def do_GET(self):
+        self._tratar("GET")
+
+    def do_PUT(self):
+        self._tratar("PUT")
+
+    def do_POST(self):
+        self._tratar("POST")
+
+
+def criar_servidor(config: ConfigSimulador, host: str, porta: int) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"estado": EstadoSimulador(config)})
+    servidor = ThreadingHTTPServer((host, porta), handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def iniciar_em_thread(
+    config: ConfigSimulador, host: str = "127.0.0.1", porta: int = 0
+) -> ThreadingHTTPServer:
+    """Sobe o simulador em uma thread daemon (porta 0 = porta livre).
+    A URL base fica em `url_base(servidor)`; pare com `servidor.shutdown()`."""
+    servidor = criar_servidor(config, host, porta)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def url_base(servidor: ThreadingHTTPServer) -> str:
+    host, porta = servidor.server_address[:2]
+    prefixo = servidor.RequestHandlerClass.estado.config.prefixo
+    return f"http://{host}:{porta}{prefixo}"
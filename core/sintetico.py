@@ -0,0 +1,354 @@
+"""Geração de dados sintéticos em volume de produção (testes de capacidade).
+
+A topologia (hospitais, fornecedores, contratos por par, usuários, tokens e
+solicitações por mês) é gerada de forma determinística a partir de uma semente,
+com distribuições assimétricas (Zipf): poucos fornecedores concentram muitos
+hospitais e poucos contratos concentram a maior parte das solicitações.
+
+No PostgreSQL (psycopg 3) as tabelas são carregadas com `COPY`; nos demais
+casos, com `bulk_create` em lotes. Com `COPY`, os índices secundários e as
+chaves estrangeiras de `Solicitacao` são recriados depois da carga. Os ids são
+atribuídos aqui, a partir do maior id existente, e as sequences são ajustadas
+no final.
+"""
+
+import calendar
+import random
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from core.models import (
+    Cliente,
+    Contrato,
+    Fornecedor,
+    ResumoSolicitacao,
+    Solicitacao,
+    TokenSolicitacao,
+    Usuario,
+)
+from core.services import listagem_cache, particao_service, resumo_service
+from core.simulador import cnpj_ficticio
+
+SENHA_PADRAO = "sintetico123"
+TIPOS_PROFISSIONAL = (
+    ("Técnico de Enfermagem", 50),
+    ("Enfermeiro", 30),
+    ("Médico", 15),
+    ("Fisioterapeuta", 5),
+)
+JORNADAS = (("12x36", 60), ("8h", 25), ("6h", 15))
+
+
+@dataclass
+class Topologia:
+    hospitais: int = 1000
+    fornecedores: int = 200
+    fornecedores_por_hospital: int = 5
+    contratos_por_par: int = 2
+    usuarios: int = 20_000
+    tokens_por_usuario: int = 3
+    meses: int = 24
+    solicitacoes_por_mes: int = 400_000
+    crescimento_mensal: float = 0.02
+    assimetria: float = 1.1
+    seed: int = 0
+
+
+def pesos_zipf(n: int, s: float, rng: random.Random) -> list[float]:
+    """Pesos acumulados de uma Zipf(s) sobre `n` itens em ordem aleatória."""
+    pesos = [1 / (posicao + 1) ** s for posicao in range(n)]
+    rng.shuffle(pesos)
+    acumulado, total = [], 0.0
+    for peso in pesos:
+        total += peso
+        acumulado.append(total)
+    return acumulado
+
+
+def _acumular(opcoes) -> tuple[list, list[float]]:
+    valores, pesos = zip(*opcoes)
+    acumulado, total = [], 0
+    for peso in pesos:
+        total += peso
+        acumulado.append(total)
+    return list(valores), acumulado
+
+
+def _proximo_id(modelo) -> int:
+    maior = modelo.objects.aggregate(maior=models.Max("pk"))["maior"]
+    return (maior or 0) + 1
+
+
+def _usa_copy() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        return hasattr(cursor.cursor, "copy")
+
+
+@contextmanager
+def _preservando_datas(modelo, colunas):
+    """`bulk_create` sobrescreve campos `auto_now_add`; desliga-os enquanto
+    carrega valores gerados aqui."""
+    campos = [
+        f for f in modelo._meta.concrete_fields
+        if getattr(f, "auto_now_add", False) and f.attname in colunas
+    ]
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+@contextmanager
+def _indices_suspensos(modelo):
+    """PostgreSQL: remove índices secundários e chaves estrangeiras da tabela
+    durante a carga e os recria no final (criar um índice de uma vez e validar
+    a FK com uma única consulta é muito mais rápido que manter ambos linha a
+    linha). A tabela fica bloqueada até o fim da transação."""
+    tabela = modelo._meta.db_table
+    with connection.cursor() as cursor:
+        # Verifica já as FKs adiadas das tabelas carregadas antes (o ALTER TABLE
+        # falha com eventos de trigger pendentes)
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = i.indexrelid)
+            """,
+            [tabela],
+        )
+        indices = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [tabela],
+        )
+        fks = cursor.fetchall()
+        q = connection.ops.quote_name
+        for nome, _ in fks:
+            cursor.execute(f"ALTER TABLE {q(tabela)} DROP CONSTRAINT {q(nome)}")
+        for nome, _ in indices:
+            cursor.execute(f"DROP INDEX {q(nome)}")
+    yield
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        for _, definicao in indices:
+            # Em tabela particionada a definição vem com "ON ONLY", que criaria
+            # o índice só na tabela-mãe
+            cursor.execute(definicao.replace(" ON ONLY ", " ON ", 1))
+        for nome, definicao in fks:
+            cursor.execute(f"ALTER TABLE {q(tabela)} ADD CONSTRAINT {q(nome)} {definicao}")
+
+
+def carregar(modelo, colunas: list[str], linhas: Iterable[tuple], copy: bool, lote: int) -> int:
+    """Grava `linhas` (tuplas na ordem de `colunas`) na tabela do modelo."""
+    total = 0
+    if copy:
+        q = connection.ops.quote_name
+        sql = (
+            f"COPY {q(modelo._meta.db_table)} "
+            f"({', '.join(q(modelo._meta.get_field(c).column) for c in colunas)}) FROM STDIN"
+        )
+        with connection.cursor() as cursor, cursor.cursor.copy(sql) as destino:
+            for linha in linhas:
+                destino.write_row(linha)
+                total += 1
+        return total
+
+    iterador = iter(linhas)
+    with _preservando_datas(modelo, colunas):
+        while bloco := list(islice(iterador, lote)):
+            modelo.objects.bulk_create([modelo(**dict(zip(colunas, linha))) for linha in bloco])
+            total += len(bloco)
+    return total
+
+
+def _meses(quantidade: int, fim: datetime) -> Iterator[tuple[int, datetime, int]]:
+    """(índice, início do mês, segundos no mês) dos `quantidade` meses até `fim`."""
+    ano, mes = fim.year, fim.month
+    for _ in range(quantidade - 1):
+        ano, mes = (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+    for indice in range(quantidade):
+        dias = calendar.monthrange(ano, mes)[1]
+        yield indice, datetime(ano, mes, 1, tzinfo=dt_timezone.utc), dias * 86400
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def gerar(
+    topologia: Topologia,
+    lote: int = 10_000,
+    copy: bool | None = None,
+    progresso=None,
+) -> dict[str, int]:
+    """Gera e grava toda a topologia em uma transação. Retorna linhas por tabela.
+    `progresso(tabela, linhas)` é chamado ao fim de cada tabela."""
+    t = topologia
+    rng = random.Random(t.seed)
+    copy = _usa_copy() if copy is None else copy
+    progresso = progresso or (lambda tabela, linhas: None)
+    agora = datetime.now(dt_timezone.utc)
+    url_sistema = "http://localhost:8080/api/v1/"
+    totais: dict[str, int] = {}
+
+    def registrar(nome: str, linhas: int) -> None:
+        totais[nome] = linhas
+        progresso(nome, linhas)
+
+    with transaction.atomic():
+        # Fornecedores e hospitais (clientes)
+        id_fornecedor = _proximo_id(Fornecedor)
+        fornecedores = list(range(id_fornecedor, id_fornecedor + t.fornecedores))
+        registrar("fornecedor", carregar(
+            Fornecedor, ["id", "nome", "cnpj", "email", "url_sistema"],
+            (
+                (fid, f"Cooperativa {fid}", cnpj_ficticio(5, fid),
+                 f"contato@coop{fid}.example.com", url_sistema)
+                for fid in fornecedores
+            ),
+            copy, lote,
+        ))
+        id_cliente = _proximo_id(Cliente)
+        hospitais = list(range(id_cliente, id_cliente + t.hospitais))
+        registrar("cliente", carregar(
+            Cliente, ["id", "nome", "cnpj", "email", "telefone"],
+            (
+                (cid, f"Hospital {cid}", cnpj_ficticio(6, cid),
+                 f"escala@hospital{cid}.example.com", "(11) 4000-0000")
+                for cid in hospitais
+            ),
+            copy, lote,
+        ))
+
+        # Pares hospital x fornecedor: fornecedores grandes atendem muitos hospitais
+        peso_fornecedor = pesos_zipf(len(fornecedores), t.assimetria, rng)
+        contratos: list[tuple[int, int, int]] = []  # (id, cliente, fornecedor)
+        proximo_contrato = _proximo_id(Contrato)
+        for cid in hospitais:
+            pares = set(rng.choices(
+                fornecedores, cum_weights=peso_fornecedor, k=t.fornecedores_por_hospital
+            ))
+            for fid in sorted(pares):
+                for _ in range(t.contratos_por_par):
+                    contratos.append((proximo_contrato, cid, fid))
+                    proximo_contrato += 1
+        registrar("contrato", carregar(
+            Contrato, ["id", "numero", "cliente_id", "fornecedor_id"],
+            ((ctid, f"S-{ctid:08d}", cid, fid) for ctid, cid, fid in contratos),
+            copy, lote,
+        ))
+        contratos_por_fornecedor: dict[int, list[int]] = {}
+        for ctid, _, fid in contratos:
+            contratos_por_fornecedor.setdefault(fid, []).append(ctid)
+
+        # Usuários: um único hash de senha para todos (um por usuário levaria horas)
+        senha = make_password(SENHA_PADRAO)
+        id_user = _proximo_id(User)
+        users = list(range(id_user, id_user + t.usuarios))
+        registrar("auth_user", carregar(
+            User,
+            ["id", "password", "is_superuser", "username", "first_name", "last_name",
+             "email", "is_staff", "is_active", "date_joined"],
+            (
+                (uid, senha, False, f"usuario{uid}@sintetico.example.com", "", "",
+                 f"usuario{uid}@sintetico.example.com", False, True, agora)
+                for uid in users
+            ),
+            copy, lote,
+        ))
+        id_usuario = _proximo_id(Usuario)
+        usuarios = list(range(id_usuario, id_usuario + t.usuarios))
+        registrar("usuario", carregar(
+            Usuario, ["id", "user_id", "nome_completo"],
+            ((pid, uid, f"Usuário {uid}") for pid, uid in zip(usuarios, users)),
+            copy, lote,
+        ))
+
+        # Cada usuário trabalha para um fornecedor (com contratos) e tem tokens
+        # de contratos dele
+        com_contratos = [fid for fid in fornecedores if fid in contratos_por_fornecedor]
+        peso_com_contratos = pesos_zipf(len(com_contratos), t.assimetria, rng)
+        solicitante: dict[int, int] = {}
+        tokens: list[tuple] = []
+        id_token = _proximo_id(TokenSolicitacao)
+        for pid in usuarios:
+            fid = rng.choices(com_contratos, cum_weights=peso_com_contratos)[0]
+            for ctid in set(rng.choices(contratos_por_fornecedor[fid], k=t.tokens_por_usuario)):
+                solicitante.setdefault(ctid, pid)
+                tokens.append((id_token, pid, f"sint-{t.seed}-{id_token}", ctid, True, agora))
+                id_token += 1
+        registrar("token", carregar(
+            TokenSolicitacao,
+            ["id", "usuario_id", "token", "contrato_id", "utilizado", "criado_em"],
+            tokens, copy, lote,
+        ))
+
+        # Solicitações: volume mensal crescente, concentrado em poucos contratos
+        peso_contrato = pesos_zipf(len(contratos), t.assimetria, rng)
+        tipos, peso_tipo = _acumular(TIPOS_PROFISSIONAL)
+        jornadas, peso_jornada = _acumular(JORNADAS)
+        padrao = usuarios[0] if usuarios else _proximo_id(Usuario) - 1
+        id_solicitacao = _proximo_id(Solicitacao)
+
+        def solicitacoes() -> Iterator[tuple]:
+            nonlocal id_solicitacao
+            for indice, inicio, segundos in _meses(t.meses, agora):
+                fator = (1 + t.crescimento_mensal) ** (indice - t.meses + 1)
+                quantidade = int(t.solicitacoes_por_mes * fator)
+                sorteados = rng.choices(contratos, cum_weights=peso_contrato, k=quantidade)
+                instantes = sorted(rng.random() * segundos for _ in range(quantidade))
+                tipos_mes = rng.choices(tipos, cum_weights=peso_tipo, k=quantidade)
+                jornadas_mes = rng.choices(jornadas, cum_weights=peso_jornada, k=quantidade)
+                for (ctid, cid, fid), instante, tipo, jornada in zip(
+                    sorteados, instantes, tipos_mes, jornadas_mes
+                ):
+                    data = inicio + timedelta(seconds=instante)
+                    if data > agora:
+                        break
+                    yield (
+                        id_solicitacao, cid, fid, ctid, solicitante.get(ctid, padrao),
+                        data, tipo, jornada, "",
+                    )
+                    id_solicitacao += 1
+
+        if particao_service.particionada():
+            atual = resumo_service.mes_de(agora)
+            particao_service.garantir_particoes(resumo_service.somar_meses(atual, 1 - t.meses), atual)
+
+        with _indices_suspensos(Solicitacao) if copy else nullcontext():
+            registrar("solicitacao", carregar(
+                Solicitacao,
+                ["id", "cliente_id", "fornecedor_id", "contrato_id", "usuario_solicitante_id",
+                 "data_solicitacao", "tipo_profissional", "jornada", "observacoes"],
+                solicitacoes(), copy, lote,
+            ))
+
+        modelos = [Fornecedor, Cliente, Contrato, User, Usuario, TokenSolicitacao, Solicitacao]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), modelos):
+                cursor.execute(sql)
+
+        # A carga em massa não passa por salvar_solicitacao
+        registrar("resumo", resumo_service.reconstruir(fornecedores))
+        listagem_cache.marcar()
+        modelos.append(ResumoSolicitacao)
+
+    if connection.vendor == "postgresql":
+        # Estatísticas atualizadas para que os planos reflitam o novo volume
+        with connection.cursor() as cursor:
+            for modelo in modelos:
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}")
+    return totais
@@ -0,0 +1,40 @@
+"""Registros mínimos para os testes que usam o banco."""
+
+from django.contrib.auth.models import User
+
+from core.models import Cliente, Contrato, Fornecedor, Solicitacao, TokenSolicitacao, Usuario
+
+
+def criar_usuario(email: str = "u@u.com") -> Usuario:
+    return Usuario.objects.create(
+        user=User.objects.create_user(email, email=email), nome_completo=email
+    )
+
+
+def criar_contrato(n: int = 1) -> Contrato:
+    cliente = Cliente.objects.create(
+        nome=f"Hospital {n}", cnpj=f"11.111.111/0001-{n:02d}", email="h@h.com", telefone="1"
+    )
+    fornecedor = Fornecedor.objects.create(
+        nome=f"Cooperativa {n}",
+        cnpj=f"22.222.222/0001-{n:02d}",
+        email="c@c.com",
+        url_sistema="http://c.com",
+    )
+    return Contrato.objects.create(numero=f"C{n}", cliente=cliente, fornecedor=fornecedor)
+
+
+def vincular(usuario: Usuario, contrato: Contrato, token: str) -> TokenSolicitacao:
+    return TokenSolicitacao.objects.create(
+        usuario=usuario, contrato=contrato, token=token, utilizado=True
+    )
+
+
+def criar_solicitacao(contrato: Contrato, usuario: Usuario, **campos) -> Solicitacao:
+    return Solicitacao.objects.create(
+        cliente_id=contrato.cliente_id,
+        fornecedor_id=contrato.fornecedor_id,
+        contrato=contrato,
+        usuario_solicitante=usuario,
+        **{"tipo_profissional": "Enfermeiro", "jornada": "6h", **campos},
+    )
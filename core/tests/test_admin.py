@@ -0,0 +1,102 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.admin import BuscaIndexadaAdmin, FiltroFornecedor
+from core.models import Cliente, Contrato, Fornecedor, Solicitacao, Usuario
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario
+
+
+class BuscaIndexadaAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Cliente.objects.create(
+            nome="Hospital Central", cnpj="11.111.111/0001-11", email="h@h.com", telefone="1"
+        )
+        cls.fornecedor = Fornecedor.objects.create(
+            nome="Cooperativa", cnpj="22.222.222/0001-22", email="c@c.com", url_sistema="http://c.com"
+        )
+        contrato = Contrato.objects.create(
+            numero="C1", cliente=cls.cliente, fornecedor=cls.fornecedor
+        )
+        usuario = Usuario.objects.create(
+            user=User.objects.create_user("u@u.com"), nome_completo="Usuário"
+        )
+        cls.solicitacao = Solicitacao.objects.create(
+            cliente=cls.cliente,
+            fornecedor=cls.fornecedor,
+            contrato=contrato,
+            usuario_solicitante=usuario,
+            tipo_profissional="Enfermeiro",
+            jornada="6h",
+        )
+
+    def buscar(self, modelo, termo):
+        model_admin = admin.site._registry[modelo]
+        queryset, _ = model_admin.get_search_results(
+            RequestFactory().get("/"), modelo.objects.all(), termo
+        )
+        return list(queryset)
+
+    def test_empresa_por_inicio_do_nome_cnpj_ou_id(self):
+        for termo in ("hospital", "11.111.111/0001-11", str(self.cliente.pk)):
+            with self.subTest(termo=termo):
+                self.assertEqual(self.buscar(Cliente, termo), [self.cliente])
+        self.assertEqual(self.buscar(Cliente, "central"), [])
+
+    def test_solicitacao_por_cnpj_relacionado_ou_id(self):
+        for termo in ("22.222.222/0001-22", "11.111.111/0001-11", str(self.solicitacao.pk)):
+            with self.subTest(termo=termo):
+                self.assertEqual(self.buscar(Solicitacao, termo), [self.solicitacao])
+        self.assertEqual(self.buscar(Solicitacao, "33.333.333/0001-33"), [])
+
+    def test_subclasse_sem_campos_de_busca(self):
+        class SemCampos(BuscaIndexadaAdmin):
+            pass
+
+        erros = SemCampos(Cliente, admin.AdminSite()).check()
+        self.assertEqual([erro.id for erro in erros], ["core.E001"])
+
+
+class FiltroFornecedorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin@a.com", password="x")
+        cls.contratos = [criar_contrato(n) for n in (1, 2)]
+        usuario = criar_usuario()
+        cls.solicitacoes = [criar_solicitacao(contrato, usuario) for contrato in cls.contratos]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def listar(self, **parametros):
+        return self.client.get(reverse("admin:core_solicitacao_changelist"), parametros)
+
+    def filtro(self, response):
+        return next(
+            spec for spec in response.context["cl"].filter_specs if isinstance(spec, FiltroFornecedor)
+        )
+
+    def test_nao_lista_os_fornecedores(self):
+        response = self.listar()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'name="fornecedor_id"')
+        self.assertEqual(self.filtro(response).lookup_choices, [])
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+    def test_filtra_pelo_id(self):
+        fornecedor = self.contratos[0].fornecedor
+        response = self.listar(fornecedor_id=fornecedor.pk, status__exact="aguardando")
+        self.assertEqual(list(response.context["cl"].result_list), [self.solicitacoes[0]])
+        self.assertEqual(self.filtro(response).lookup_choices, [(str(fornecedor.pk), "Cooperativa 1")])
+        # O formulário do campo mantém os demais filtros
+        self.assertContains(
+            response, '<input type="hidden" name="status__exact" value="aguardando">'
+        )
+
+    def test_id_invalido(self):
+        response = self.listar(fornecedor_id="abc")
+        self.assertRedirects(
+            response, reverse("admin:core_solicitacao_changelist") + "?e=1", fetch_redirect_response=False
+        )
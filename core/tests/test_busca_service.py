@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Solicitacao
+from core.services import busca_service
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario
+
+
+class BuscaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        contrato = criar_contrato(1)
+        usuario = criar_usuario()
+        agora = timezone.now()
+        registros = [
+            # (tipo, jornada, observações), da mais antiga para a mais recente
+            ("Enfermeiro", "12x36", "plantão noturno"),
+            ("Técnico de enfermagem", "6h", "cobertura de férias"),
+            ("Médico", "24h", "apoio ao enfermeiro do plantão"),
+            ("Fisioterapeuta", "6h", "plantão diurno"),
+        ]
+        for i, (tipo, jornada, observacoes) in enumerate(registros):
+            solicitacao = criar_solicitacao(
+                contrato, usuario, tipo_profissional=tipo, jornada=jornada, observacoes=observacoes
+            )
+            Solicitacao.objects.filter(pk=solicitacao.pk).update(
+                data_solicitacao=agora - timedelta(hours=len(registros) - i)
+            )
+
+    def buscar(self, termo, limite=10):
+        return [s.tipo_profissional for s in busca_service.buscar(Solicitacao.objects.all(), termo, limite)]
+
+    def test_sintaxe_de_buscador(self):
+        self.assertEqual(self.buscar("enfermeiro -médico"), ["Enfermeiro"])
+        self.assertEqual(self.buscar('"plantão noturno"'), ["Enfermeiro"])
+        self.assertEqual(
+            set(self.buscar("fisioterapeuta OR férias")),
+            {"Fisioterapeuta", "Técnico de enfermagem"},
+        )
+        self.assertEqual(self.buscar("cirurgião"), [])
+
+    def test_relevancia_pelos_pesos(self):
+        # No tipo profissional (peso A) vale mais que nas observações (peso C),
+        # mesmo sendo a mais antiga
+        self.assertEqual(self.buscar("enfermeiro"), ["Enfermeiro", "Médico"])
+        self.assertEqual(self.buscar("enfermeiro", limite=1), ["Enfermeiro"])
+
+    @override_settings(BUSCA_CANDIDATOS=1)
+    def test_relevancia_so_entre_os_candidatos_mais_recentes(self):
+        # Só a ocorrência mais recente é candidata: a mais relevante fica de fora
+        self.assertEqual(self.buscar("enfermeiro"), ["Médico"])
+
+    def test_sem_pg_trgm_nao_casa_por_similaridade(self):
+        with mock.patch.object(busca_service, "trigrama_disponivel", return_value=False):
+            self.assertNotIn("tipo_profissional__trigram_similar", str(busca_service.filtro("x")))
+            self.assertEqual(self.buscar("enfermiero"), [])
+            self.assertEqual(self.buscar("enfermeiro"), ["Enfermeiro", "Médico"])
+
+    def test_com_pg_trgm_casa_erros_de_digitacao(self):
+        if not busca_service.trigrama_disponivel():
+            self.skipTest("Extensão pg_trgm indisponível neste PostgreSQL")
+        self.assertEqual(self.buscar("Enfermiero")[0], "Enfermeiro")
+
+    def test_normalizar(self):
+        with self.settings(BUSCA_TERMO_MAX=5):
+            self.assertEqual(busca_service.normalizar("  enfermeiro  "), "enfer")
+        self.assertEqual(busca_service.normalizar(None), "")
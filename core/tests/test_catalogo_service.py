@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from core.models import Contrato
+from core.services import catalogo_service
+from core.simulador import ConfigSimulador, EstadoSimulador
+from core.tests.dados import criar_contrato
+
+
+class SincronizarTests(TestCase):
+    def sincronizar(self, *ids):
+        simulador = EstadoSimulador(ConfigSimulador())
+        registros = [
+            catalogo_service.registro_de_contrato(
+                {**simulador.contrato(i), "id": id_}, simulador.empresa(i)
+            )
+            for i, id_ in enumerate(ids)
+        ]
+        return catalogo_service.sincronizar(registros, "http://escala.test/")
+
+    def test_contrato_local_nao_colide_com_ids_do_sistema(self):
+        inicial = criar_contrato(1)
+        self.sincronizar(inicial.pk + 1, inicial.pk + 5)
+        local = criar_contrato(2)
+        self.assertEqual(local.pk, inicial.pk + 6)
+
+    def test_ids_menores_nao_recuam_a_sequencia(self):
+        # A sequência não volta com o rollback dos testes: ids relativos
+        inicial = criar_contrato(1).pk
+        self.sincronizar(inicial + 500)
+        self.sincronizar(inicial + 10)
+        self.assertEqual(criar_contrato(2).pk, inicial + 501)
+
+    def test_upsert_atualiza_o_contrato_existente(self):
+        id_ = criar_contrato(1).pk + 1
+        self.assertEqual(self.sincronizar(id_)["contratos"], 1)
+        self.sincronizar(id_)
+        self.assertEqual(Contrato.objects.filter(pk=id_).count(), 1)
@@ -0,0 +1,131 @@
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from core import conexoes, metricas
+
+
+def carregar_settings(**ambiente):
+    """Executa solicitacao_escala/settings.py de novo com as variáveis dadas."""
+    origem = importlib.util.find_spec("solicitacao_escala.settings").origin
+    spec = importlib.util.spec_from_file_location("settings_em_teste", origem)
+    modulo = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(os.environ, ambiente):
+        for nome in ("DATABASE_CONEXOES", "DATABASE_REPLICA_HOST"):
+            if nome not in ambiente:
+                os.environ.pop(nome, None)
+        spec.loader.exec_module(modulo)
+    return modulo
+
+
+class ModoDeConexoesTests(SimpleTestCase):
+    def test_nenhum_e_o_padrao(self):
+        modulo = carregar_settings()
+        self.assertEqual(modulo.BANCO_CONEXOES, "nenhum")
+        banco = modulo.DATABASES["default"]
+        self.assertNotIn("CONN_MAX_AGE", banco)
+        self.assertNotIn("pool", banco.get("OPTIONS", {}))
+
+    def test_persistente(self):
+        banco = carregar_settings(
+            DATABASE_CONEXOES="persistente", DATABASE_CONN_MAX_AGE="120"
+        ).DATABASES["default"]
+        self.assertEqual(banco["CONN_MAX_AGE"], 120)
+        self.assertTrue(banco["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("pool", banco.get("OPTIONS", {}))
+
+    def test_pool(self):
+        with mock.patch.dict(sys.modules, {"psycopg_pool": mock.Mock()}):
+            modulo = carregar_settings(
+                DATABASE_CONEXOES="pool",
+                DATABASE_POOL_MIN="1",
+                DATABASE_POOL_MAX="4",
+                DATABASE_POOL_TIMEOUT="2.5",
+                DATABASE_REPLICA_HOST="replica.local",
+            )
+        self.assertEqual(
+            modulo.DATABASES["default"]["OPTIONS"]["pool"],
+            {"min_size": 1, "max_size": 4, "timeout": 2.5},
+        )
+        self.assertNotIn("CONN_MAX_AGE", modulo.DATABASES["default"])
+        # A réplica copia a configuração de conexões do default
+        self.assertEqual(
+            modulo.DATABASES["replica"]["OPTIONS"]["pool"],
+            modulo.DATABASES["default"]["OPTIONS"]["pool"],
+        )
+
+    def test_pool_sem_psycopg_pool(self):
+        with mock.patch.dict(sys.modules, {"psycopg_pool": None}):
+            with self.assertRaisesMessage(ImproperlyConfigured, "psycopg[pool]"):
+                carregar_settings(DATABASE_CONEXOES="pool")
+
+    def test_modo_desconhecido(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "DATABASE_CONEXOES inválido: pgbouncer"):
+            carregar_settings(DATABASE_CONEXOES="pgbouncer")
+
+
+class MetricasDeConexoesTests(SimpleTestCase):
+    def test_conexoes_obtidas(self):
+        antes = conexoes.conexoes_obtidas().get("teste", 0)
+        conexoes.registrar_conexao("teste")
+        conexoes.registrar_conexao("teste")
+        self.assertEqual(conexoes.conexoes_obtidas()["teste"], antes + 2)
+        self.assertIn(
+            f'escala_db_conexoes_obtidas_total{{banco="teste"}} {antes + 2}',
+            metricas.exportar_prometheus(),
+        )
+
+    def test_sem_pool_nao_exporta_series_do_pool(self):
+        texto = metricas.exportar_prometheus()
+        self.assertIn("# TYPE escala_db_pool_conexoes gauge", texto)
+        self.assertNotIn("escala_db_pool_conexoes{", texto)
+        self.assertNotIn("escala_db_pool_aguardando{", texto)
+
+    def test_estatisticas_do_pool(self):
+        estatisticas = {
+            "pool_size": 4,
+            "pool_available": 1,
+            "pool_min": 2,
+            "pool_max": 10,
+            "requests_waiting": 3,
+            "requests_num": 50,
+            "requests_queued": 7,
+            "requests_wait_ms": 1500,
+            "requests_errors": 1,
+            "connections_num": 6,
+        }
+        with mock.patch.object(
+            conexoes, "estatisticas_pools", return_value={"default": estatisticas}
+        ):
+            linhas = metricas.exportar_prometheus().splitlines()
+        for esperada in (
+            "# TYPE escala_db_pool_conexoes gauge",
+            'escala_db_pool_conexoes{banco="default",estado="abertas"} 4',
+            'escala_db_pool_conexoes{banco="default",estado="disponiveis"} 1',
+            'escala_db_pool_conexoes{banco="default",estado="minimo"} 2',
+            'escala_db_pool_conexoes{banco="default",estado="maximo"} 10',
+            "# TYPE escala_db_pool_aguardando gauge",
+            'escala_db_pool_aguardando{banco="default"} 3',
+            'escala_db_pool_retiradas_total{banco="default"} 50',
+            'escala_db_pool_retiradas_enfileiradas_total{banco="default"} 7',
+            'escala_db_pool_espera_segundos_total{banco="default"} 1.5',
+            'escala_db_pool_timeouts_total{banco="default"} 1',
+            'escala_db_pool_conexoes_criadas_total{banco="default"} 6',
+        ):
+            self.assertIn(esperada, linhas)
+
+    def test_estatisticas_pools_so_dos_bancos_com_pool(self):
+        pool = mock.Mock()
+        pool.get_stats.return_value = {"pool_size": 2}
+        conexao = mock.Mock(pool=pool)
+        configuracoes = {"default": {"OPTIONS": {"pool": {"max_size": 4}}}, "replica": {}}
+        with mock.patch.object(conexoes, "connections") as conexoes_mock:
+            conexoes_mock.__iter__.return_value = iter(configuracoes)
+            conexoes_mock.settings = configuracoes
+            conexoes_mock.__getitem__.return_value = conexao
+            self.assertEqual(conexoes.estatisticas_pools(), {"default": {"pool_size": 2}})
+        conexoes_mock.__getitem__.assert_called_once_with("default")
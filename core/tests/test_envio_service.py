@@ -0,0 +1,166 @@
+import threading
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.models import EnvioSolicitacao
+from core.services import envio_service
+
+
+def resposta(status_code, texto=""):
+    return mock.Mock(status_code=status_code, text=texto)
+
+
+def criar_envio(solicitacao_id, **campos):
+    # Sem FK no banco (migração 0008): o envio não precisa da solicitação
+    return EnvioSolicitacao.objects.create(
+        solicitacao_id=solicitacao_id, payload={"id": solicitacao_id}, **campos
+    )
+
+
+class ReservaTests(TestCase):
+    def test_reserva_pendentes_vencidos_e_adia_a_proxima_tentativa(self):
+        agora = timezone.now()
+        vencido = criar_envio(1)
+        criar_envio(2, proxima_tentativa=agora + timedelta(minutes=5))
+        criar_envio(3, status=EnvioSolicitacao.ENVIADO)
+
+        self.assertEqual([e.pk for e in envio_service.reservar_lote(10)], [vencido.pk])
+        vencido.refresh_from_db()
+        self.assertGreaterEqual(
+            vencido.proxima_tentativa, agora + timedelta(seconds=settings.ESCALA_ENVIO_RESERVA)
+        )
+        # Reservado: outro despachante não pega o mesmo envio
+        self.assertEqual(envio_service.reservar_lote(10), [])
+
+    def test_reserva_expirada_volta_ao_lote(self):
+        envio = criar_envio(1)
+        envio_service.reservar_lote(10)
+        # Despachante que morreu sem registrar o resultado
+        EnvioSolicitacao.objects.filter(pk=envio.pk).update(
+            proxima_tentativa=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual([e.pk for e in envio_service.reservar_lote(10)], [envio.pk])
+
+    def test_respeita_o_tamanho_do_lote_em_ordem(self):
+        agora = timezone.now()
+        envios = [
+            criar_envio(i, proxima_tentativa=agora - timedelta(minutes=i)) for i in range(1, 4)
+        ]
+        self.assertEqual(
+            [e.pk for e in envio_service.reservar_lote(2)], [envios[2].pk, envios[1].pk]
+        )
+
+
+class ReservaConcorrenteTests(TransactionTestCase):
+    def test_linhas_travadas_por_outro_despachante_sao_puladas(self):
+        travado, livre = criar_envio(1), criar_envio(2)
+        travou, liberar = threading.Event(), threading.Event()
+
+        def outro_despachante():
+            try:
+                with transaction.atomic():
+                    EnvioSolicitacao.objects.select_for_update().get(pk=travado.pk)
+                    travou.set()
+                    liberar.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=outro_despachante)
+        thread.start()
+        try:
+            self.assertTrue(travou.wait(5))
+            self.assertEqual([e.pk for e in envio_service.reservar_lote(10)], [livre.pk])
+        finally:
+            liberar.set()
+            thread.join()
+
+
+class DespachoTests(TestCase):
+    def despachar(self, efeito):
+        with mock.patch.object(envio_service.escala_client, "post", side_effect=efeito) as post:
+            resultado = envio_service.despachar_lote(10, 2)
+        return resultado, post
+
+    def test_2xx_marca_como_enviado(self):
+        envio = criar_envio(1)
+        self.assertEqual(self.despachar([resposta(201)])[0], (1, 0))
+        envio.refresh_from_db()
+        self.assertEqual((envio.status, envio.tentativas, envio.ultimo_erro), ("enviado", 1, ""))
+        self.assertIsNotNone(envio.enviado_em)
+
+    def test_4xx_definitivo_falha_sem_repetir(self):
+        envio = criar_envio(1)
+        with self.assertLogs("core.services.envio_service", "ERROR"):
+            self.assertEqual(self.despachar([resposta(422, "campo inválido")])[0], (0, 1))
+        envio.refresh_from_db()
+        self.assertEqual((envio.status, envio.tentativas), (EnvioSolicitacao.FALHOU, 1))
+        self.assertIn("HTTP 422", envio.ultimo_erro)
+
+    def test_erros_transitorios_sao_repetidos_com_backoff(self):
+        base = settings.ESCALA_ENVIO_BACKOFF_BASE
+        for efeito in (resposta(503), resposta(429), requests.ConnectionError("recusada")):
+            with self.subTest(efeito=efeito):
+                envio = criar_envio(1, tentativas=2)
+                antes = timezone.now()
+                with self.assertLogs("core.services.envio_service", "WARNING"):
+                    self.assertEqual(self.despachar([efeito])[0], (0, 1))
+                envio.refresh_from_db()
+                self.assertEqual((envio.status, envio.tentativas), (EnvioSolicitacao.PENDENTE, 3))
+                # Terceira tentativa: teto de 4 * base, metade garantida
+                espera = envio.proxima_tentativa - antes
+                self.assertGreaterEqual(espera, timedelta(seconds=2 * base))
+                self.assertLessEqual(espera, timedelta(seconds=4 * base + 1))
+                envio.delete()
+
+    def test_falha_apos_o_maximo_de_tentativas(self):
+        envio = criar_envio(1, tentativas=settings.ESCALA_ENVIO_MAX_TENTATIVAS - 1)
+        with self.assertLogs("core.services.envio_service", "ERROR"):
+            self.despachar([resposta(503)])
+        envio.refresh_from_db()
+        self.assertEqual(
+            (envio.status, envio.tentativas),
+            (EnvioSolicitacao.FALHOU, settings.ESCALA_ENVIO_MAX_TENTATIVAS),
+        )
+
+    def test_envia_a_chave_de_idempotencia(self):
+        envio = criar_envio(1)
+        _, post = self.despachar([resposta(201)])
+        post.assert_called_once_with(
+            "solicitacoes/criar",
+            json={"id": 1},
+            headers={"Idempotency-Key": str(envio.chave_idempotencia)},
+        )
+
+    def test_envio_anterior_a_chave_usa_uuid5_estavel(self):
+        criar_envio(7, chave_idempotencia=None)
+        with self.assertLogs("core.services.envio_service", "WARNING"):
+            _, post = self.despachar([resposta(503)])
+        EnvioSolicitacao.objects.update(proxima_tentativa=timezone.now())
+        _, repetido = self.despachar([resposta(201)])
+
+        esperado = str(uuid.uuid5(uuid.NAMESPACE_URL, "solicitacao:7"))
+        for chamada in (post, repetido):
+            self.assertEqual(chamada.call_args.kwargs["headers"], {"Idempotency-Key": esperado})
+
+
+class EsperaTests(SimpleTestCase):
+    def test_equal_jitter_entre_metade_do_teto_e_o_teto(self):
+        base, maximo = settings.ESCALA_ENVIO_BACKOFF_BASE, settings.ESCALA_ENVIO_BACKOFF_MAX
+        for tentativas in range(1, 16):
+            teto = min(maximo, base * 2 ** (tentativas - 1))
+            for _ in range(20):
+                espera = envio_service.calcular_espera(tentativas).total_seconds()
+                self.assertTrue(teto / 2 <= espera <= teto, (tentativas, espera))
+
+    def test_limites_do_sorteio(self):
+        for sorteio, esperado in ((lambda a, b: a, 0.5), (lambda a, b: b, 1.0)):
+            with mock.patch.object(envio_service.random, "uniform", side_effect=sorteio):
+                espera = envio_service.calcular_espera(1).total_seconds()
+            self.assertEqual(espera, settings.ESCALA_ENVIO_BACKOFF_BASE * esperado)
@@ -0,0 +1,166 @@
+from unittest import mock
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+from requests.adapters import HTTPAdapter
+
+from core.services import escala_client
+from core.services.escala_client import CircuitBreaker, EscalaIndisponivel
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.circuito = CircuitBreaker(limite_falhas=3, tempo_reabertura=30)
+        relogio = self.enterContext(mock.patch.object(escala_client, "time"))
+        self.agora = relogio.monotonic.return_value = 1000.0
+
+    def avancar(self, segundos):
+        self.agora += segundos
+        escala_client.time.monotonic.return_value = self.agora
+
+    def falhar(self, vezes):
+        for _ in range(vezes):
+            self.circuito.antes_da_chamada()
+            self.circuito.registrar_falha()
+
+    def test_abre_apos_o_limite_de_falhas(self):
+        with self.assertLogs("core.services.escala_client", "WARNING"):
+            self.falhar(3)
+        self.assertTrue(self.circuito.aberto)
+        with self.assertRaises(EscalaIndisponivel):
+            self.circuito.antes_da_chamada()
+
+    def test_sucesso_zera_as_falhas(self):
+        self.falhar(2)
+        self.circuito.registrar_sucesso()
+        self.falhar(2)
+        self.assertFalse(self.circuito.aberto)
+
+    def test_meio_aberto_deixa_passar_uma_chamada(self):
+        with self.assertLogs("core.services.escala_client", "WARNING"):
+            self.falhar(3)
+        self.avancar(29)
+        with self.assertRaises(EscalaIndisponivel):
+            self.circuito.antes_da_chamada()
+
+        self.avancar(1)
+        self.circuito.antes_da_chamada()  # a chamada de teste
+        with self.assertRaises(EscalaIndisponivel):
+            self.circuito.antes_da_chamada()
+
+        # Chamada de teste falhou: mais uma janela fechado
+        self.circuito.registrar_falha()
+        self.avancar(29)
+        with self.assertRaises(EscalaIndisponivel):
+            self.circuito.antes_da_chamada()
+        self.avancar(1)
+        self.circuito.antes_da_chamada()
+        self.circuito.registrar_sucesso()
+        self.assertFalse(self.circuito.aberto)
+        self.circuito.antes_da_chamada()
+
+
+class AdapterRoteirizado(HTTPAdapter):
+    """Devolve (ou levanta) os itens de `roteiro` em ordem; guarda os pedidos."""
+
+    def __init__(self, roteiro):
+        super().__init__()
+        self.roteiro = list(roteiro)
+        self.pedidos = []
+
+    def send(self, request, **kwargs):
+        self.pedidos.append(request)
+        item = self.roteiro.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        response = requests.Response()
+        response.status_code, response.request, response.url = item, request, request.url
+        return response
+
+
+@override_settings(
+    GERENCIAMENTO_ESCALA_API_URL="http://escala.test/api/v1/", ESCALA_API_TENTATIVAS=2
+)
+class RepeticaoTests(SimpleTestCase):
+    def setUp(self):
+        self.circuito = CircuitBreaker(limite_falhas=3, tempo_reabertura=30)
+        self.enterContext(mock.patch.object(escala_client, "circuito", self.circuito))
+        self.enterContext(mock.patch.object(escala_client, "espera_com_jitter", return_value=0))
+
+    def roteiro(self, *itens):
+        adapter = AdapterRoteirizado(itens)
+        sessao = requests.Session()
+        sessao.mount("http://", adapter)
+        self.enterContext(mock.patch.object(escala_client, "get_sessao", return_value=sessao))
+        return adapter
+
+    def test_get_repete_erros_transitorios(self):
+        adapter = self.roteiro(503, requests.ConnectionError("recusada"), 200)
+        self.assertEqual(escala_client.get("contratos-cliente").status_code, 200)
+        self.assertEqual(len(adapter.pedidos), 3)
+        self.assertEqual(adapter.pedidos[0].url, "http://escala.test/api/v1/contratos-cliente")
+
+    def test_get_desiste_apos_as_tentativas(self):
+        adapter = self.roteiro(*[requests.ConnectionError("recusada")] * 3)
+        with self.assertRaises(requests.ConnectionError):
+            escala_client.get("contratos-cliente")
+        self.assertEqual(len(adapter.pedidos), 3)
+        # Uma falha para o circuito por chamada, não por tentativa
+        self.assertFalse(self.circuito.aberto)
+
+    def test_put_utilizar_nunca_e_repetido(self):
+        adapter = self.roteiro(503)
+        self.assertEqual(escala_client.put("solicitacao-token/utilizar/tk").status_code, 503)
+        self.assertEqual(len(adapter.pedidos), 1)
+
+        adapter = self.roteiro(requests.Timeout("lenta"))
+        with self.assertRaises(requests.Timeout):
+            escala_client.put("solicitacao-token/utilizar/tk")
+        self.assertEqual(len(adapter.pedidos), 1)
+
+    def test_post_so_e_repetido_com_chave_de_idempotencia(self):
+        adapter = self.roteiro(503)
+        self.assertEqual(escala_client.post("solicitacoes/criar", json={}).status_code, 503)
+        self.assertEqual(len(adapter.pedidos), 1)
+
+        adapter = self.roteiro(502, 201)
+        response = escala_client.post(
+            "solicitacoes/criar", json={}, headers={"Idempotency-Key": "k-1"}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([p.headers["Idempotency-Key"] for p in adapter.pedidos], ["k-1"] * 2)
+
+    def test_erros_do_cliente_nao_sao_repetidos(self):
+        adapter = self.roteiro(404)
+        self.assertEqual(escala_client.get("solicitacao-token/validar/tk").status_code, 404)
+        self.assertEqual(len(adapter.pedidos), 1)
+
+    def test_circuito_aberto_nao_chama_o_sistema(self):
+        adapter = self.roteiro(503, 503, 503)
+        with self.assertLogs("core.services.escala_client", "WARNING"):
+            for _ in range(3):
+                escala_client.put("solicitacao-token/utilizar/tk")
+        with self.assertRaises(EscalaIndisponivel):
+            escala_client.get("contratos-cliente")
+        self.assertEqual(len(adapter.pedidos), 3)
+
+    def test_versao_assincrona(self):
+        pedidos = []
+        roteiro = {"GET": [503, 200], "PUT": [503]}
+
+        def responder(request):
+            pedidos.append(request.method)
+            return httpx.Response(roteiro[request.method].pop(0))
+
+        async def chamar():
+            cliente = httpx.AsyncClient(transport=httpx.MockTransport(responder))
+            with mock.patch.object(escala_client, "get_cliente_async", return_value=cliente):
+                async with cliente:
+                    get = await escala_client.aget("contratos-cliente")
+                    put = await escala_client.aput("solicitacao-token/utilizar/tk")
+            return get.status_code, put.status_code
+
+        self.assertEqual(async_to_sync(chamar)(), (200, 503))
+        self.assertEqual(pedidos, ["GET", "GET", "PUT"])
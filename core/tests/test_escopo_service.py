@@ -0,0 +1,60 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from core.models import Fornecedor
+from core.services import escopo_service, token_service
+from core.simulador import ConfigSimulador, EstadoSimulador
+from core.tests.dados import criar_contrato, criar_usuario, vincular
+
+
+class EscopoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        cls.contratos = [criar_contrato(1), criar_contrato(2)]
+        cls.token = vincular(cls.usuario, cls.contratos[0], "tk-1")
+
+    def fornecedores(self):
+        return escopo_service.obter_escopo(self.usuario.user).fornecedores_ids
+
+    def remover_token(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+    def associar(self):
+        dados = EstadoSimulador(ConfigSimulador()).dados_token("tk-novo")
+        dados["contratoCliente"]["id"] = 1000  # fora dos contratos criados aqui
+        with self.captureOnCommitCallbacks(execute=True):
+            token_service.gravar_associacoes(self.usuario, [("tk-novo", dados)])
+        return dados["empresaContratante"]["cnpj"]
+
+    def test_cache_local_le_sempre_do_banco(self):
+        self.assertFalse(escopo_service.compartilhado())
+        self.assertEqual(self.fornecedores(), [self.contratos[0].fornecedor_id])
+        # Sem invalidação (como em outro worker): a remoção já vale
+        self.token.delete()
+        self.assertEqual(self.fornecedores(), [])
+
+    def test_cache_compartilhado_e_invalidado(self):
+        with tempfile.TemporaryDirectory() as pasta, override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "compartilhado": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": pasta,
+                },
+            },
+            ESCOPO_CACHE="compartilhado",
+        ):
+            self.assertTrue(escopo_service.compartilhado())
+            self.assertEqual(self.fornecedores(), [self.contratos[0].fornecedor_id])
+            with self.assertNumQueries(0):
+                self.fornecedores()
+
+            cnpj = self.associar()
+            novo = Fornecedor.objects.get(cnpj=cnpj).pk
+            self.assertEqual(self.fornecedores(), [self.contratos[0].fornecedor_id, novo])
+
+            self.remover_token()
+            self.assertEqual(self.fornecedores(), [novo])
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Solicitacao
+from core.services import exportacao_service
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario, vincular
+
+
+class ExportacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        contrato = criar_contrato(1)
+        vincular(cls.usuario, contrato, "tk-1")
+        datas = {
+            "antes": datetime(2025, 2, 28, 23, 59, 59),
+            "inicio": datetime(2025, 3, 1, 0, 0),
+            "meio": datetime(2025, 3, 15, 12, 0),
+            "fim": datetime(2025, 3, 31, 23, 59, 59),
+            "depois": datetime(2025, 4, 1, 0, 0),
+        }
+        cls.ids = {}
+        for nome, data in datas.items():
+            solicitacao = criar_solicitacao(contrato, cls.usuario, tipo_profissional=nome)
+            Solicitacao.objects.filter(pk=solicitacao.pk).update(
+                data_solicitacao=timezone.make_aware(data)
+            )
+            cls.ids[nome] = solicitacao.pk
+        # Outro fornecedor, fora do escopo do usuário
+        criar_solicitacao(criar_contrato(2), cls.usuario, tipo_profissional="alheia")
+
+    def setUp(self):
+        self.client.force_login(self.usuario.user)
+
+    def exportar(self, **parametros):
+        response = self.client.get(reverse("exportar_solicitacoes"), parametros)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, texto = self.exportar(formato="csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="solicitacoes.csv"', response["Content-Disposition"])
+        linhas = list(csv.reader(io.StringIO(texto)))
+        self.assertEqual(linhas[0], exportacao_service.CAMPOS)
+        self.assertEqual(
+            [linha[exportacao_service.CAMPOS.index("tipo_profissional")] for linha in linhas[1:]],
+            ["antes", "inicio", "meio", "fim", "depois"],
+        )
+
+    def test_ndjson(self):
+        response, texto = self.exportar(formato="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        registros = [json.loads(linha) for linha in texto.splitlines()]
+        self.assertEqual([r["id"] for r in registros], list(self.ids.values()))
+        self.assertEqual(set(registros[0]), set(exportacao_service.CAMPOS))
+        self.assertEqual(registros[0]["cliente__nome"], "Hospital 1")
+
+    def test_limites_de_data_inclusivos(self):
+        _, texto = self.exportar(formato="ndjson", inicio="2025-03-01", fim="2025-03-31")
+        self.assertEqual(
+            [json.loads(linha)["tipo_profissional"] for linha in texto.splitlines()],
+            ["inicio", "meio", "fim"],
+        )
+
+    def test_parametros_invalidos(self):
+        for parametros in ({"formato": "xml"}, {"inicio": "31/03/2025"}, {"fim": "2025-13-01"}):
+            with self.subTest(parametros=parametros):
+                response = self.client.get(reverse("exportar_solicitacoes"), parametros)
+                self.assertEqual(response.status_code, 400)
+
+    async def test_asgi_entrega_um_fluxo_assincrono(self):
+        await self.async_client.aforce_login(self.usuario.user)
+        response = await self.async_client.get(
+            reverse("exportar_solicitacoes"), {"formato": "ndjson", "inicio": "2025-03-01"}
+        )
+        self.assertTrue(response.is_async)
+        partes = [parte async for parte in response.streaming_content]
+        linhas = b"".join(partes).decode().splitlines()
+        self.assertEqual(
+            [json.loads(linha)["tipo_profissional"] for linha in linhas],
+            ["inicio", "meio", "fim", "depois"],
+        )
+
+
+class EmLotesAsyncTests(SimpleTestCase):
+    def test_agrupa_as_partes_em_lotes(self):
+        async def consumir():
+            return [
+                texto
+                async for texto in exportacao_service.em_lotes_async(
+                    iter(["a\n", "b\n", "c\n", "d\n", "e\n"]), lote=2
+                )
+            ]
+
+        self.assertEqual(async_to_sync(consumir)(), ["a\nb\n", "c\nd\n", "e\n"])
@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from core.contexto import carregar_contexto
+from core.forms import SolicitacaoForm
+from core.services import escopo_service
+from core.tests.dados import criar_contrato, criar_usuario, vincular
+
+
+class SolicitacaoFormTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        cls.contratos = [criar_contrato(1), criar_contrato(2)]
+        for n, contrato in enumerate(cls.contratos):
+            vincular(cls.usuario, contrato, f"tk-{n}")
+
+    def form(self, cliente, fornecedor):
+        contexto = carregar_contexto(self.usuario.user)
+        dados = {
+            "cliente": cliente.pk,
+            "fornecedor": fornecedor.pk,
+            "tipo_profissional": "Enfermeiro",
+            "jornada": "12x36",
+        }
+        return SolicitacaoForm(dados, opcoes=contexto.opcoes, instancias=contexto.instancias)
+
+    def test_valida_sem_consultas_e_preenche_a_instancia(self):
+        contrato = self.contratos[0]
+        form = self.form(contrato.cliente, contrato.fornecedor)
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid(), form.errors)
+        solicitacao = form.save(commit=False)
+        self.assertEqual(
+            (solicitacao.cliente_id, solicitacao.fornecedor_id),
+            (contrato.cliente_id, contrato.fornecedor_id),
+        )
+
+    def test_par_sem_contrato(self):
+        form = self.form(self.contratos[0].cliente, self.contratos[1].fornecedor)
+        self.assertFalse(form.is_valid())
+        self.assertIn("não tem contrato", str(form.non_field_errors()))
+
+    def test_fora_do_escopo(self):
+        outro = criar_contrato(3)
+        form = self.form(outro.cliente, self.contratos[0].fornecedor)
+        self.assertFalse(form.is_valid())
+        self.assertIn("cliente", form.errors)
+
+    def test_ordem_dos_campos(self):
+        form = SolicitacaoForm(opcoes=escopo_service.obter_opcoes(self.usuario.user))
+        self.assertEqual(
+            list(form.fields)[:5],
+            ["cliente", "fornecedor", "tipo_profissional", "jornada", "observacoes"],
+        )
+
+    def test_opcoes_com_cache_local_refletem_remocao(self):
+        opcoes = escopo_service.obter_opcoes(self.usuario.user)
+        self.assertEqual(len(opcoes.fornecedores), 2)
+        # Sem invalidação (como em outro worker): a remoção já vale
+        self.usuario.tokens.get(token="tk-1").delete()
+        opcoes = escopo_service.obter_opcoes(self.usuario.user)
+        self.assertEqual(
+            opcoes.fornecedores,
+            [(self.contratos[0].fornecedor_id, self.contratos[0].fornecedor.nome)],
+        )
@@ -0,0 +1,147 @@
+import io
+
+from django.test import SimpleTestCase, override_settings
+
+from core.models import Contrato
+from core.services import importacao_service
+from core.services.importacao_service import ErroPlanilha
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - dependência opcional
+    openpyxl = None
+
+
+def csv_(texto: str) -> io.BytesIO:
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+class DigitosTests(SimpleTestCase):
+    def test_formatos_de_cnpj(self):
+        for valor in ("12.345.678/0001-95", "12345678000195", 12345678000195, 12345678000195.0):
+            with self.subTest(valor=valor):
+                self.assertEqual(importacao_service._digitos(valor), "12345678000195")
+
+    def test_zeros_a_esquerda_perdidos_pela_planilha(self):
+        self.assertEqual(importacao_service._digitos(1234567000195), "01234567000195")
+
+    def test_vazio(self):
+        for valor in (None, "", "-./"):
+            with self.subTest(valor=valor):
+                self.assertEqual(importacao_service._digitos(valor), "")
+
+
+class LerTests(SimpleTestCase):
+    def test_csv_com_ponto_e_virgula_bom_e_cabecalho_livre(self):
+        arquivo = csv_(
+            "\ufeffCliente CNPJ;Fornecedor CNPJ;Tipo Profissional;Jornada;Extra\n"
+            "1;2;Enfermeiro;12x36;ignorada\n"
+            ";;;;\n"
+            "3;4;Médico;6h;\n"
+        )
+        self.assertEqual(
+            list(importacao_service.ler(arquivo, "csv")),
+            [
+                (2, {"cliente_cnpj": "1", "fornecedor_cnpj": "2",
+                     "tipo_profissional": "Enfermeiro", "jornada": "12x36"}),
+                (4, {"cliente_cnpj": "3", "fornecedor_cnpj": "4",
+                     "tipo_profissional": "Médico", "jornada": "6h"}),
+            ],
+        )
+
+    def test_cabecalho_da_exportacao(self):
+        arquivo = csv_(
+            "id,cliente__cnpj,fornecedor__cnpj,tipo_profissional,jornada,observacoes\n"
+            "9,1,2,Enfermeiro,12x36,obs\n"
+        )
+        [(_, campos)] = importacao_service.ler(arquivo, "csv")
+        self.assertEqual(campos["cliente_cnpj"], "1")
+        self.assertEqual(campos["observacoes"], "obs")
+        self.assertNotIn("id", campos)
+
+    def test_colunas_obrigatorias_ausentes(self):
+        with self.assertRaisesMessage(ErroPlanilha, "fornecedor_cnpj, jornada"):
+            list(importacao_service.ler(csv_("cliente_cnpj,tipo_profissional\n1,x\n"), "csv"))
+
+    def test_csv_fora_de_utf8(self):
+        arquivo = io.BytesIO("cliente_cnpj,fornecedor_cnpj,tipo_profissional,jornada\n"
+                             "1,2,Técnico,6h\n".encode("latin-1"))
+        with self.assertRaisesMessage(ErroPlanilha, "UTF-8"):
+            list(importacao_service.ler(arquivo, "csv"))
+
+    @override_settings(IMPORTACAO_MAX_LINHAS=2)
+    def test_limite_de_linhas(self):
+        arquivo = csv_("cliente_cnpj,fornecedor_cnpj,tipo_profissional,jornada\n" + "1,2,a,b\n" * 3)
+        linhas = importacao_service.ler(arquivo, "csv")
+        self.assertEqual(len([next(linhas), next(linhas)]), 2)
+        with self.assertRaises(ErroPlanilha):
+            next(linhas)
+
+    def test_xlsx(self):
+        if openpyxl is None:
+            self.skipTest("openpyxl não instalado")
+        planilha = openpyxl.Workbook()
+        planilha.active.append(["cliente_cnpj", "fornecedor_cnpj", "tipo_profissional", "jornada"])
+        planilha.active.append([12345678000195, "2", "Enfermeiro", None])
+        arquivo = io.BytesIO()
+        planilha.save(arquivo)
+        arquivo.seek(0)
+        self.assertEqual(
+            list(importacao_service.ler(arquivo, "xlsx")),
+            [(2, {"cliente_cnpj": 12345678000195, "fornecedor_cnpj": "2",
+                  "tipo_profissional": "Enfermeiro", "jornada": ""})],
+        )
+
+    def test_xlsx_invalido(self):
+        if openpyxl is None:
+            self.skipTest("openpyxl não instalado")
+        with self.assertRaisesMessage(ErroPlanilha, "XLSX inválido"):
+            list(importacao_service.ler(io.BytesIO(b"nao e xlsx"), "xlsx"))
+
+    def test_formato_de(self):
+        self.assertEqual(importacao_service.formato_de("Planilha.XLSX"), "xlsx")
+        for nome in ("planilha.xls", "planilha"):
+            with self.subTest(nome=nome), self.assertRaises(ErroPlanilha):
+                importacao_service.formato_de(nome)
+
+
+class ValidarTests(SimpleTestCase):
+    cliente, fornecedor = "11111111000111", "22222222000122"
+
+    def setUp(self):
+        self.contrato_a = Contrato(id=1, numero="A", cliente_id=10, fornecedor_id=20)
+        self.contrato_b = Contrato(id=2, numero="B", cliente_id=10, fornecedor_id=20)
+        self.contratos = {(self.cliente, self.fornecedor): [self.contrato_a, self.contrato_b]}
+
+    def campos(self, **extras):
+        return {
+            "cliente_cnpj": "11.111.111/0001-11",
+            "fornecedor_cnpj": 22222222000122.0,
+            "tipo_profissional": " Enfermeiro ",
+            "jornada": "12x36",
+            **extras,
+        }
+
+    def test_linha_valida(self):
+        solicitacao = importacao_service.validar(self.campos(), self.contratos)
+        self.assertEqual(solicitacao.contrato, self.contrato_a)
+        self.assertEqual((solicitacao.cliente_id, solicitacao.fornecedor_id), (10, 20))
+        self.assertEqual(solicitacao.tipo_profissional, "Enfermeiro")
+        self.assertEqual(solicitacao.observacoes, "")
+
+    def test_numero_do_contrato_escolhe_entre_os_do_par(self):
+        solicitacao = importacao_service.validar(
+            self.campos(contrato_numero="B"), self.contratos
+        )
+        self.assertEqual(solicitacao.contrato, self.contrato_b)
+
+    def test_erros(self):
+        casos = {
+            "Nenhum contrato": self.campos(cliente_cnpj="99999999000199"),
+            "Contrato C": self.campos(contrato_numero="C"),
+            "jornada é obrigatório": self.campos(jornada="  "),
+            "tipo_profissional excede 100": self.campos(tipo_profissional="x" * 101),
+        }
+        for mensagem, campos in casos.items():
+            with self.subTest(mensagem), self.assertRaisesMessage(ValueError, mensagem):
+                importacao_service.validar(campos, self.contratos)
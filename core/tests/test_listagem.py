@@ -0,0 +1,172 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import connection
+from django.http import HttpRequest
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.contexto import carregar_contexto
+from core.services import importacao_service, listagem_cache, status_service
+from core.services.status_service import Evento
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario, vincular
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+
+
+class ListagemMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        cls.contrato = criar_contrato(1)
+        vincular(cls.usuario, cls.contrato, "tk-1")
+        cls.solicitacao = criar_solicitacao(cls.contrato, cls.usuario)
+
+    def setUp(self):
+        self.client.force_login(self.usuario.user)
+
+    def listar(self, **cabecalhos):
+        return self.client.get(reverse("listar_solicitacoes"), headers=cabecalhos)
+
+
+class ListagemCacheCompartilhadoTests(ListagemMixin, TestCase):
+    def setUp(self):
+        pasta = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(
+            override_settings(
+                CACHES={
+                    "default": {"BACKEND": LOCMEM},
+                    "compartilhado": {
+                        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                        "LOCATION": pasta,
+                    },
+                },
+                LISTAGEM_CACHE="compartilhado",
+            )
+        )
+        super().setUp()
+
+    def marca(self):
+        return listagem_cache.ultima_alteracao([self.contrato.fornecedor_id])
+
+    def congelar_marcas(self):
+        """Marcas no passado, para que qualquer alteração as avance."""
+        # Só o relógio do módulo: o do backend decide a expiração
+        with mock.patch.object(listagem_cache, "time") as relogio:
+            relogio.time.return_value = 1000.0
+            listagem_cache.marcar()
+            listagem_cache.marcar([self.contrato.fornecedor_id])
+
+    def test_etag_e_last_modified_respondem_304(self):
+        self.assertTrue(listagem_cache.ativo())
+        response = self.listar()
+        self.assertEqual(response.status_code, 200)
+        etag, modificado = response.headers["ETag"], response.headers["Last-Modified"]
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        self.assertEqual(self.listar(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.listar(if_modified_since=modificado).status_code, 304)
+
+    def test_tabela_em_cache_nao_consulta_solicitacoes(self):
+        self.listar()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.listar()
+        self.assertContains(response, self.solicitacao.tipo_profissional)
+        self.assertFalse(any("core_solicitacao" in c["sql"] for c in consultas))
+
+    def test_nova_solicitacao_muda_o_etag(self):
+        etag = self.listar().headers["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_solicitacao(self.contrato, self.usuario, tipo_profissional="Médico")
+        response = self.listar(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Médico")
+
+    def test_sinais_importacao_e_webhook_avancam_a_marca(self):
+        def importar():
+            cnpjs = f"{self.contrato.cliente.cnpj};{self.contrato.fornecedor.cnpj}"
+            arquivo = io.BytesIO(
+                "cliente_cnpj;fornecedor_cnpj;tipo_profissional;jornada\n"
+                f"{cnpjs};Médico;6h\n".encode()
+            )
+            contexto = carregar_contexto(self.usuario.user)
+            resultado = importacao_service.importar(arquivo, "csv", contexto)
+            self.assertEqual(len(resultado.criadas), 1)
+
+        def aplicar_status():
+            evento = Evento(id="e1", solicitacao_id=self.solicitacao.pk, status="aceita", versao=1)
+            self.assertEqual(status_service.aplicar([evento]).aplicados, 1)
+
+        operacoes = {
+            "sinal": lambda: criar_solicitacao(self.contrato, self.usuario),
+            "remocao": lambda: criar_solicitacao(self.contrato, self.usuario).delete(),
+            "importacao": importar,
+            "webhook": aplicar_status,
+        }
+        for nome, operacao in operacoes.items():
+            with self.subTest(nome):
+                self.congelar_marcas()
+                self.assertEqual(self.marca(), 1000.0)
+                with self.captureOnCommitCallbacks(execute=True):
+                    operacao()
+                self.assertGreater(self.marca(), 1000.0)
+
+    def test_marca_so_avanca_depois_do_commit(self):
+        self.congelar_marcas()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            criar_solicitacao(self.contrato, self.usuario)
+        self.assertEqual(self.marca(), 1000.0)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(self.marca(), 1000.0)
+
+    def test_mensagens_pendentes_nao_recebem_304(self):
+        etag = self.listar().headers["ETag"]
+        mensagens = [Message(constants.SUCCESS, "1 solicitação(ões) importada(s).")]
+        self.client.cookies["messages"] = CookieStorage(HttpRequest())._encode(mensagens)
+
+        response = self.listar(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "importada(s)")
+        # Exibidas: a próxima revalidação volta a ser 304
+        self.assertEqual(self.listar(if_none_match=etag).status_code, 304)
+
+
+class ListagemCacheLocalTests(ListagemMixin, TestCase):
+    def test_sem_304_nem_tabela_em_cache(self):
+        self.assertFalse(listagem_cache.ativo())
+        response = self.listar()
+        self.assertNotIn("ETag", response.headers)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        self.assertEqual(self.listar(if_none_match="*").status_code, 200)
+
+        # Sem marcas, a alteração aparece mesmo sem on_commit
+        criar_solicitacao(self.contrato, self.usuario, tipo_profissional="Médico")
+        self.assertContains(self.listar(), "Médico")
+
+
+class AtivoTests(SimpleTestCase):
+    def test_caches_locais_ao_processo_desligam_as_marcas(self):
+        backends = {
+            LOCMEM: False,
+            "django.core.cache.backends.dummy.DummyCache": False,
+            "django.core.cache.backends.filebased.FileBasedCache": True,
+        }
+        for backend, esperado in backends.items():
+            with (
+                self.subTest(backend=backend),
+                override_settings(
+                    CACHES={"default": {"BACKEND": backend, "LOCATION": tempfile.gettempdir()}}
+                ),
+            ):
+                self.assertIs(listagem_cache.ativo(), esperado)
+
+    @override_settings(CACHES={"default": {"BACKEND": LOCMEM}})
+    def test_marcar_sem_cache_compartilhado_nao_grava(self):
+        listagem_cache.marcar([1])
+        self.assertEqual(listagem_cache._cache().get("listagem:marca:1"), None)
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Solicitacao
+from core.paginacao import codificar_cursor, decodificar_cursor, paginar
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario, vincular
+
+
+class CursorTests(SimpleTestCase):
+    def test_ida_e_volta(self):
+        data = datetime(2026, 1, 31, 23, 59, 59, 123456, tzinfo=dt_timezone.utc)
+        self.assertEqual(decodificar_cursor(codificar_cursor(data, 42)), (data, 42))
+
+    def test_cursor_invalido(self):
+        for cursor in ("", "!!!", "bmFvLXRlbS1waXBl", codificar_cursor(datetime(2026, 1, 1), 1)[:-3]):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(decodificar_cursor(cursor))
+
+
+class PaginarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        contrato = criar_contrato(1)
+        vincular(cls.usuario, contrato, "tk-1")
+        # Fora do escopo do usuário: não aparece na listagem
+        criar_solicitacao(criar_contrato(2), cls.usuario)
+        inicio = timezone.now().replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+        for i in range(7):
+            solicitacao = criar_solicitacao(contrato, cls.usuario, tipo_profissional=f"T{i}")
+            # Duas solicitações no mesmo instante: o id desempata
+            Solicitacao.objects.filter(pk=solicitacao.pk).update(
+                data_solicitacao=inicio + timedelta(minutes=min(i, 5))
+            )
+        cls.solicitacoes = Solicitacao.objects.filter(contrato=contrato)
+        cls.esperado = list(
+            cls.solicitacoes.order_by("-data_solicitacao", "-id").values_list("pk", flat=True)
+        )
+
+    def ids(self, pagina):
+        return [item.pk for item in pagina.itens]
+
+    def test_percorre_para_frente_e_para_tras(self):
+        queryset = self.solicitacoes
+        primeira = paginar(queryset, 3)
+        self.assertEqual(self.ids(primeira), self.esperado[:3])
+        self.assertIsNone(primeira.anterior)
+
+        segunda = paginar(queryset, 3, depois=primeira.proximo)
+        self.assertEqual(self.ids(segunda), self.esperado[3:6])
+        terceira = paginar(queryset, 3, depois=segunda.proximo)
+        self.assertEqual(self.ids(terceira), self.esperado[6:])
+        self.assertIsNone(terceira.proximo)
+
+        de_volta = paginar(queryset, 3, antes=terceira.anterior)
+        self.assertEqual(self.ids(de_volta), self.esperado[3:6])
+        inicio = paginar(queryset, 3, antes=de_volta.anterior)
+        self.assertEqual(self.ids(inicio), self.esperado[:3])
+        self.assertIsNone(inicio.anterior)
+
+    def test_cursor_invalido_volta_a_primeira_pagina(self):
+        pagina = paginar(self.solicitacoes, 3, depois="lixo")
+        self.assertEqual(self.ids(pagina), self.esperado[:3])
+
+    def test_pagina_exata_nao_tem_proxima(self):
+        pagina = paginar(self.solicitacoes, len(self.esperado))
+        self.assertEqual(self.ids(pagina), self.esperado)
+        self.assertIsNone(pagina.proximo)
+
+    def test_sem_itens(self):
+        pagina = paginar(Solicitacao.objects.none(), 3)
+        self.assertEqual((pagina.itens, pagina.proximo, pagina.anterior), ([], None, None))
+
+    @override_settings(SOLICITACOES_POR_PAGINA_MAX=3)
+    def test_listagem_segue_os_links_do_cursor(self):
+        self.client.force_login(self.usuario.user)
+        url = reverse("listar_solicitacoes")
+        # O tamanho pedido é limitado a SOLICITACOES_POR_PAGINA_MAX
+        primeira = self.client.get(url, {"tamanho": 50})
+        pagina = primeira.context["pagina"]
+        self.assertEqual(self.ids(pagina), self.esperado[:3])
+        self.assertContains(primeira, f"?depois={pagina.proximo}&tamanho=3")
+
+        segunda = self.client.get(url, {"depois": pagina.proximo, "tamanho": 3}).context["pagina"]
+        self.assertEqual(self.ids(segunda), self.esperado[3:6])
+        terceira = self.client.get(url, {"depois": segunda.proximo, "tamanho": 3}).context["pagina"]
+        self.assertEqual(self.ids(terceira), self.esperado[6:])
+        self.assertIsNone(terceira.proximo)
@@ -0,0 +1,126 @@
+import io
+import unittest
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import ResumoSolicitacao, Solicitacao
+from core.services import particao_service, resumo_service
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Particionamento requer PostgreSQL (migração 0008)"
+)
+class ParticaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.contrato = criar_contrato(1)
+        cls.usuario = criar_usuario()
+
+    def setUp(self):
+        self.assertTrue(particao_service.particionada())
+
+    def criar(self, mes: date) -> int:
+        solicitacao = criar_solicitacao(self.contrato, self.usuario)
+        # A linha muda de partição com o UPDATE da chave de particionamento
+        Solicitacao.objects.filter(pk=solicitacao.pk).update(
+            data_solicitacao=timezone.make_aware(datetime(mes.year, mes.month, 10, 12))
+        )
+        return solicitacao.pk
+
+    def particao_de(self, pk: int) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {particao_service.TABELA} WHERE id = %s",
+                [pk],
+            )
+            return cursor.fetchone()[0]
+
+    def existe(self, nome: str) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [nome])
+            return cursor.fetchone()[0]
+
+    def test_cria_as_particoes_que_faltam(self):
+        criadas = particao_service.garantir_particoes(date(2031, 1, 1), date(2031, 3, 1))
+        self.assertEqual(
+            criadas,
+            ["core_solicitacao_p203101", "core_solicitacao_p203102", "core_solicitacao_p203103"],
+        )
+        self.assertEqual(
+            particao_service.garantir_particoes(date(2031, 1, 1), date(2031, 3, 1)), []
+        )
+        pk = self.criar(date(2031, 2, 1))
+        self.assertEqual(self.particao_de(pk), "core_solicitacao_p203102")
+
+    def test_linhas_da_particao_padrao_vao_para_a_nova(self):
+        pk = self.criar(date(2032, 5, 1))
+        self.assertEqual(self.particao_de(pk), particao_service.PADRAO)
+
+        # O mês com linhas na padrão entra mesmo fora do intervalo pedido
+        criadas = particao_service.garantir_particoes(date(2031, 1, 1), date(2031, 1, 1))
+        self.assertEqual(criadas, ["core_solicitacao_p203101", "core_solicitacao_p203205"])
+        self.assertEqual(self.particao_de(pk), "core_solicitacao_p203205")
+        self.assertEqual(Solicitacao.objects.filter(pk=pk).count(), 1)
+
+    def test_arquivar_desanexando(self):
+        particao_service.garantir_particoes(date(2001, 1, 1), date(2001, 2, 1))
+        antigas = [self.criar(date(2001, 1, 1)), self.criar(date(2001, 2, 1))]
+        atual = self.criar(date(2001, 3, 1))  # padrão: não é arquivada
+
+        arquivadas = particao_service.arquivar(date(2001, 3, 1), "desanexar")
+        self.assertEqual(arquivadas, ["core_solicitacao_p200101", "core_solicitacao_p200102"])
+        self.assertFalse(Solicitacao.objects.filter(pk__in=antigas).exists())
+        self.assertTrue(Solicitacao.objects.filter(pk=atual).exists())
+
+        schema = settings.SOLICITACAO_ARQUIVO_SCHEMA
+        self.assertFalse(self.existe("core_solicitacao_p200101"))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {schema}.core_solicitacao_p200101")
+            self.assertEqual(cursor.fetchall(), [(antigas[0],)])
+
+    def test_arquivar_movendo_linhas(self):
+        particao_service.garantir_particoes(date(2001, 1, 1), date(2001, 2, 1))
+        antigas = [self.criar(date(2001, 1, 1)), self.criar(date(2001, 2, 1))]
+
+        particao_service.arquivar(date(2001, 3, 1), "mover")
+        self.assertFalse(Solicitacao.objects.filter(pk__in=antigas).exists())
+        self.assertFalse(self.existe("core_solicitacao_p200101"))
+
+        schema = settings.SOLICITACAO_ARQUIVO_SCHEMA
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id, busca IS NOT NULL FROM {schema}.core_solicitacao ORDER BY id"
+            )
+            self.assertEqual(cursor.fetchall(), [(pk, True) for pk in antigas])
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            particao_service.arquivar(date(2001, 3, 1), "apagar")
+
+    def test_reconstruir_depois_de_arquivar_mantem_os_meses_arquivados(self):
+        particao_service.garantir_particoes(date(2001, 1, 1), date(2001, 1, 1))
+        self.criar(date(2001, 1, 1))
+        self.criar(date(2001, 2, 1))
+        resumo_service.reconstruir()
+        particao_service.arquivar(date(2001, 2, 1), "desanexar")
+
+        resumo_service.reconstruir()
+        self.assertEqual(
+            dict(ResumoSolicitacao.objects.values_list("mes", "total")),
+            {date(2001, 1, 1): 1, date(2001, 2, 1): 1},
+        )
+
+    def test_comando_manter_particoes(self):
+        saida = io.StringIO()
+        atual = resumo_service.mes_de(timezone.now())
+        call_command("manter_particoes", meses_futuros=12, meses_ativos=None, stdout=saida)
+        self.assertIn("Partições em dia.", saida.getvalue())
+        meses = particao_service.particoes()
+        for i in range(13):
+            self.assertIn(resumo_service.somar_meses(atual, i), meses)
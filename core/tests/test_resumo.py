@@ -0,0 +1,142 @@
+from datetime import date, datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Cliente, Contrato, Fornecedor, ResumoSolicitacao, Solicitacao, Usuario
+from core.services import resumo_service
+from core.tests.dados import criar_contrato, criar_solicitacao, criar_usuario
+
+
+class ResumoAoGravarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Cliente.objects.create(nome="Hospital", cnpj="1", email="h@h.com", telefone="1")
+        cls.fornecedores = [
+            Fornecedor.objects.create(
+                nome=f"Cooperativa {i}", cnpj=f"2{i}", email="c@c.com", url_sistema="http://c.com"
+            )
+            for i in range(2)
+        ]
+        cls.contrato = Contrato.objects.create(
+            numero="C1", cliente=cls.cliente, fornecedor=cls.fornecedores[0]
+        )
+        cls.usuario = Usuario.objects.create(
+            user=User.objects.create_user("u@u.com"), nome_completo="Usuário"
+        )
+
+    def totais(self):
+        return dict(
+            ResumoSolicitacao.objects.filter(total__gt=0).values_list("tipo_profissional", "total")
+        )
+
+    def criar(self, tipo="Enfermeiro"):
+        return Solicitacao.objects.create(
+            cliente=self.cliente,
+            fornecedor=self.fornecedores[0],
+            contrato=self.contrato,
+            usuario_solicitante=self.usuario,
+            tipo_profissional=tipo,
+            jornada="6h",
+        )
+
+    def test_criacao_e_remocao(self):
+        solicitacao = self.criar()
+        self.criar()
+        self.assertEqual(self.totais(), {"Enfermeiro": 2})
+        solicitacao.delete()
+        self.assertEqual(self.totais(), {"Enfermeiro": 1})
+
+    def test_alteracao_da_chave_move_a_contagem(self):
+        solicitacao = self.criar()
+        solicitacao.tipo_profissional = "Médico"
+        solicitacao.save()
+        self.assertEqual(self.totais(), {"Médico": 1})
+
+        solicitacao.fornecedor = self.fornecedores[1]
+        solicitacao.save()
+        self.assertEqual(
+            list(
+                ResumoSolicitacao.objects.filter(total__gt=0).values_list(
+                    "fornecedor_id", "tipo_profissional", "total"
+                )
+            ),
+            [(self.fornecedores[1].pk, "Médico", 1)],
+        )
+
+    def test_alteracao_de_outros_campos(self):
+        solicitacao = self.criar()
+        solicitacao.jornada = "12x36"
+        with self.assertNumQueries(1):
+            solicitacao.save(update_fields=["jornada"])
+        solicitacao.save()
+        self.assertEqual(self.totais(), {"Enfermeiro": 1})
+
+
+class ReconstruirTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.contrato = criar_contrato(1)
+        cls.usuario = criar_usuario()
+
+    def criar(self, mes: date, tipo="Enfermeiro"):
+        # O UPDATE da data não passa pelos sinais: o resumo fica errado até reconstruir
+        solicitacao = criar_solicitacao(self.contrato, self.usuario, tipo_profissional=tipo)
+        Solicitacao.objects.filter(pk=solicitacao.pk).update(
+            data_solicitacao=timezone.make_aware(datetime(mes.year, mes.month, 10, 12))
+        )
+
+    def resumo(self):
+        return dict(
+            ((mes, tipo), total)
+            for mes, tipo, total in ResumoSolicitacao.objects.filter(total__gt=0).values_list(
+                "mes", "tipo_profissional", "total"
+            )
+        )
+
+    def arquivado(self, mes: date, total: int):
+        # Mês cujas solicitações já saíram da tabela (particao_service.arquivar)
+        ResumoSolicitacao.objects.create(
+            fornecedor_id=self.contrato.fornecedor_id,
+            mes=mes,
+            tipo_profissional="Enfermeiro",
+            total=total,
+        )
+
+    def test_recalcula_os_meses_vivos_e_mantem_os_arquivados(self):
+        self.arquivado(date(2025, 1, 1), 40)
+        self.criar(date(2025, 3, 1))
+        self.criar(date(2025, 4, 1), "Médico")
+
+        self.assertEqual(resumo_service.reconstruir(), 2)
+        self.assertEqual(
+            self.resumo(),
+            {
+                (date(2025, 1, 1), "Enfermeiro"): 40,
+                (date(2025, 3, 1), "Enfermeiro"): 1,
+                (date(2025, 4, 1), "Médico"): 1,
+            },
+        )
+
+    def test_desde_anterior_aos_meses_vivos_nao_apaga_o_arquivo(self):
+        self.arquivado(date(2025, 1, 1), 40)
+        self.criar(date(2025, 3, 1))
+        resumo_service.reconstruir([self.contrato.fornecedor_id], desde=date(2024, 12, 15))
+        self.assertEqual(self.resumo()[(date(2025, 1, 1), "Enfermeiro")], 40)
+
+    def test_desde_posterior_recalcula_so_dali_em_diante(self):
+        self.criar(date(2025, 3, 1))
+        self.criar(date(2025, 4, 1))
+        resumo_service.reconstruir()
+        ResumoSolicitacao.objects.update(total=7)
+        resumo_service.reconstruir(desde=date(2025, 4, 20))
+        self.assertEqual(
+            self.resumo(),
+            {(date(2025, 3, 1), "Enfermeiro"): 7, (date(2025, 4, 1), "Enfermeiro"): 1},
+        )
+
+    def test_tabela_vazia_mantem_o_resumo(self):
+        self.arquivado(date(2025, 1, 1), 40)
+        self.assertEqual(resumo_service.reconstruir(), 0)
+        self.assertEqual(self.resumo(), {(date(2025, 1, 1), "Enfermeiro"): 40})
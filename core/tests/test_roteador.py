@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import OperationalError, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from core import roteador
+from core.middleware import ReplicaMiddleware
+from core.models import Cliente, Solicitacao
+
+# TransactionTestCase: dentro do atomic() do TestCase o roteador já fixaria
+# tudo no primário
+
+
+@override_settings(BANCO_REPLICA="replica", BANCO_REPLICA_ATRASO_MAX=5)
+class RoteadorReplicaTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        caches["default"].clear()  # atraso medido fica em cache
+
+    def requisitar(self, view, **cookies):
+        """Passa uma requisição pelo ReplicaMiddleware; `view` devolve o que
+        deve ser guardado em `resultado`."""
+        resultado = {}
+
+        def get_response(request):
+            resultado.update(view())
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        request.COOKIES.update(cookies)
+        return ReplicaMiddleware(get_response)(request), resultado
+
+    def test_fora_de_requisicao_le_do_primario(self):
+        self.assertEqual(Solicitacao.objects.all().db, "default")
+
+    def test_leituras_da_requisicao_vao_para_replica(self):
+        response, resultado = self.requisitar(
+            lambda: {"banco": Solicitacao.objects.all().db, "total": Solicitacao.objects.count()}
+        )
+        self.assertEqual(resultado, {"banco": "replica", "total": 0})
+        self.assertNotIn(roteador.COOKIE_PRIMARIO, response.cookies)
+
+    def test_escrita_fixa_o_primario_e_marca_o_navegador(self):
+        def view():
+            antes = Cliente.objects.all().db
+            Cliente.objects.create(nome="H", cnpj="1", email="h@h.com", telefone="1")
+            return {"antes": antes, "depois": Cliente.objects.all().db}
+
+        with self.settings(BANCO_PRIMARIO_APOS_ESCRITA=10):
+            response, resultado = self.requisitar(view)
+        self.assertEqual(resultado, {"antes": "replica", "depois": "default"})
+        cookie = response.cookies[roteador.COOKIE_PRIMARIO]
+        self.assertEqual(cookie["max-age"], 10)
+        self.assertTrue(cookie["httponly"])
+
+    def test_cookie_fixa_o_primario(self):
+        response, resultado = self.requisitar(
+            lambda: {"banco": Solicitacao.objects.all().db}, **{roteador.COOKIE_PRIMARIO: "1"}
+        )
+        self.assertEqual(resultado, {"banco": "default"})
+        # Sem escrita nesta requisição o cookie não é renovado
+        self.assertNotIn(roteador.COOKIE_PRIMARIO, response.cookies)
+
+    def test_leituras_dentro_de_transacao_vao_para_o_primario(self):
+        def view():
+            with transaction.atomic():
+                return {"banco": Solicitacao.objects.all().db}
+
+        self.assertEqual(self.requisitar(view)[1], {"banco": "default"})
+
+    def test_sessoes_ficam_no_primario(self):
+        _, resultado = self.requisitar(lambda: {"banco": Session.objects.all().db})
+        self.assertEqual(resultado, {"banco": "default"})
+
+    def test_atraso_acima_do_maximo_le_do_primario(self):
+        caches["default"].set("banco:atraso:replica", 6.0)
+        _, resultado = self.requisitar(lambda: {"banco": Solicitacao.objects.all().db})
+        self.assertEqual(resultado, {"banco": "default"})
+
+        caches["default"].set("banco:atraso:replica", 4.0)
+        _, resultado = self.requisitar(lambda: {"banco": Solicitacao.objects.all().db})
+        self.assertEqual(resultado, {"banco": "replica"})
+
+    def test_replica_inacessivel_le_do_primario(self):
+        falha = OperationalError("connection refused")
+        with (
+            mock.patch.object(connections["replica"], "cursor", side_effect=falha),
+            self.assertLogs("core.roteador", "WARNING"),
+        ):
+            _, resultado = self.requisitar(lambda: {"banco": Solicitacao.objects.all().db})
+        self.assertEqual(resultado, {"banco": "default"})
+        # A falha fica em cache: as próximas leituras não tentam a réplica de novo
+        self.assertEqual(caches["default"].get("banco:atraso:replica"), float("inf"))
+
+    def test_replica_nao_recebe_migracoes(self):
+        self.assertFalse(roteador.RoteadorReplica().allow_migrate("replica", "core"))
+        self.assertIsNone(roteador.RoteadorReplica().allow_migrate("default", "core"))
+
+    @override_settings(BANCO_REPLICA=None)
+    def test_sem_replica_o_roteador_nao_interfere(self):
+        _, resultado = self.requisitar(lambda: {"banco": Solicitacao.objects.all().db})
+        self.assertEqual(resultado, {"banco": "default"})
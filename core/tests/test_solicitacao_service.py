@@ -0,0 +1,84 @@
+import uuid
+
+from django import forms
+from django.test import TestCase
+from django.urls import reverse
+
+from core.contexto import carregar_contexto
+from core.forms import SolicitacaoForm
+from core.models import EnvioSolicitacao, Solicitacao
+from core.services.solicitacao_service import salvar_solicitacao, solicitacao_da_chave
+from core.tests.dados import criar_contrato, criar_usuario, vincular
+
+
+class IdempotenciaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.contrato = criar_contrato(1)
+        cls.usuario = criar_usuario()
+        cls.outro = criar_usuario("o@o.com")
+        vincular(cls.usuario, cls.contrato, "tk-1")
+        vincular(cls.outro, cls.contrato, "tk-2")
+
+    def dados(self, chave):
+        return {
+            "cliente": self.contrato.cliente_id,
+            "fornecedor": self.contrato.fornecedor_id,
+            "tipo_profissional": "Enfermeiro",
+            "jornada": "12x36",
+            "chave_idempotencia": str(chave),
+        }
+
+    def salvar(self, usuario, chave):
+        contexto = carregar_contexto(usuario.user)
+        form = SolicitacaoForm(
+            self.dados(chave), opcoes=contexto.opcoes, instancias=contexto.instancias
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return salvar_solicitacao(form, contexto)
+
+    def postar(self, usuario, chave):
+        self.client.force_login(usuario.user)
+        return self.client.post(reverse("nova_solicitacao"), self.dados(chave))
+
+    def test_post_repetido_grava_uma_vez(self):
+        chave = uuid.uuid4()
+        for _ in range(2):
+            self.assertRedirects(
+                self.postar(self.usuario, chave),
+                reverse("listar_solicitacoes"),
+                fetch_redirect_response=False,
+            )
+        self.assertEqual(Solicitacao.objects.count(), 1)
+        envio = EnvioSolicitacao.objects.get()
+        self.assertEqual(envio.chave_idempotencia, chave)
+        self.assertEqual(solicitacao_da_chave(chave, self.usuario), envio.solicitacao_id)
+
+    def test_repeticao_concorrente_devolve_a_primeira(self):
+        # A segunda passou pela consulta antes de a primeira gravar: a
+        # unicidade da chave desfaz a segunda gravação
+        chave = uuid.uuid4()
+        primeira = self.salvar(self.usuario, chave)
+        segunda = self.salvar(self.usuario, chave)
+        self.assertEqual(segunda.pk, primeira.pk)
+        self.assertEqual(Solicitacao.objects.count(), 1)
+        self.assertEqual(EnvioSolicitacao.objects.count(), 1)
+
+    def test_chave_de_outro_usuario_e_recusada(self):
+        chave = uuid.uuid4()
+        self.salvar(self.outro, chave)
+        self.assertIsNone(solicitacao_da_chave(chave, self.usuario))
+
+        with self.assertRaisesMessage(forms.ValidationError, "Recarregue a página"):
+            self.salvar(self.usuario, chave)
+
+        response = self.postar(self.usuario, chave)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Formulário inválido. Recarregue a página.")
+        self.assertEqual(
+            list(Solicitacao.objects.values_list("usuario_solicitante", flat=True)),
+            [self.outro.pk],
+        )
+
+    def test_chave_malformada(self):
+        self.assertIsNone(solicitacao_da_chave("nao-e-uuid", self.usuario))
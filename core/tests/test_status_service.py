@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Cliente, Contrato, EventoStatus, Fornecedor, Solicitacao, Usuario
+from core.services import status_service
+from core.services.status_service import Evento, LoteInvalido
+
+
+@override_settings(ESCALA_WEBHOOK_SEGREDO="segredo")
+class AssinaturaTests(SimpleTestCase):
+    corpo = b'{"eventos": []}'
+
+    def test_assinatura_correta(self):
+        recebida = status_service.assinatura(self.corpo, "segredo")
+        self.assertTrue(status_service.assinatura_valida(self.corpo, recebida))
+
+    def test_assinatura_de_outro_corpo_ou_segredo(self):
+        self.assertFalse(
+            status_service.assinatura_valida(
+                self.corpo, status_service.assinatura(b"{}", "segredo")
+            )
+        )
+        self.assertFalse(
+            status_service.assinatura_valida(
+                self.corpo, status_service.assinatura(self.corpo, "outro")
+            )
+        )
+
+    def test_sem_assinatura(self):
+        self.assertFalse(status_service.assinatura_valida(self.corpo, None))
+        self.assertFalse(status_service.assinatura_valida(self.corpo, ""))
+
+    @override_settings(ESCALA_WEBHOOK_SEGREDO="")
+    def test_sem_segredo_recusa_tudo(self):
+        self.assertFalse(
+            status_service.assinatura_valida(self.corpo, status_service.assinatura(self.corpo, ""))
+        )
+
+
+class LerLoteTests(SimpleTestCase):
+    def test_eventos_validos_e_invalidos(self):
+        eventos, invalidos = status_service.ler_lote(
+            {
+                "eventos": [
+                    {"id": " e1 ", "solicitacaoOrigemId": "7", "status": "ACEITA", "versao": 2},
+                    {"id": "e2", "solicitacaoOrigemId": 7, "status": "desconhecido", "versao": 3},
+                    {"id": "e3", "solicitacaoOrigemId": 7, "status": "aceita", "versao": 0},
+                    {"id": "", "solicitacaoOrigemId": 7, "status": "aceita", "versao": 1},
+                    {"id": "e5", "status": "aceita", "versao": 1},
+                    {"id": "e6", "solicitacaoOrigemId": "x", "status": "aceita", "versao": 1},
+                    {"id": "x" * 101, "solicitacaoOrigemId": 7, "status": "aceita", "versao": 1},
+                    "não é um objeto",
+                ]
+            }
+        )
+        self.assertEqual(eventos, [Evento(id="e1", solicitacao_id=7, status="aceita", versao=2)])
+        self.assertEqual(invalidos, 7)
+
+    def test_corpo_sem_lista_de_eventos(self):
+        for dados in ([], {}, {"eventos": {}}, "eventos"):
+            with self.subTest(dados=dados), self.assertRaises(LoteInvalido):
+                status_service.ler_lote(dados)
+
+    @override_settings(ESCALA_WEBHOOK_LOTE_MAX=2)
+    def test_lote_maior_que_o_limite(self):
+        evento = {"id": "e", "solicitacaoOrigemId": 1, "status": "aceita", "versao": 1}
+        with self.assertRaises(LoteInvalido):
+            status_service.ler_lote({"eventos": [evento] * 3})
+
+
+class AplicarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cliente = Cliente.objects.create(nome="Hospital", cnpj="1", email="h@h.com", telefone="1")
+        fornecedor = Fornecedor.objects.create(
+            nome="Cooperativa", cnpj="2", email="c@c.com", url_sistema="http://c.com"
+        )
+        contrato = Contrato.objects.create(numero="C1", cliente=cliente, fornecedor=fornecedor)
+        usuario = Usuario.objects.create(
+            user=User.objects.create_user("u@u.com"), nome_completo="Usuário"
+        )
+        cls.solicitacao = Solicitacao.objects.create(
+            cliente=cliente,
+            fornecedor=fornecedor,
+            contrato=contrato,
+            usuario_solicitante=usuario,
+            tipo_profissional="Enfermeiro",
+            jornada="12x36",
+        )
+
+    def evento(self, id_, status, versao, solicitacao_id=None):
+        return Evento(id_, solicitacao_id or self.solicitacao.id, status, versao)
+
+    def status_gravado(self):
+        self.solicitacao.refresh_from_db(fields=["status", "versao_status"])
+        return self.solicitacao.status, self.solicitacao.versao_status
+
+    def test_aplica_versao_nova(self):
+        resultado = status_service.aplicar([self.evento("e1", "aceita", 1)], invalidos=2)
+        self.assertEqual(
+            (resultado.recebidos, resultado.invalidos, resultado.aplicados), (3, 2, 1)
+        )
+        self.assertEqual(self.status_gravado(), ("aceita", 1))
+
+    def test_reentrega_e_descartada(self):
+        status_service.aplicar([self.evento("e1", "aceita", 1)])
+        # Mesmo id, mesmo que com versão maior: já foi recebido
+        resultado = status_service.aplicar([self.evento("e1", "alocada", 2)])
+        self.assertEqual((resultado.duplicados, resultado.aplicados), (1, 0))
+        self.assertEqual(self.status_gravado(), ("aceita", 1))
+
+    def test_id_repetido_no_mesmo_lote(self):
+        resultado = status_service.aplicar(
+            [self.evento("e1", "aceita", 1), self.evento("e1", "aceita", 1)]
+        )
+        self.assertEqual((resultado.duplicados, resultado.aplicados), (1, 1))
+
+    def test_evento_fora_de_ordem_e_ignorado(self):
+        status_service.aplicar([self.evento("e3", "alocada", 3)])
+        resultado = status_service.aplicar([self.evento("e2", "aceita", 2)])
+        self.assertEqual((resultado.aplicados, resultado.ignorados), (0, 1))
+        self.assertEqual(self.status_gravado(), ("alocada", 3))
+
+    def test_maior_versao_do_lote_vale(self):
+        resultado = status_service.aplicar(
+            [self.evento("e3", "alocada", 3), self.evento("e2", "aceita", 2)]
+        )
+        self.assertEqual(resultado.aplicados, 1)
+        self.assertEqual(self.status_gravado(), ("alocada", 3))
+
+    def test_solicitacao_desconhecida(self):
+        resultado = status_service.aplicar(
+            [self.evento("e1", "aceita", 1, solicitacao_id=self.solicitacao.id + 1000)]
+        )
+        self.assertEqual((resultado.aplicados, resultado.ignorados), (0, 1))
+
+
+class LimparTests(TestCase):
+    def test_apaga_so_os_antigos(self):
+        agora = timezone.now()
+        EventoStatus.objects.create(id="antigo", recebido_em=agora - timedelta(days=31))
+        EventoStatus.objects.create(id="recente", recebido_em=agora - timedelta(days=29))
+        self.assertEqual(status_service.limpar(30), 1)
+        self.assertQuerySetEqual(
+            EventoStatus.objects.values_list("id", flat=True), ["recente"]
+        )
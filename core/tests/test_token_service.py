@@ -0,0 +1,159 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.models import Fornecedor, TokenSolicitacao
+from core.services import token_service
+from core.simulador import ConfigSimulador, EstadoSimulador
+from core.tests.dados import criar_contrato, criar_usuario, vincular
+
+
+def resposta(status_code, dados=None):
+    return mock.Mock(status_code=status_code, json=mock.Mock(return_value=dados))
+
+
+class ValidarTokenTests(SimpleTestCase):
+    def setUp(self):
+        caches[settings.ESCALA_TOKEN_CACHE].clear()
+
+    def validar_duas_vezes(self, *respostas):
+        with mock.patch.object(
+            token_service.escala_client, "get", side_effect=respostas
+        ) as get:
+            primeira = token_service.validar_token("tk")
+            segunda = token_service.validar_token("tk")
+        return primeira, segunda, get.call_count
+
+    def test_token_valido_fica_no_cache(self):
+        self.assertEqual(
+            self.validar_duas_vezes(resposta(200, {"id": 1})), ({"id": 1}, {"id": 1}, 1)
+        )
+
+    def test_recusa_definitiva_fica_no_cache(self):
+        for status in sorted(token_service.STATUS_TOKEN_RECUSADO):
+            with self.subTest(status=status):
+                caches[settings.ESCALA_TOKEN_CACHE].clear()
+                self.assertEqual(self.validar_duas_vezes(resposta(status)), (None, None, 1))
+
+    def test_erro_transitorio_nao_fica_no_cache(self):
+        for status in (408, 429, 503):
+            with self.subTest(status=status):
+                self.assertEqual(
+                    self.validar_duas_vezes(resposta(status), resposta(200, {"id": 1})),
+                    (None, {"id": 1}, 2),
+                )
+                caches[settings.ESCALA_TOKEN_CACHE].clear()
+
+    def test_versao_assincrona(self):
+        respostas = [resposta(429), resposta(404)]
+        with mock.patch.object(
+            token_service.escala_client, "aget", side_effect=respostas
+        ) as aget:
+            resultados = [async_to_sync(token_service.avalidar_token)("tk") for _ in range(3)]
+        self.assertEqual((resultados, aget.call_count), ([None, None, None], 2))
+
+
+class AssociarTokensTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = criar_usuario()
+        cls.outro = criar_usuario("o@o.com")
+        cls.contrato = criar_contrato(1)
+
+    def setUp(self):
+        caches[settings.ESCALA_TOKEN_CACHE].clear()
+        self.simulador = EstadoSimulador(ConfigSimulador())
+
+    def dados(self, token):
+        dados = self.simulador.dados_token(token)
+        dados["contratoCliente"]["id"] += 1000  # fora dos contratos criados aqui
+        return dados
+
+    async def validar(self, caminho):
+        token = caminho.rsplit("/", 1)[-1]
+        if token.startswith("invalido"):
+            return resposta(404)
+        return resposta(200, self.dados(token))
+
+    def associar(self, tokens, utilizar=None):
+        with (
+            mock.patch.object(token_service.escala_client, "aget", side_effect=self.validar),
+            mock.patch.object(
+                token_service.escala_client,
+                "aput",
+                side_effect=utilizar or mock.AsyncMock(return_value=resposta(200)),
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            resultados = async_to_sync(token_service.aassociar_tokens)(self.usuario, tokens)
+        return [(r.token, r.sucesso, r.mensagem) for r in resultados]
+
+    def associados(self):
+        return dict(TokenSolicitacao.objects.values_list("token", "usuario_id"))
+
+    def test_lote_misto(self):
+        vincular(self.outro, self.contrato, "tk-antigo")
+        self.assertEqual(
+            self.associar(["tk-antigo", "invalido-1", "tk-novo"]),
+            [
+                ("tk-antigo", False, token_service.TOKEN_JA_ASSOCIADO),
+                ("invalido-1", False, token_service.TOKEN_INVALIDO),
+                ("tk-novo", True, ""),
+            ],
+        )
+        self.assertEqual(
+            self.associados(), {"tk-antigo": self.outro.pk, "tk-novo": self.usuario.pk}
+        )
+
+    def test_token_repetido_no_lote_e_utilizado_uma_vez(self):
+        utilizar = mock.AsyncMock(return_value=resposta(200))
+        self.assertEqual(
+            self.associar(["tk-1", "tk-1"], utilizar), [("tk-1", True, "")] * 2
+        )
+        self.assertEqual(utilizar.await_count, 1)
+        self.assertEqual(self.associados(), {"tk-1": self.usuario.pk})
+
+    def test_token_gravado_por_requisicao_concorrente(self):
+        async def utilizar(caminho):
+            # A outra requisição grava "tk-disputado" depois da consulta
+            # inicial e antes do INSERT desta
+            if caminho.endswith("tk-disputado"):
+                await TokenSolicitacao.objects.acreate(
+                    usuario=self.outro, contrato=self.contrato, token="tk-disputado"
+                )
+            return resposta(200)
+
+        self.assertEqual(
+            self.associar(["tk-a", "tk-disputado", "tk-b"], utilizar),
+            [
+                ("tk-a", True, ""),
+                ("tk-disputado", False, token_service.TOKEN_JA_ASSOCIADO),
+                ("tk-b", True, ""),
+            ],
+        )
+        self.assertEqual(
+            self.associados(),
+            {"tk-a": self.usuario.pk, "tk-disputado": self.outro.pk, "tk-b": self.usuario.pk},
+        )
+
+    def test_gravar_associacoes_com_token_duplicado(self):
+        dados = self.dados("tk-1")
+        with self.captureOnCommitCallbacks(execute=True):
+            recusados = token_service.gravar_associacoes(
+                self.usuario, [("tk-1", dados), ("tk-1", dados)]
+            )
+        self.assertEqual(recusados, {"tk-1"})
+        self.assertEqual(self.associados(), {"tk-1": self.usuario.pk})
+
+    @override_settings(GERENCIAMENTO_ESCALA_API_URL="http://escala.test/api/v1/")
+    def test_fornecedor_recebe_a_url_configurada(self):
+        dados = self.dados("tk-1")
+        with self.captureOnCommitCallbacks(execute=True):
+            token_service.gravar_associacoes(self.usuario, [("tk-1", dados)])
+        fornecedor = TokenSolicitacao.objects.get(token="tk-1").contrato.fornecedor
+        self.assertEqual(
+            Fornecedor.objects.get(pk=fornecedor.pk).url_sistema, "http://escala.test/api/v1/"
+        )
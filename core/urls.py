@@ -7,6 +7,12 @@ urlpatterns = [
     path("logout/", views.logout_usuario, name="logout"),
     path("listar", views.listar_solicitacoes, name="listar_solicitacoes"),
     path("nova/", views.nova_solicitacao, name="nova_solicitacao"),
+    path("importar/", views.importar_solicitacoes, name="importar_solicitacoes"),
+    path("autocompletar/<str:campo>/", views.autocompletar, name="autocompletar"),
+    path("painel/", views.painel, name="painel"),
+    path("exportar/", views.exportar_solicitacoes, name="exportar_solicitacoes"),
     path("cadastro/", views.cadastro_usuario, name="cadastro_usuario"),
     path("add-token/", views.adicionar_token, name="adicionar_token"),
+    path("metricas/", views.metricas_prometheus, name="metricas"),
+    path("webhook/status/", views.webhook_status, name="webhook_status"),
 ]
@@ -1,20 +1,62 @@
+import hmac
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import aauthenticate, alogin, authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.http import (
+    Http404,
     HttpRequest,
     HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
     HttpResponsePermanentRedirect,
     HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
 )
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib.auth import login
+from . import metricas
+from .contexto import acarregar_contexto
 from .models import Solicitacao, Usuario
-from .forms import AdicionarTokenForm, SolicitacaoForm, UsuarioCadastroForm
-from .services.token_service import associar_token
+from .forms import AdicionarTokenForm, ImportacaoForm, SolicitacaoForm, UsuarioCadastroForm
+from .paginacao import PaginaCursor, paginar
+from .services import (
+    busca_service,
+    exportacao_service,
+    importacao_service,
+    listagem_cache,
+    resumo_service,
+    status_service,
+)
+from .services.escopo_service import obter_opcoes
+from .services.token_service import ResultadoToken, aassociar_tokens
 from .services.usuario_service import criar_usuario
-from .services.solicitacao_service import salvar_solicitacao
+from .services.solicitacao_service import salvar_solicitacao, solicitacao_da_chave
+
+# Renderização fora do event loop: templates podem consultar o banco
+# (ex.: `user` e `request.escopo` em base.html)
+arender = sync_to_async(render)
+
+
+def reportar_tokens(request: HttpRequest, resultados: list[ResultadoToken]) -> None:
+    adicionados = sum(1 for r in resultados if r.sucesso)
+    if adicionados:
+        messages.success(request, f"{adicionados} token(s) adicionado(s) com sucesso.")
+    for r in resultados:
+        if not r.sucesso:
+            messages.error(request, f"Token {r.token[:8]}...: {r.mensagem}")
 
 
 def login_usuario(
@@ -49,20 +91,118 @@ def listar_solicitacoes(
     if not request.user.is_authenticated:
         return redirect("ativar_conta")
 
+    fornecedores_ids = request.escopo.fornecedores_ids  # type: ignore
+
     try:
-        tokens = request.user.perfil.tokens.all()  # type: ignore
-    except Exception:
-        tokens = []
+        tamanho = int(request.GET.get("tamanho", settings.SOLICITACOES_POR_PAGINA))
+    except ValueError:
+        tamanho = settings.SOLICITACOES_POR_PAGINA
+    tamanho = max(1, min(tamanho, settings.SOLICITACOES_POR_PAGINA_MAX))
+
+    termo = busca_service.normalizar(request.GET.get("q"))
+    depois, antes = request.GET.get("depois"), request.GET.get("antes")
 
-    fornecedores_ids = [t.empresa_id for t in tokens]  # type: ignore
+    # Sem alteração nas solicitações do escopo desde a última visita: 304, ou
+    # a tabela já renderizada, sem consultar as solicitações. Só com um cache
+    # compartilhado (ver listagem_cache.ativo)
+    em_cache = listagem_cache.ativo()
+    chave = tabela = None
+    if em_cache:
+        marca = listagem_cache.ultima_alteracao(fornecedores_ids)
+        chave = listagem_cache.chave_tabela(
+            fornecedores_ids,
+            marca,
+            {"q": termo, "tamanho": tamanho, "depois": depois, "antes": antes},
+        )
+        etag = quote_etag(
+            listagem_cache.etag(chave, request.user.pk, request.escopo.vinculos)  # type: ignore
+        )
+    # Mensagens pendentes (ex.: após importar) precisam aparecer: sem 304
+    condicional = em_cache and not len(messages.get_messages(request))
+    if condicional:
+        resposta = get_conditional_response(request, etag=etag, last_modified=int(marca))
+        if resposta is not None:
+            return _validadores_listagem(resposta, etag, marca)
 
-    solicitacoes = Solicitacao.objects.select_related("cliente", "fornecedor").filter(
-        fornecedor__id__in=fornecedores_ids
+    if em_cache:
+        tabela = listagem_cache.obter_tabela(chave)
+    if tabela is None:
+        solicitacoes = Solicitacao.objects.select_related("cliente", "fornecedor").filter(
+            fornecedor__id__in=fornecedores_ids
+        )
+        if termo:
+            # Busca: os mais relevantes, sem paginação
+            pagina = PaginaCursor(itens=busca_service.buscar(solicitacoes, termo, tamanho))
+        else:
+            pagina = paginar(solicitacoes, tamanho, depois=depois, antes=antes)
+        tabela = render_to_string(
+            "core/tabela_solicitacoes.html",
+            {"solicitacoes": pagina.itens, "pagina": pagina, "tamanho": tamanho, "q": termo},
+        )
+        if em_cache:
+            listagem_cache.guardar_tabela(chave, tabela)
+
+    response = render(
+        request,
+        "core/listar_solicitacoes.html",
+        {"tabela": tabela, "tamanho": tamanho, "q": termo},
     )
+    if condicional:
+        return _validadores_listagem(response, etag, marca)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
-    return render(
-        request, "core/listar_solicitacoes.html", {"solicitacoes": solicitacoes}
+
+def _validadores_listagem(response: HttpResponse, etag: str, marca: float) -> HttpResponse:
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(marca)
+    # O navegador sempre revalida; a página é do usuário
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required(login_url="login")
+def painel(request: HttpRequest) -> HttpResponse:
+    try:
+        meses = int(request.GET.get("meses", settings.PAINEL_MESES))
+    except ValueError:
+        meses = settings.PAINEL_MESES
+    meses = max(1, min(meses, settings.PAINEL_MESES_MAX))
+
+    tabela = resumo_service.tabela_painel(
+        request.escopo.fornecedores_ids, meses  # type: ignore
     )
+    return render(request, "core/painel.html", {"tabela": tabela, "meses": meses})
+
+
+@login_required(login_url="login")
+def exportar_solicitacoes(
+    request: HttpRequest,
+) -> StreamingHttpResponse | HttpResponseBadRequest:
+    formato = request.GET.get("formato", "csv")
+    inicio = request.GET.get("inicio")
+    fim = request.GET.get("fim")
+    try:
+        gerador, content_type, extensao = exportacao_service.FORMATOS[formato]
+        inicio = exportacao_service.parse_data(inicio) if inicio else None
+        fim = exportacao_service.parse_data(fim) if fim else None
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Parâmetros de exportação inválidos.")
+
+    registros = exportacao_service.linhas(
+        request.escopo.fornecedores_ids,  # type: ignore
+        inicio,
+        fim,
+        busca=busca_service.normalizar(request.GET.get("q")) or None,
+    )
+    conteudo = gerador(registros)
+    if isinstance(request, ASGIRequest):
+        conteudo = exportacao_service.em_lotes_async(conteudo)
+    response = StreamingHttpResponse(conteudo, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="solicitacoes.{extensao}"'
+    )
+    return response
 
 
 # @login_required(login_url="login")
@@ -80,41 +220,101 @@ def listar_solicitacoes(
 
 
 @login_required(login_url="login")
-def nova_solicitacao(
+async def nova_solicitacao(
     request: HttpRequest,
 ) -> HttpResponseRedirect | HttpResponsePermanentRedirect | HttpResponse:
     if request.method == "POST":
-        form = SolicitacaoForm(request.POST)
-        if form.is_valid():
-            usuario: Usuario = request.user.perfil  # type: ignore
-            salvar_solicitacao(form, usuario)  # type: ignore
-            return redirect("listar_solicitacoes")
+        contexto = await acarregar_contexto(await request.auser())
+        # Formulário já processado (duplo clique, reenvio): mesmo resultado
+        chave = request.POST.get("chave_idempotencia")
+        if chave and contexto.perfil is not None:
+            if await sync_to_async(solicitacao_da_chave)(chave, contexto.perfil) is not None:
+                return redirect("listar_solicitacoes")
+        form = SolicitacaoForm(
+            request.POST, opcoes=contexto.opcoes, instancias=contexto.instancias
+        )
+        if not contexto.contratos:
+            messages.error(request, "Nenhum contrato vinculado. Adicione um token.")
+        elif await sync_to_async(form.is_valid)():
+            try:
+                await sync_to_async(salvar_solicitacao)(form, contexto)  # type: ignore
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                return redirect("listar_solicitacoes")
+    else:
+        opcoes = await sync_to_async(obter_opcoes)(await request.auser())
+        form = SolicitacaoForm(opcoes=opcoes)
+    return await arender(request, "core/nova_solicitacao.html", {"form": form})
+
+
+@login_required(login_url="login")
+def importar_solicitacoes(request: HttpRequest) -> HttpResponse:
+    resultado = None
+    if request.method == "POST":
+        form = ImportacaoForm(request.POST, request.FILES)
+        contexto = request.usuario_contexto  # type: ignore
+        if not contexto.contratos:
+            messages.error(request, "Nenhum contrato vinculado. Adicione um token.")
+        elif form.is_valid():
+            arquivo = form.cleaned_data["arquivo"]
+            try:
+                resultado = importacao_service.importar(
+                    arquivo,
+                    importacao_service.formato_de(arquivo.name),
+                    contexto,
+                    form.cleaned_data["tudo_ou_nada"],
+                )
+            except importacao_service.ErroPlanilha as e:
+                form.add_error("arquivo", str(e))
+            else:
+                if resultado.criadas:
+                    messages.success(
+                        request, f"{len(resultado.criadas)} solicitação(ões) importada(s)."
+                    )
+                elif resultado.erros:
+                    messages.error(request, "Nenhuma solicitação importada.")
     else:
-        form = SolicitacaoForm()
-    return render(request, "core/nova_solicitacao.html", {"form": form})
+        form = ImportacaoForm()
+    return render(
+        request, "core/importar_solicitacoes.html", {"form": form, "resultado": resultado}
+    )
+
 
+@login_required(login_url="login")
+def autocompletar(request: HttpRequest, campo: str) -> JsonResponse:
+    """Clientes ou fornecedores do escopo do usuário cujo nome começa com `q`."""
+    opcoes = obter_opcoes(request.user)
+    lista = {"cliente": opcoes.clientes, "fornecedor": opcoes.fornecedores}.get(campo)
+    if lista is None:
+        raise Http404
+    termo = request.GET.get("q", "").strip().casefold()
+    resultados = [
+        {"id": pk, "nome": nome} for pk, nome in lista if nome.casefold().startswith(termo)
+    ]
+    return JsonResponse({"resultados": resultados[: settings.AUTOCOMPLETAR_LIMITE]})
 
-def cadastro_usuario(
+
+async def cadastro_usuario(
     request: HttpRequest,
 ) -> HttpResponseRedirect | HttpResponsePermanentRedirect | HttpResponse:
     if request.method == "POST":
         form = UsuarioCadastroForm(request.POST)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
             email = form.cleaned_data["email"]
             senha = form.cleaned_data["password1"]
-            token_str = form.cleaned_data["token"]
-            nome = form.cleaned_data.get("nome_completo")
-            print(nome)  # Para depuração, remova em produção
+            tokens = form.cleaned_data["token"]
 
             # 🔍 Verifica se usuário já existe
-            user_exists = User.objects.filter(username=email).exists()
+            user_exists = await User.objects.filter(username=email).aexists()
 
             if user_exists:
-                user = authenticate(username=email, password=senha)
+                user = await aauthenticate(request, username=email, password=senha)
                 if user:
-                    usuario = Usuario.objects.get(user=user)
-                    associar_token(usuario, token_str)
-                    login(request, user)
+                    usuario = await Usuario.objects.aget(user=user)
+                    if tokens:
+                        reportar_tokens(request, await aassociar_tokens(usuario, tokens))
+                    await alogin(request, user)
                     return redirect("listar_solicitacoes")
                 else:
                     messages.error(
@@ -122,9 +322,10 @@ def cadastro_usuario(
                     )
             if not user_exists:
                 # Cria novo usuário
-                user, usuario = criar_usuario(form)
-                associar_token(usuario, token_str)
-                login(request, user)
+                user, usuario = await sync_to_async(criar_usuario)(form)
+                if tokens:
+                    reportar_tokens(request, await aassociar_tokens(usuario, tokens))
+                await alogin(request, user)
                 return redirect("listar_solicitacoes")
             else:
                 messages.error(
@@ -135,10 +336,10 @@ def cadastro_usuario(
     else:
         form = UsuarioCadastroForm()
 
-    return render(request, "core/cadastro.html", {"form": form})
+    return await arender(request, "core/cadastro.html", {"form": form})
 
 
-def adicionar_token(
+async def adicionar_token(
     request: HttpRequest,
 ) -> HttpResponseRedirect | HttpResponsePermanentRedirect | HttpResponse:
     if request.method == "POST":
@@ -146,22 +347,62 @@ def adicionar_token(
         if form.is_valid():
             email = form.cleaned_data["email"]
             senha = form.cleaned_data["senha"]
-            token_str = form.cleaned_data["token"]
+            tokens = form.cleaned_data["token"]
 
-            user = authenticate(request, username=email, password=senha)
+            user = await aauthenticate(request, username=email, password=senha)
             if user:
-                usuario = Usuario.objects.get(user=user)
+                usuario = await Usuario.objects.aget(user=user)
 
-                sucesso = associar_token(usuario, token_str)
-                if sucesso:
-                    login(request, user)
-                    messages.success(request, "Token adicionado com sucesso.")
+                resultados = await aassociar_tokens(usuario, tokens)
+                reportar_tokens(request, resultados)
+                if any(r.sucesso for r in resultados):
+                    await alogin(request, user)
                     return redirect("listar_solicitacoes")
-                else:
-                    messages.error(request, "Token inválido ou já utilizado.")
             else:
                 messages.error(request, "Credenciais inválidas.")
     else:
         form = AdicionarTokenForm()
 
-    return render(request, "core/adicionar_token.html", {"form": form})
+    return await arender(request, "core/adicionar_token.html", {"form": form})
+
+
+def _token_metricas_valido(request: HttpRequest) -> bool:
+    # Não confia no endereço de origem: atrás de um proxy reverso local toda
+    # requisição viria de 127.0.0.1
+    token = settings.METRICAS_TOKEN
+    tipo, _, recebido = request.headers.get("Authorization", "").partition(" ")
+    return bool(token) and tipo.lower() == "bearer" and hmac.compare_digest(
+        recebido.strip().encode(), token.encode()
+    )
+
+
+def metricas_prometheus(request: HttpRequest) -> HttpResponse:
+    if not (request.user.is_staff or _token_metricas_valido(request)):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metricas.exportar_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@csrf_exempt
+@require_POST
+def webhook_status(request: HttpRequest) -> JsonResponse:
+    """Lotes de eventos de status do sistema de escala (ver `status_service`)."""
+    assinatura = request.headers.get(status_service.CABECALHO_ASSINATURA)
+    if not status_service.assinatura_valida(request.body, assinatura):
+        return JsonResponse({"erro": "Assinatura inválida."}, status=403)
+    try:
+        eventos, invalidos = status_service.ler_lote(json.loads(request.body))
+    except ValueError as e:  # JSON inválido ou LoteInvalido
+        return JsonResponse({"erro": str(e)}, status=400)
+    resultado = status_service.aplicar(eventos, invalidos)
+    return JsonResponse(
+        {
+            "recebidos": resultado.recebidos,
+            "aplicados": resultado.aplicados,
+            "duplicados": resultado.duplicados,
+            "ignorados": resultado.ignorados,
+            "invalidos": resultado.invalidos,
+        }
+    )
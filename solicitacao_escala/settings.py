@@ -12,8 +12,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from typing import List, Dict, Any
 import os
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,15 +42,19 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricasMiddleware",
+    "core.middleware.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.UsuarioContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -87,6 +94,70 @@ DATABASES = {
     }
 }
 
+# Conexões com o banco (métricas em core.conexoes), por DATABASE_CONEXOES:
+# - "nenhum" (padrão): cada requisição abre e fecha uma conexão;
+# - "persistente": cada thread reaproveita sua conexão por DATABASE_CONN_MAX_AGE
+#   segundos, verificada antes do reuso;
+# - "pool": pool do psycopg 3 por processo (requer psycopg[pool]), entre
+#   DATABASE_POOL_MIN e DATABASE_POOL_MAX conexões; uma requisição espera até
+#   DATABASE_POOL_TIMEOUT segundos por uma conexão livre.
+# Vale também para a réplica, que copia a configuração do default.
+BANCO_CONEXOES = os.environ.get("DATABASE_CONEXOES", "nenhum")
+if BANCO_CONEXOES == "persistente":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif BANCO_CONEXOES == "pool":
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            "DATABASE_CONEXOES=pool requer o pacote psycopg[pool]."
+        )
+    # Mantém as demais OPTIONS do banco (sslmode, options etc.)
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.environ.get("DATABASE_POOL_MIN", 2)),
+        "max_size": int(os.environ.get("DATABASE_POOL_MAX", 10)),
+        "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+    }
+elif BANCO_CONEXOES != "nenhum":
+    raise ImproperlyConfigured(
+        f"DATABASE_CONEXOES inválido: {BANCO_CONEXOES} (use nenhum, persistente ou pool)."
+    )
+
+# Réplica de leitura (core.roteador), ativada com DATABASE_REPLICA_HOST. Nos
+# testes ela espelha o banco default e o roteador fica desligado; os testes do
+# roteador o religam com override_settings(BANCO_REPLICA="replica").
+BANCO_REPLICA = "replica"
+TESTANDO = sys.argv[1:2] == ["test"]
+if os.environ.get("DATABASE_REPLICA_HOST"):
+    DATABASES[BANCO_REPLICA] = {
+        **DATABASES["default"],
+        "HOST": os.environ["DATABASE_REPLICA_HOST"],
+        "PORT": os.environ.get("DATABASE_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "NAME": os.environ.get("DATABASE_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "TEST": {"MIRROR": "default"},
+    }
+elif TESTANDO:
+    DATABASES[BANCO_REPLICA] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+if TESTANDO:
+    BANCO_REPLICA = None
+
+DATABASE_ROUTERS = ["core.roteador.RoteadorReplica"]
+BANCO_REPLICA_ATRASO_MAX = 5  # segundos; acima disso as leituras vão ao primário
+BANCO_REPLICA_ATRASO_VERIFICACAO = 2  # segundos entre medições do atraso
+BANCO_REPLICA_CACHE = "default"  # alias em CACHES
+BANCO_PRIMARIO_APOS_ESCRITA = 10  # segundos lendo do primário após uma escrita
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -130,3 +201,89 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 GERENCIAMENTO_ESCALA_API_URL = "http://localhost:8080/api/v1/"
+
+# Listagem de solicitações (paginação por cursor)
+SOLICITACOES_POR_PAGINA = 25
+SOLICITACOES_POR_PAGINA_MAX = 100
+
+# ETag/Last-Modified e tabela renderizada da listagem (core.services.listagem_cache).
+# Só valem com um cache compartilhado entre processos (Redis, Memcached,
+# banco); com locmem a listagem é sempre renderizada
+LISTAGEM_CACHE = "default"  # alias em CACHES
+LISTAGEM_CACHE_TTL = 5 * 60  # segundos da tabela renderizada
+LISTAGEM_MARCA_TTL = 24 * 60 * 60  # segundos; sem marca, a listagem conta como alterada
+
+# Formulário de solicitação: opções de cliente/fornecedor renderizadas no
+# select; as demais são buscadas pelo autocompletar
+FORM_OPCOES_MAX = 50
+AUTOCOMPLETAR_LIMITE = 20
+
+# Importação de planilhas de solicitações (core.services.importacao_service)
+IMPORTACAO_MAX_LINHAS = 5000
+IMPORTACAO_TAMANHO_MAX = 5 * 1024 * 1024  # bytes
+IMPORTACAO_LOTE = 500  # linhas por INSERT
+
+# Painel (core.services.resumo_service): meses exibidos
+PAINEL_MESES = 12
+PAINEL_MESES_MAX = 36
+
+# Busca textual na listagem/exportação (core.services.busca_service)
+BUSCA_TERMO_MAX = 200  # caracteres
+BUSCA_CANDIDATOS = 1000  # ocorrências mais recentes ordenadas por relevância
+
+# Admin: acima deste total estimado, o admin de solicitações não faz COUNT(*)
+ADMIN_CONTAGEM_EXATA_LIMITE = 10_000
+
+# Particionamento mensal de solicitações (comando `manter_particoes`)
+SOLICITACAO_PARTICOES_FUTURAS = 3  # meses à frente com partição criada
+SOLICITACAO_MESES_ATIVOS = None  # meses mantidos na tabela; None não arquiva
+SOLICITACAO_ARQUIVO_MODO = "desanexar"  # ou "mover" (core.services.particao_service)
+SOLICITACAO_ARQUIVO_SCHEMA = "arquivo"
+
+# Exportação de solicitações: linhas lidas por ida ao cursor do banco
+EXPORTACAO_LOTE = 2000
+
+# Outbox de envio de solicitações (comando `despachar_solicitacoes`)
+ESCALA_ENVIO_LOTE = 50
+ESCALA_ENVIO_CONCORRENCIA = 8
+ESCALA_ENVIO_MAX_TENTATIVAS = 10
+ESCALA_ENVIO_BACKOFF_BASE = 5  # segundos
+ESCALA_ENVIO_BACKOFF_MAX = 15 * 60  # segundos
+ESCALA_ENVIO_RESERVA = 120  # segundos que um lote fica reservado para um despachante
+
+# Webhook de status do gerenciamento de escala (core.services.status_service).
+# Sem segredo configurado, o webhook recusa todos os lotes
+ESCALA_WEBHOOK_SEGREDO = os.environ.get("ESCALA_WEBHOOK_SEGREDO", "")
+ESCALA_WEBHOOK_LOTE_MAX = 1000  # eventos por requisição
+# Dias que os ids de eventos recebidos ficam guardados para descartar
+# reentregas (comando limpar_eventos_status). Uma reentrega mais antiga ainda
+# é descartada pela versão do status
+ESCALA_WEBHOOK_RETENCAO_DIAS = 30
+
+# Cliente HTTP do gerenciamento de escala (core.services.escala_client)
+ESCALA_API_TIMEOUT_CONEXAO = 3.05  # segundos
+ESCALA_API_TIMEOUT_LEITURA = 10  # segundos
+ESCALA_API_POOL_TAMANHO = 20  # conexões keep-alive por processo
+ESCALA_API_POOL_TAMANHO_ASYNC = 200  # conexões simultâneas do cliente assíncrono
+ESCALA_API_TENTATIVAS = 2  # repetições extras para GET/HEAD/OPTIONS e chamadas com Idempotency-Key
+ESCALA_API_BACKOFF_BASE = 0.2  # segundos
+ESCALA_API_CIRCUITO_LIMITE_FALHAS = 5
+ESCALA_API_CIRCUITO_REABERTURA = 30  # segundos com o circuito aberto
+
+# Cache de validação de tokens (core.services.token_cache)
+ESCALA_TOKEN_CACHE = "default"  # alias em CACHES
+ESCALA_TOKEN_CACHE_TTL = 60  # segundos para tokens válidos
+ESCALA_TOKEN_CACHE_TTL_NEGATIVO = 15  # segundos para tokens inválidos
+
+# Escopo de acesso por usuário (core.services.escopo_service). Só fica no
+# cache se ele for compartilhado entre processos; com locmem é lido do banco
+ESCOPO_CACHE = "default"  # alias em CACHES
+ESCOPO_CACHE_TTL = 60 * 60  # segundos
+
+# Associação de vários tokens por envio (core.services.token_service)
+ESCALA_TOKENS_POR_ENVIO_MAX = 50
+ESCALA_TOKENS_CONCORRENCIA = 10  # chamadas simultâneas ao sistema de escala
+
+# Endpoint /metricas/ (formato Prometheus): usuários staff ou o cabeçalho
+# "Authorization: Bearer <token>". Sem token configurado, só staff
+METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN", "")